@@ -10,6 +10,7 @@ export type Job = {
   source: string;
   collected_at?: string;
   description?: string;
+  alt_urls?: string; // near-duplicate postings on other boards, newline separated
   lead?: Lead;
 };
 
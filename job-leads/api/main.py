@@ -1,18 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import time
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from sqlalchemy import and_, select
+from sqlalchemy import and_, literal_column, or_, select
 
-from job_agent.orchestrator import load_config, run_scrape
+from job_agent import metrics
+from job_agent.cursor import decode_cursor, decode_feed_cursor, encode_feed_cursor, next_cursor
+from job_agent.orchestrator import load_config
+from job_agent.runner import ScrapeManager
+from job_agent.similarity import get_similarity_index
 from job_agent.schema import FilterQuery, JobModel, LeadModel, UpsertLead
 from job_agent.utils import now_iso, url_hash
-from job_agent.db import get_session, init_db, upsert_job, upsert_lead
+from job_agent.db import (
+    configure_sqlite,
+    fts_available,
+    fts_match,
+    get_new_job_ids_since,
+    get_read_session,
+    get_session,
+    init_db,
+    lead_ids_with_status,
+    list_runs,
+    search_all_local,
+    upsert_job,
+    upsert_lead,
+)
 from job_agent.models import Job, Lead
 from job_agent.repo import (
     query_jobs_supa,
@@ -20,6 +42,7 @@ from job_agent.repo import (
     upsert_leads_fields_supa,
     upsert_jobs_supa,
     get_jobs_by_ids_supa,
+    embedded_lead,
     bulk_scores_supa,
     bulk_status_supa,
     upsert_person_supa,
@@ -28,15 +51,37 @@ from job_agent.repo import (
     list_latest_people_supa,
     list_latest_posts_supa,
     list_latest_jobs_supa,
+    iter_job_pages_supa,
     search_all_supa,
+    list_runs_supa,
+    lead_ids_with_status_supa,
+    job_ids_since_supa,
 )
-from job_agent.scoring import score_record
+from job_agent.matcher import KeywordMatcher
 from job_agent.notify import send_slack
-from backend.llm import get_default_provider
+from backend.drafts import DEFAULT_CONCURRENCY, DEFAULT_RETRIES, DRAFT_KINDS, DraftBatches, generate_drafts
+from backend.llm import close_client, get_default_provider, get_llm_cache, open_client, parse_draft
 from backend.prompts import INVITE_TMPL, COMMENT_TMPL, COVER_LETTER_TMPL, RESUME_BULLETS_TMPL
 
 load_dotenv()
-app = FastAPI(title="Job Leads API")
+_cfg = load_config("config.yaml") if os.path.exists("config.yaml") else {}
+configure_sqlite(_cfg)
+metrics.configure(_cfg)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup runs once here; read sessions are query_only and never create tables
+    init_db()
+    # One pooled client for LLM providers, reused across requests
+    open_client()
+    try:
+        yield
+    finally:
+        await close_client()
+
+
+app = FastAPI(title="Job Leads API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -45,6 +90,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    if not metrics.enabled():
+        return await call_next(request)
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Route template (/leads/{lead_id}), not the raw path, so label cardinality stays fixed
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start, method=request.method, route=route, status=str(response.status_code)
+    )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 def supa_available() -> bool:
     # Require service role for server-side usage to ensure consistency with writes
     return bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
@@ -60,7 +126,12 @@ def get_jobs(
     date_to: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
+    """Pass `cursor` ("" for the first page) to page by keyset on (collected_at, id); the
+    response is then {"items": [...], "next_cursor": ...}. Without it, offset/limit and a list."""
+    keyset = cursor is not None
+    after = _decode_cursor(cursor)
     if supa_available():
         filters = {
             "q": q,
@@ -71,25 +142,33 @@ def get_jobs(
             "limit": limit,
             "offset": offset,
         }
-        jobs = query_jobs_supa(filters, service=False)
-        leads = get_leads_supa({"status": status} if status else None, service=False)
-        lead_map = {l["id"]: l for l in leads}
+        if keyset:
+            filters["cursor"] = after
+        jobs = query_jobs_supa({**filters, "status": status}, service=False, with_leads=True)
         out = []
         for j in jobs:
             jd = {k: j.get(k, "") for k in JobModel.model_fields.keys()}
-            ld = lead_map.get(jd["id"]) if status is None or (lead_map.get(jd["id"]) and lead_map[jd["id"]]["status"] == status) else None
-            if status and not ld:
-                continue
+            ld = embedded_lead(j)
             if ld:
                 jd["lead"] = ld
             out.append(jd)
-        return out
+        return _page(out, limit, "collected_at") if keyset else out
     # Fallback: local SQLite
-    init_db()
-    with get_session() as session:
-        stmt = select(Job)
+    with get_read_session() as session:
+        # Outer join so leads arrive with their page; a status filter makes it an inner join
+        stmt = select(Job, Lead).join(Lead, Lead.id == Job.id, isouter=not status)
         conditions = []
-        if q:
+        if status:
+            conditions.append(Lead.status == status)
+        if q and fts_available(session.get_bind()) and not keyset:
+            only_q = not (source or location or date_from or date_to or status)
+            match = fts_match(q, top=offset + limit if only_q else None)
+            stmt = stmt.join(match, match.c.rowid == literal_column("jobs.rowid")).order_by(match.c.rank)
+        elif q and fts_available(session.get_bind()):
+            # Keyset order is by recency, so the index only filters
+            match = fts_match(q)
+            stmt = stmt.join(match, match.c.rowid == literal_column("jobs.rowid"))
+        elif q:
             pattern = f"%{q.lower()}%"
             conditions.append(
                 (Job.title.ilike(pattern))
@@ -105,56 +184,99 @@ def get_jobs(
             conditions.append(Job.collected_at >= date_from)
         if date_to:
             conditions.append(Job.collected_at <= date_to)
+        if after:
+            ts, rid = after
+            conditions.append(or_(Job.collected_at < ts, and_(Job.collected_at == ts, Job.id < rid)))
         if conditions:
             stmt = stmt.where(and_(*conditions))
-        stmt = stmt.offset(offset).limit(limit)
-        rows = session.execute(stmt).scalars().all()
-        lead_rows = {l.id: l for l in session.execute(select(Lead)).scalars().all()}
-        if status:
-            rows = [r for r in rows if (lead_rows.get(r.id) and lead_rows[r.id].status == status)]
+        if keyset:
+            stmt = stmt.order_by(Job.collected_at.desc(), Job.id.desc()).limit(limit)
+        else:
+            stmt = stmt.offset(offset).limit(limit)
         out = []
-        for j in rows:
+        for j, ld in session.execute(stmt).all():
             jd = {c: getattr(j, c) for c in JobModel.model_fields.keys()}
-            ld = lead_rows.get(j.id)
             if ld:
-                jd["lead"] = {
-                    "id": ld.id,
-                    "status": ld.status,
-                    "score": ld.score,
-                    "favourite": ld.favourite,
-                    "resume_url": ld.resume_url,
-                    "cover_letter_url": ld.cover_letter_url,
-                    "next_action": ld.next_action,
-                    "next_action_date": ld.next_action_date,
-                    "notes": ld.notes,
-                    "updated_at": ld.updated_at,
-                }
+                jd["lead"] = _lead_dict(ld)
             out.append(jd)
-        return out
+        return _page(out, limit, "collected_at") if keyset else out
+
+
+MAX_SIMILAR = 100
+
+
+def _similarity_index():
+    index = get_similarity_index(_cfg)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Similarity index disabled")
+    return index
+
+
+def _ranked_jobs(ranked: List[tuple]) -> list:
+    jobs = _load_jobs([i for i, _ in ranked]) if ranked else {}
+    return [{**jobs[i], "similarity": round(s, 4)} for i, s in ranked if i in jobs]
+
+
+@app.get("/jobs/recommended")
+def get_recommended_jobs(limit: int = 20, since: Optional[str] = None, status: str = "applied"):
+    """Jobs ranked by similarity to the leads in `status` (any case). With `since`, only jobs
+    collected after it are ranked, i.e. new jobs like the ones already applied to."""
+    index = _similarity_index()
+    limit = max(1, min(limit, MAX_SIMILAR))
+    if supa_available():
+        liked = lead_ids_with_status_supa(status, service=False)
+        candidates = job_ids_since_supa(since, service=False) if since else None
+    else:
+        with get_read_session() as session:
+            liked = lead_ids_with_status(session, status)
+            candidates = get_new_job_ids_since(session, since) if since else None
+    return _ranked_jobs(index.recommend(liked, limit, candidates))
+
+
+@app.get("/jobs/{job_id}/similar")
+def get_similar_jobs(job_id: str, limit: int = 10):
+    index = _similarity_index()
+    if job_id not in index:
+        raise HTTPException(status_code=404, detail="Job not indexed")
+    return _ranked_jobs(index.similar(job_id, max(1, min(limit, MAX_SIMILAR))))
+
+
+def _decode_cursor(cursor: Optional[str], decode=decode_cursor):
+    try:
+        return decode(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(items: list, limit: int, ts_key: str) -> dict:
+    return {"items": items, "next_cursor": next_cursor(items, limit, ts_key)}
+
+
+def _lead_dict(l: Lead) -> dict:
+    return {
+        "id": l.id,
+        "status": l.status,
+        "score": l.score,
+        "favourite": l.favourite,
+        "resume_url": l.resume_url,
+        "cover_letter_url": l.cover_letter_url,
+        "next_action": l.next_action,
+        "next_action_date": l.next_action_date,
+        "notes": l.notes,
+        "cover_letter_draft": l.cover_letter_draft,
+        "resume_bullets_draft": l.resume_bullets_draft,
+        "drafted_at": l.drafted_at,
+        "updated_at": l.updated_at,
+    }
 
 
 @app.get("/leads")
 def get_leads():
     if supa_available():
         return get_leads_supa(None, service=False)
-    init_db()
-    with get_session() as session:
+    with get_read_session() as session:
         rows = session.execute(select(Lead)).scalars().all()
-        return [
-            {
-                "id": l.id,
-                "status": l.status,
-                "score": l.score,
-                "favourite": l.favourite,
-                "resume_url": l.resume_url,
-                "cover_letter_url": l.cover_letter_url,
-                "next_action": l.next_action,
-                "next_action_date": l.next_action_date,
-                "notes": l.notes,
-                "updated_at": l.updated_at,
-            }
-            for l in rows
-        ]
+        return [_lead_dict(l) for l in rows]
 
 
 @app.post("/leads/{lead_id}")
@@ -181,16 +303,55 @@ def patch_lead(lead_id: str, payload: UpsertLead):
     return {"ok": True, "id": lead_id}
 
 
-@app.post("/run-scrape")
+_runner = ScrapeManager(lambda: load_config("config.yaml"))
+
+
+@app.post("/run-scrape", status_code=202)
 def run_scrape_now():
-    cfg = load_config("config.yaml")
-    all_c, filt_c, uniq_c, new_jobs = run_scrape(cfg)
-    return {
-        "all": all_c,
-        "filtered": filt_c,
-        "unique": uniq_c,
-        "new": len(new_jobs),
-    }
+    """Queue a scrape on the background worker and return its run id right away. While a run
+    is queued or running, the same run is returned (created=false) instead of a second one."""
+    run, created = _runner.submit()
+    return {"id": run.id, "status": run.status, "created": created}
+
+
+@app.get("/runs")
+def get_runs(limit: int = 50, fetches: bool = False):
+    """Recorded run history, newest first. `fetches=true` adds the per-(site, term) rows."""
+    limit = max(1, min(limit, 500))
+    if supa_available():
+        return list_runs_supa(limit, service=False, with_fetches=fetches)
+    with get_read_session() as session:
+        return list_runs(session, limit, with_fetches=fetches)
+
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: str):
+    snap = _runner.snapshot(run_id)
+    if snap is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    return snap
+
+
+@app.get("/runs/{run_id}/events")
+def run_events(run_id: str, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events: `status`, per site/term `fetch` and per-batch `batch` events.
+    Reconnecting clients resume after Last-Event-ID."""
+    if _runner.get(run_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    def stream():
+        seq = after
+        while True:
+            events, finished = _runner.events_since(run_id, seq, timeout=15.0)
+            for seq, kind, data in events:
+                yield f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+            if finished:
+                return
+            if not events:
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 class UpsertJob(BaseModel):
@@ -231,18 +392,21 @@ class RescorePayload(BaseModel):
     ids: list[str] | None = None
 
 
+RESCORE_PAGE = 1000
+
+
 @app.post("/actions/rescore")
 def actions_rescore(payload: RescorePayload | None = None):
     cfg = load_config("config.yaml")
-    rules = cfg.get("score_rules")
+    matcher = KeywordMatcher.from_config(cfg)
     ids = (payload.ids if payload else None) or []
     if supa_available():
-        jobs = get_jobs_by_ids_supa(ids, service=True) if ids else query_jobs_supa({"limit": 1000}, service=True)
-        id_to_score = {}
-        for j in jobs:
-            sc = score_record(j, rules)
-            id_to_score[j["id"]] = sc
-        updated = bulk_scores_supa(id_to_score, service=True)
+        # Without ids every job is rescored, a page at a time: each page's scores are written
+        # before the next is fetched, so memory stays at one page
+        pages = [get_jobs_by_ids_supa(ids, service=True)] if ids else iter_job_pages_supa(RESCORE_PAGE)
+        updated = 0
+        for jobs in pages:
+            updated += bulk_scores_supa({j["id"]: matcher.score(j) for j in jobs}, service=True)
         return {"updated": updated}
     # Local fallback
     init_db()
@@ -254,7 +418,7 @@ def actions_rescore(payload: RescorePayload | None = None):
             q = q.where(Job.id.in_(ids))
         jobs = session.execute(q).scalars().all()
         for j in jobs:
-            sc = score_record({c: getattr(j, c) for c in JobModel.model_fields.keys()}, rules)
+            sc = matcher.score({c: getattr(j, c) for c in JobModel.model_fields.keys()})
             upsert_lead(session, j.id, {"score": sc})
             updated += 1
     return {"updated": updated}
@@ -348,14 +512,10 @@ class SuggestPayload(BaseModel):
     type: str
     payload: dict
     style: str | None = None
+    force_refresh: bool = False
 
 
-@app.post("/llm/suggest")
-async def llm_suggest(body: SuggestPayload):
-    prov = get_default_provider()
-    kind = body.type
-    style = body.style or "short"
-    p = body.payload
+def _suggest_prompt(kind: str, style: str, p: dict) -> str | None:
     if kind == "invite":
         prompt = INVITE_TMPL.format(full_name=p.get("full_name",""), company=p.get("company",""), headline=p.get("headline",""), shared=p.get("shared_context",""), style=style)
     elif kind == "comment":
@@ -365,15 +525,155 @@ async def llm_suggest(body: SuggestPayload):
     elif kind == "resume_bullets":
         prompt = RESUME_BULLETS_TMPL.format(title=p.get("title",""), company=p.get("company",""), keywords=p.get("keywords",""))
     else:
+        return None
+    return prompt
+
+
+@app.post("/llm/suggest")
+async def llm_suggest(body: SuggestPayload):
+    prov = get_default_provider()
+    kind = body.type
+    style = body.style or "short"
+    prompt = _suggest_prompt(kind, style, body.payload)
+    if prompt is None:
         return {"draft": ""}
-    text = await prov.suggest(kind, prompt)
-    # Try to extract JSON {draft: ...}
-    import json
-    try:
-        data = json.loads(text)
-        return {"draft": data.get("draft", text)}
-    except Exception:
-        return {"draft": text}
+    # Identical (provider, model, kind, prompt, style) requests are served from the cache,
+    # and concurrent ones share a single upstream call
+    cache = get_llm_cache(_cfg)
+    if cache is not None:
+        text, cached = await cache.suggest(prov, kind, prompt, style, force_refresh=body.force_refresh)
+    else:
+        text, cached = await prov.suggest(kind, prompt), False
+    return {"draft": parse_draft(text), "cached": cached}
+
+
+@app.post("/llm/suggest/stream")
+async def llm_suggest_stream(body: SuggestPayload):
+    """Server-Sent Events: `token` events ({"text"}) as the provider generates, then `done`
+    with the parsed {"draft", "cached"}, or `error`."""
+    prov = get_default_provider()
+    kind = body.type
+    style = body.style or "short"
+    prompt = _suggest_prompt(kind, style, body.payload)
+    cache = get_llm_cache(_cfg)
+
+    async def chunks():
+        if cache is not None:
+            async for chunk, cached in cache.suggest_stream(prov, kind, prompt, style, body.force_refresh):
+                yield chunk, cached
+        else:
+            async for chunk in prov.suggest_stream(kind, prompt):
+                yield chunk, False
+
+    async def stream():
+        if prompt is None:
+            yield f"event: done\ndata: {json.dumps({'draft': '', 'cached': False})}\n\n"
+            return
+        start = time.perf_counter()
+        parts, cached = [], False
+        try:
+            async for chunk, cached in chunks():
+                if not parts:
+                    metrics.LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, provider=prov.name)
+                parts.append(chunk)
+                yield f"event: token\ndata: {json.dumps({'text': chunk})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': f'{type(e).__name__}: {e}'})}\n\n"
+            return
+        done = {"draft": parse_draft("".join(parts)), "cached": cached}
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/llm/cache")
+def llm_cache_stats():
+    cache = get_llm_cache(_cfg)
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats}
+
+
+MAX_DRAFT_BATCH = 200
+_drafts = DraftBatches()
+
+
+class DraftBatchPayload(BaseModel):
+    ids: List[str]
+    kind: str = "cover_letter"  # cover_letter | resume_bullets
+    strengths: str = ""
+    keywords: str = ""  # defaults to each job's tags
+    style: str | None = None
+    wait: bool = False  # respond with the finished batch instead of its id
+
+
+def _load_jobs(ids: List[str]) -> dict:
+    if supa_available():
+        rows = get_jobs_by_ids_supa(ids, service=True)
+    else:
+        with get_read_session() as session:
+            jobs = session.execute(select(Job).where(Job.id.in_(ids))).scalars().all()
+            rows = [{c: getattr(j, c) for c in JobModel.model_fields.keys()} for j in jobs]
+    return {r["id"]: r for r in rows}
+
+
+def _draft_store(column: str):
+    def store(job_id: str, draft: str) -> None:
+        fields = {column: draft, "drafted_at": now_iso()}
+        if supa_available():
+            upsert_leads_fields_supa(job_id, fields, service=True)
+        else:
+            with get_session() as session:
+                upsert_lead(session, job_id, fields)
+
+    return store
+
+
+@app.post("/llm/drafts", status_code=202)
+async def llm_drafts(body: DraftBatchPayload, response: Response):
+    """Draft cover letters or resume bullets for many jobs in the background. Jobs are loaded
+    in one query, drafts are generated with bounded concurrency and per-item retries, and
+    each draft is stored on the job's lead. Poll GET /llm/drafts/{id} for progress."""
+    if body.kind not in DRAFT_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {sorted(DRAFT_KINDS)}")
+    ids = list(dict.fromkeys(body.ids))
+    if not ids or len(ids) > MAX_DRAFT_BATCH:
+        raise HTTPException(status_code=400, detail=f"send 1-{MAX_DRAFT_BATCH} ids")
+    settings = _cfg.get("llm_drafts") or {}
+    prov = get_default_provider()
+    cache = get_llm_cache(_cfg)
+
+    async def work(batch) -> None:
+        jobs = await asyncio.to_thread(_load_jobs, ids)
+        await generate_drafts(
+            prov,
+            jobs,
+            ids,
+            body.kind,
+            strengths=body.strengths,
+            keywords=body.keywords,
+            style=body.style or "short",
+            concurrency=int(settings.get("concurrency", DEFAULT_CONCURRENCY)),
+            retries=int(settings.get("retries", DEFAULT_RETRIES)),
+            cache=cache,
+            store=_draft_store(DRAFT_KINDS[body.kind][1]),
+            on_result=batch.results.append,
+        )
+
+    batch = _drafts.start(body.kind, len(ids), work)
+    if body.wait:
+        await _drafts.wait(batch.id)
+        response.status_code = 200
+        return batch.snapshot()
+    return {"id": batch.id, "status": batch.status, "total": batch.total}
+
+
+@app.get("/llm/drafts/{batch_id}")
+def get_draft_batch(batch_id: str):
+    batch = _drafts.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Unknown batch")
+    return batch.snapshot()
 
 
 class ClipPayload(BaseModel):
@@ -435,23 +735,42 @@ def clip(body: ClipPayload):
 
 
 @app.get("/feed")
-def get_feed():
+def get_feed(limit: int = 100, cursor: Optional[str] = None):
+    """Newest people, posts and jobs merged by timestamp. With `cursor` ("" for the first
+    page) returns {"items": [...], "next_cursor": ...} paged by keyset on (timestamp, id),
+    keeping one position per source."""
+    keyset = cursor is not None
     if supa_available():
-        people = list_latest_people_supa(50, service=False)
-        posts = list_latest_posts_supa(50, service=False)
-        jobs = list_latest_jobs_supa(50, service=False)
-        # Tag and merge by timestamps (best-effort without full schema consistency)
-        def tag(arr, kind, ts_key):
-            for a in arr:
+        after = _decode_cursor(cursor, decode_feed_cursor) or {}
+        per_source = limit if keyset else 50
+        sources = (
+            ("person", "updated_at", list_latest_people_supa),
+            ("post", "created_at", list_latest_posts_supa),
+            ("job", "collected_at", list_latest_jobs_supa),
+        )
+        items = []
+        for kind, ts_key, fetch in sources:
+            for a in fetch(per_source, service=False, cursor=after.get(kind)):
                 a["kind"] = kind
-                a["_ts"] = a.get(ts_key) or a.get("created_at") or a.get("updated_at") or ""
-            return arr
-        items = tag(people, "person", "updated_at") + tag(posts, "post", "created_at") + tag(jobs, "job", "collected_at")
-        items.sort(key=lambda x: x.get("_ts", ""), reverse=True)
+                a["_ts"] = a.get(ts_key) or ""
+                items.append(a)
+        # Each source is already in (ts, id) order past its cursor, so the merged head is exact
+        items.sort(key=lambda x: (x["_ts"], str(x.get("id", ""))), reverse=True)
+        items = items[:limit]
+        nc = None
+        if keyset and len(items) >= limit > 0:
+            # people/posts ids are uuids and jobs ids sha1 hex, and each table orders by its
+            # own column, so a source resumes after its own last row (or where it was)
+            positions = dict(after)
+            for a in items:
+                positions[a["kind"]] = (a["_ts"], str(a["id"]))
+            nc = encode_feed_cursor(positions)
         for a in items:
             a.pop("_ts", None)
-        return items[:100]
+        return {"items": items, "next_cursor": nc} if keyset else items
     # Local fallback: jobs only
+    if keyset:
+        return get_jobs(q=None, status=None, source=None, location=None, date_from=None, date_to=None, limit=limit, offset=0, cursor=cursor)
     return get_jobs(q=None, status=None, source=None, location=None, date_from=None, date_to=None, limit=50, offset=0)
 
 
@@ -472,4 +791,5 @@ def status_bulk(body: BulkStatusInteractions):
 def search(q: str, limit: int = 50):
     if supa_available():
         return search_all_supa(q, limit, service=False)
-    return []
+    with get_read_session() as session:
+        return search_all_local(session, q, limit)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+from .llm import LLMCache, LLMProvider, parse_draft
+from .prompts import COVER_LETTER_TMPL, RESUME_BULLETS_TMPL
+
+DEFAULT_CONCURRENCY = 4  # provider calls in flight per batch
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 1.0  # seconds, doubled per attempt
+MAX_DESCRIPTION_CHARS = 4000
+MAX_KEPT_BATCHES = 20
+
+# kind -> (template, lead column the draft is stored in)
+DRAFT_KINDS = {
+    "cover_letter": (COVER_LETTER_TMPL, "cover_letter_draft"),
+    "resume_bullets": (RESUME_BULLETS_TMPL, "resume_bullets_draft"),
+}
+
+
+def render_prompt(kind: str, job: dict, strengths: str = "", keywords: str = "", style: str = "short") -> str:
+    return DRAFT_KINDS[kind][0].format(
+        title=job.get("title") or "",
+        company=job.get("company") or "",
+        description=(job.get("description") or "")[:MAX_DESCRIPTION_CHARS],
+        strengths=strengths,
+        keywords=keywords or job.get("tags") or "",
+        style=style,
+    )
+
+
+@dataclass
+class DraftResult:
+    id: str
+    ok: bool = False
+    draft: str = ""
+    error: str = ""
+    attempts: int = 0
+    cached: bool = False
+
+
+async def _suggest(
+    provider: LLMProvider, cache: LLMCache | None, kind: str, prompt: str, style: str
+) -> tuple[str, bool]:
+    if cache is not None:
+        return await cache.suggest(provider, kind, prompt, style)
+    return await provider.suggest(kind, prompt), False
+
+
+async def generate_drafts(
+    provider: LLMProvider,
+    jobs: Dict[str, dict],
+    ids: Iterable[str],
+    kind: str,
+    strengths: str = "",
+    keywords: str = "",
+    style: str = "short",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = RETRY_BACKOFF,
+    cache: LLMCache | None = None,
+    store: Callable[[str, str], None] | None = None,
+    on_result: Callable[[DraftResult], None] | None = None,
+) -> List[DraftResult]:
+    """Draft `kind` for each job id, at most `concurrency` provider calls at a time. A failing
+    item is retried on its own with backoff; `store(id, draft)` runs in a worker thread as
+    each draft arrives. Results keep the order of `ids`."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(job_id: str) -> DraftResult:
+        result = DraftResult(job_id)
+        job = jobs.get(job_id)
+        if job is None:
+            result.error = "unknown job"
+        else:
+            prompt = render_prompt(kind, job, strengths, keywords, style)
+            async with sem:
+                for attempt in range(retries + 1):
+                    result.attempts = attempt + 1
+                    try:
+                        text, result.cached = await _suggest(provider, cache, kind, prompt, style)
+                        result.draft, result.ok, result.error = parse_draft(text), True, ""
+                        break
+                    except Exception as e:
+                        result.error = f"{type(e).__name__}: {e}"
+                        if attempt < retries:
+                            await asyncio.sleep(backoff * (2**attempt))
+            if result.ok and store is not None:
+                try:
+                    await asyncio.to_thread(store, job_id, result.draft)
+                except Exception as e:
+                    result.ok, result.error = False, f"store failed: {type(e).__name__}: {e}"
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return list(await asyncio.gather(*(one(i) for i in dict.fromkeys(ids))))
+
+
+@dataclass
+class DraftBatch:
+    id: str
+    kind: str
+    total: int
+    status: str = "queued"  # queued | running | done | failed
+    error: str = ""
+    results: List[DraftResult] = field(default_factory=list)  # in completion order
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "done": len(self.results),
+            "failed": sum(not r.ok for r in self.results),
+            "error": self.error,
+            "results": [asdict(r) for r in self.results],
+        }
+
+
+class DraftBatches:
+    """Background draft batches as tasks on the running event loop, kept for polling."""
+
+    def __init__(self) -> None:
+        self.batches: Dict[str, DraftBatch] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, kind: str, total: int, work: Callable[[DraftBatch], Awaitable[None]]) -> DraftBatch:
+        batch = DraftBatch(uuid.uuid4().hex, kind, total)
+        self.batches[batch.id] = batch
+        task = self._tasks[batch.id] = asyncio.create_task(self._run(batch, work))
+        task.add_done_callback(lambda _t: self._tasks.pop(batch.id, None))
+        self._trim()
+        return batch
+
+    async def _run(self, batch: DraftBatch, work: Callable[[DraftBatch], Awaitable[None]]) -> None:
+        batch.status = "running"
+        try:
+            await work(batch)
+            batch.status = "done"
+        except Exception as e:
+            batch.status, batch.error = "failed", f"{type(e).__name__}: {e}"
+
+    async def wait(self, batch_id: str) -> None:
+        task = self._tasks.get(batch_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    def get(self, batch_id: str) -> DraftBatch | None:
+        return self.batches.get(batch_id)
+
+    def _trim(self) -> None:
+        done = [b for b in self.batches.values() if b.status in ("done", "failed")]
+        for b in done[: max(0, len(self.batches) - MAX_KEPT_BATCHES)]:
+            del self.batches[b.id]
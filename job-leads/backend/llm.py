@@ -1,67 +1,169 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import Dict, List
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, closing
+from typing import AsyncIterator, Dict, List, Tuple
 
 import httpx
 
+from job_agent.metrics import LLM_CACHE_REQUESTS, LLM_SECONDS, timer
+from job_agent.utils import ensure_dir
+
+DEFAULT_CACHE_PATH = "out/llm_cache.sqlite"
+DEFAULT_TTL_HOURS = 168.0
+DEFAULT_MAX_ENTRIES = 5000
+
+
+SYSTEM_PROMPT = "You are a concise, helpful career assistant."
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Shared pooled client, opened and closed by the API's lifespan. Without one (scripts, tests)
+# each call falls back to a short-lived client.
+_CLIENT: httpx.AsyncClient | None = None
+
+
+def open_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _client() -> AsyncIterator[httpx.AsyncClient]:
+    if _CLIENT is not None:
+        yield _CLIENT
+    else:
+        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+            yield client
+
+
+def _messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
 
 class LLMProvider:
+    name = ""
+    model = ""
+
     async def suggest(self, kind: str, prompt: str) -> str:
         raise NotImplementedError
 
+    async def suggest_stream(self, kind: str, prompt: str) -> AsyncIterator[str]:
+        """Yield the response as text chunks as they arrive. Default: one chunk."""
+        yield await self.suggest(kind, prompt)
+
 
 class OllamaProvider(LLMProvider):
+    name = "ollama"
+
     def __init__(self, base: str | None = None, model: str | None = None) -> None:
         self.base = base or os.getenv("OLLAMA_BASE", "http://localhost:11434")
         self.model = model or os.getenv("OLLAMA_MODEL", "llama3:8b")
 
     async def suggest(self, kind: str, prompt: str) -> str:
-        async with httpx.AsyncClient(timeout=60) as client:
-            r = await client.post(
-                f"{self.base}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": "You are a concise, helpful career assistant."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "stream": False,
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            # Ollama returns {message: {content: ...}}
-            return data.get("message", {}).get("content", "")
+        with timer(LLM_SECONDS, provider=self.name, kind=kind):
+            async with _client() as client:
+                r = await client.post(
+                    f"{self.base}/api/chat",
+                    json={"model": self.model, "messages": _messages(prompt), "stream": False},
+                )
+                r.raise_for_status()
+                data = r.json()
+                # Ollama returns {message: {content: ...}}
+                return data.get("message", {}).get("content", "")
+
+    async def suggest_stream(self, kind: str, prompt: str) -> AsyncIterator[str]:
+        body = {"model": self.model, "messages": _messages(prompt), "stream": True}
+        with timer(LLM_SECONDS, provider=self.name, kind=kind):
+            async with _client() as client, client.stream("POST", f"{self.base}/api/chat", json=body) as r:
+                r.raise_for_status()
+                # One JSON object per line: {message: {content: <token>}, done: bool}
+                async for line in r.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    token = data.get("message", {}).get("content", "")
+                    if token:
+                        yield token
+                    if data.get("done"):
+                        break
 
 
 class OpenRouterProvider(LLMProvider):
-    def __init__(self, api_key: str) -> None:
+    name = "openrouter"
+    url = "https://openrouter.ai/api/v1/chat/completions"
+
+    def __init__(self, api_key: str, model: str = "openrouter/auto") -> None:
         self.api_key = api_key
+        self.model = model
 
-    async def suggest(self, kind: str, prompt: str) -> str:
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient(timeout=60) as client:
-            r = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": "openrouter/auto",
-                    "messages": [
-                        {"role": "system", "content": "You are a concise, helpful career assistant."},
-                        {"role": "user", "content": prompt},
-                    ],
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            choices = data.get("choices", [])
-            if choices:
-                return choices[0].get("message", {}).get("content", "")
-            return ""
+
+    async def suggest(self, kind: str, prompt: str) -> str:
+        with timer(LLM_SECONDS, provider=self.name, kind=kind):
+            async with _client() as client:
+                r = await client.post(
+                    self.url,
+                    headers=self._headers(),
+                    json={"model": self.model, "messages": _messages(prompt)},
+                )
+                r.raise_for_status()
+                data = r.json()
+                choices = data.get("choices", [])
+                if choices:
+                    return choices[0].get("message", {}).get("content", "")
+                return ""
+
+    async def suggest_stream(self, kind: str, prompt: str) -> AsyncIterator[str]:
+        body = {"model": self.model, "messages": _messages(prompt), "stream": True}
+        with timer(LLM_SECONDS, provider=self.name, kind=kind):
+            async with _client() as client, client.stream(
+                "POST", self.url, headers=self._headers(), json=body
+            ) as r:
+                r.raise_for_status()
+                # OpenAI-style SSE: `data: {choices: [{delta: {content}}]}` ... `data: [DONE]`
+                async for line in r.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue  # blank separators and ": keep-alive" comments
+                    payload = line[5:].strip()
+                    if payload == "[DONE]":
+                        break
+                    choices = json.loads(payload).get("choices") or [{}]
+                    token = (choices[0].get("delta") or {}).get("content") or ""
+                    if token:
+                        yield token
+
+
+def parse_draft(text: str) -> str:
+    # Prompts ask for JSON {draft: ...}; fall back to the raw text
+    try:
+        return json.loads(text).get("draft", text)
+    except Exception:
+        return text
 
 
 def get_default_provider() -> LLMProvider:
@@ -70,3 +172,175 @@ def get_default_provider() -> LLMProvider:
         return OpenRouterProvider(key)
     return OllamaProvider()
 
+
+def cache_key(provider: str, model: str, kind: str, prompt: str, style: str = "") -> str:
+    raw = json.dumps([provider, model, kind, prompt, style], separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LLMCache:
+    """On-disk cache of provider responses keyed by cache_key, with TTL and LRU eviction.
+    Identical requests that arrive while one is in flight wait for it instead of calling
+    the provider again (single flight, per event loop)."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats: Dict[str, int] = {"hit": 0, "miss": 0, "coalesced": 0}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        if os.path.dirname(path):
+            ensure_dir(os.path.dirname(path))
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, text TEXT, stored_at REAL, last_access REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, closing(self._connect()) as con, con:
+            row = con.execute("SELECT text, stored_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                con.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            con.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        now = time.time()
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT INTO llm_cache (key, text, stored_at, last_access) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET text=excluded.text,"
+                " stored_at=excluded.stored_at, last_access=excluded.last_access",
+                (key, text, now, now),
+            )
+            con.execute("DELETE FROM llm_cache WHERE stored_at < ?", (now - self.ttl_seconds,))
+            # Least recently used beyond max_entries
+            con.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache"
+                " ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute("DELETE FROM llm_cache")
+
+    def _count(self, result: str) -> None:
+        self.stats[result] += 1
+        LLM_CACHE_REQUESTS.inc(result=result)
+
+    async def _join(self, key: str) -> str | None:
+        """Wait for an identical request already in flight; None if there is none or it was
+        cancelled (the caller then makes the upstream call itself)."""
+        pending = self._inflight.get(key)
+        if pending is None:
+            return None
+        try:
+            text = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise  # this request was cancelled, not the one it waited on
+            return None
+        self._count("coalesced")
+        return text
+
+    def _lead(self, key: str) -> asyncio.Future:
+        self._count("miss")
+        fut = self._inflight[key] = asyncio.get_running_loop().create_future()
+        return fut
+
+    def _settle(self, key: str, fut: asyncio.Future, text: str | None, exc: BaseException | None) -> None:
+        self._inflight.pop(key, None)
+        if exc is None:
+            fut.set_result(text)
+        elif isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            fut.cancel()
+        else:
+            fut.set_exception(exc)
+            fut.exception()  # retrieved here, so an unawaited future doesn't warn
+
+    async def suggest(
+        self, provider: LLMProvider, kind: str, prompt: str, style: str = "", force_refresh: bool = False
+    ) -> Tuple[str, bool]:
+        """(text, cached). force_refresh skips the lookup but still stores the new response."""
+        key = cache_key(provider.name, provider.model, kind, prompt, style)
+        if not force_refresh:
+            # sqlite runs in a worker thread so a slow disk doesn't stall the event loop; the
+            # response is stored before the in-flight entry is released, leaving no gap for a miss
+            text = await asyncio.to_thread(self.get, key)
+            if text is not None:
+                self._count("hit")
+                return text, True
+        text = await self._join(key)
+        if text is not None:
+            return text, False
+        fut = self._lead(key)
+        try:
+            text = await provider.suggest(kind, prompt)
+            if text:
+                await asyncio.to_thread(self.put, key, text)
+        except BaseException as e:
+            self._settle(key, fut, None, e)
+            raise
+        self._settle(key, fut, text, None)
+        return text, False
+
+    async def suggest_stream(
+        self, provider: LLMProvider, kind: str, prompt: str, style: str = "", force_refresh: bool = False
+    ) -> AsyncIterator[Tuple[str, bool]]:
+        """Streaming suggest: yields (chunk, cached). A cache hit, or a response another request
+        is already generating, arrives as a single chunk; a completed stream is stored."""
+        key = cache_key(provider.name, provider.model, kind, prompt, style)
+        if not force_refresh:
+            text = await asyncio.to_thread(self.get, key)
+            if text is not None:
+                self._count("hit")
+                yield text, True
+                return
+        text = await self._join(key)
+        if text is not None:
+            yield text, False
+            return
+        fut = self._lead(key)
+        parts: List[str] = []
+        try:
+            async for chunk in provider.suggest_stream(kind, prompt):
+                parts.append(chunk)
+                yield chunk, False
+            text = "".join(parts)
+            if text:
+                await asyncio.to_thread(self.put, key, text)
+        except BaseException as e:
+            self._settle(key, fut, None, e)
+            raise
+        self._settle(key, fut, text, None)
+
+
+_CACHE: LLMCache | None = None
+_CACHE_SETTINGS: dict | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache(cfg: dict | None = None) -> LLMCache | None:
+    global _CACHE, _CACHE_SETTINGS
+    settings = dict((cfg or {}).get("llm_cache") or {})
+    if not settings.get("enabled", False):
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None or settings != _CACHE_SETTINGS:
+            _CACHE = LLMCache(
+                settings.get("path", DEFAULT_CACHE_PATH),
+                float(settings.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600,
+                int(settings.get("max_entries", DEFAULT_MAX_ENTRIES)),
+            )
+            _CACHE_SETTINGS = settings
+        return _CACHE
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 INVITE_TMPL = (
     """
-Return ONLY JSON: {"draft": "..."}.
+Return ONLY JSON: {{"draft": "..."}}.
 Write a ~300 character LinkedIn invite.
 Inputs:
 - Name: {full_name}
@@ -16,7 +16,7 @@ Keep it concise: 1 hook + 1 value + soft CTA.
 
 COMMENT_TMPL = (
     """
-Return ONLY JSON: {"draft": "..."}.
+Return ONLY JSON: {{"draft": "..."}}.
 Write a 1–2 sentence comment adding insight (no praise-only).
 Inputs:
 - Post excerpt: {excerpt}
@@ -27,7 +27,7 @@ Inputs:
 
 COVER_LETTER_TMPL = (
     """
-Return ONLY JSON: {"draft": "..."}.
+Return ONLY JSON: {{"draft": "..."}}.
 Write a short tailored cover letter paragraph + 4–6 resume bullets (quantified where possible).
 Inputs:
 - Job: {title} @ {company}
@@ -41,7 +41,7 @@ Keep it concise and copy-ready.
 
 RESUME_BULLETS_TMPL = (
     """
-Return ONLY JSON: {"draft": "..."}.
+Return ONLY JSON: {{"draft": "..."}}.
 Write 4–6 resume bullets tailored to {title} @ {company}.
 Use impact-first, quantified bullets aligned to: {keywords}
 """
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import base64
+import json
 import os
 import sqlite3
 from typing import Any, Dict, List
@@ -12,7 +14,24 @@ DB_PATH = os.environ.get("JOB_LEADS_DB", "out/jobs.sqlite")
 API_URL = os.environ.get("JOB_LEADS_API", "http://localhost:8000")
 
 
-def load_jobs_via_api(params: dict) -> List[dict] | None:
+PAGE_SIZE = 100
+
+
+# Same opaque format as job_agent.cursor (the dashboard runs without the package on sys.path)
+def encode_cursor(ts: str, rid: str) -> str:
+    raw = json.dumps([ts or "", str(rid)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str] | None:
+    if not cursor:
+        return None
+    ts, rid = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    return ts, rid
+
+
+def load_jobs_via_api(params: dict) -> Dict[str, Any] | None:
+    """One keyset page: {"items": [...], "next_cursor": str | None}."""
     try:
         with httpx.Client(timeout=10.0) as client:
             r = client.get(f"{API_URL}/jobs", params=params)
@@ -23,16 +42,27 @@ def load_jobs_via_api(params: dict) -> List[dict] | None:
     return None
 
 
-def load_jobs_via_db() -> List[dict]:
+def load_jobs_via_db(cursor: str = "", limit: int = PAGE_SIZE) -> Dict[str, Any]:
     try:
-        con = sqlite3.connect(DB_PATH)
-        jobs = pd.read_sql_query("SELECT * FROM jobs ORDER BY collected_at DESC", con).to_dict(
-            orient="records"
-        )
+        # Read-only and tolerant of a concurrent scrape writing to the same file
+        con = sqlite3.connect(DB_PATH, timeout=5.0)
+        con.execute("PRAGMA busy_timeout=5000")
+        con.execute("PRAGMA query_only=ON")
+        after = decode_cursor(cursor)
+        where, args = "", []
+        if after:
+            where = "WHERE collected_at < ? OR (collected_at = ? AND id < ?)"
+            args = [after[0], after[0], after[1]]
+        jobs = pd.read_sql_query(
+            f"SELECT * FROM jobs {where} ORDER BY collected_at DESC, id DESC LIMIT ?",
+            con,
+            params=[*args, limit],
+        ).to_dict(orient="records")
         con.close()
-        return jobs
+        nc = encode_cursor(jobs[-1]["collected_at"], jobs[-1]["id"]) if len(jobs) == limit else None
+        return {"items": jobs, "next_cursor": nc}
     except Exception:
-        return []
+        return {"items": [], "next_cursor": None}
 
 
 def api_post(path: str, json: dict) -> bool:
@@ -43,6 +73,66 @@ def api_post(path: str, json: dict) -> bool:
         return False
 
 
+def api_call(method: str, path: str) -> dict | None:
+    try:
+        r = httpx.request(method, f"{API_URL}{path}", timeout=10.0)
+        return r.json() if r.status_code // 100 == 2 else None
+    except Exception:
+        return None
+
+
+def load_runs(limit: int = 50) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(runs, fetches) from the recorded run history, oldest first, for charting."""
+    runs = api_call("get", f"/runs?limit={limit}&fetches=true")
+    if runs is not None:
+        fetches = [f for r in runs for f in (r.pop("fetches", None) or [])]
+        runs_df, fetches_df = pd.DataFrame(runs), pd.DataFrame(fetches)
+    else:
+        try:
+            con = sqlite3.connect(DB_PATH, timeout=5.0)
+            con.execute("PRAGMA query_only=ON")
+            runs_df = pd.read_sql_query(
+                "SELECT * FROM scrape_runs ORDER BY started_at DESC LIMIT ?", con, params=[limit]
+            )
+            fetches_df = pd.read_sql_query(
+                "SELECT f.* FROM scrape_run_fetches f JOIN"
+                " (SELECT id FROM scrape_runs ORDER BY started_at DESC LIMIT ?) r ON r.id = f.run_id",
+                con,
+                params=[limit],
+            )
+            con.close()
+        except Exception:
+            return pd.DataFrame(), pd.DataFrame()
+    if runs_df.empty:
+        return runs_df, fetches_df
+    runs_df = runs_df.sort_values("started_at")
+    if not fetches_df.empty:
+        fetches_df = fetches_df.merge(runs_df[["id", "started_at"]], left_on="run_id", right_on="id", suffixes=("", "_run"))
+    return runs_df, fetches_df
+
+
+@st.fragment(run_every=2)
+def scrape_progress() -> None:
+    # The scrape runs on the API's background worker; this only polls its status
+    run = api_call("get", f"/runs/{st.session_state['run_id']}")
+    if run is None:
+        st.caption("Scrape status unavailable")
+        return
+    stats = run["stats"]
+    st.caption(
+        f"Scrape {run['status']}: {len(run['fetches'])} fetches, {stats['unique']} unique, "
+        f"{stats['new']} new, {stats['changed']} changed, {stats['skipped']} unchanged, "
+        f"{stats.get('duplicates', 0)} duplicates"
+    )
+    if run["status"] == "failed":
+        st.error(run["error"])
+    if run["status"] in ("done", "failed"):
+        del st.session_state["run_id"]
+        if run["status"] == "done":
+            st.toast(f"Scrape done: {stats['new']} new jobs")
+            st.rerun(scope="app")  # reload the job list with the new rows
+
+
 st.set_page_config(page_title="Job Leads", layout="wide")
 st.title("Job Leads Dashboard")
 
@@ -55,29 +145,51 @@ with st.sidebar:
     st.divider()
     st.write("Data actions")
     if st.button("Run scrape now"):
-        ok = api_post("/run-scrape", json={})
-        st.success("Scrape triggered" if ok else "Failed to trigger scrape")
+        run = api_call("post", "/run-scrape")
+        if run:
+            st.session_state["run_id"] = run["id"]
+        else:
+            st.error("Failed to trigger scrape")
+    if st.session_state.get("run_id"):
+        scrape_progress()
 
 params = {
     "q": q or None,
     "source": source or None,
     "location": location or None,
     "status": status or None,
-    "limit": 500,
+    "limit": PAGE_SIZE,
 }
 
-jobs = load_jobs_via_api(params)
-if jobs is None:
+# Cursors of the pages visited so far; a filter change starts over at the first page
+filters_key = (q, source, location, status)
+if st.session_state.get("filters_key") != filters_key:
+    st.session_state["filters_key"] = filters_key
+    st.session_state["cursors"] = [""]
+cursors: List[str] = st.session_state["cursors"]
+
+page = load_jobs_via_api({**params, "cursor": cursors[-1]})
+if page is None:
     st.warning("API not reachable; reading DB directly.")
-    jobs = load_jobs_via_db()
+    page = load_jobs_via_db(cursors[-1])
+jobs = page["items"]
+
+prev_col, info_col, next_col = st.columns([1, 4, 1])
+if prev_col.button("← Newer", disabled=len(cursors) == 1):
+    cursors.pop()
+    st.rerun()
+info_col.caption(f"Page {len(cursors)} · {len(jobs)} jobs")
+if next_col.button("Older →", disabled=not page.get("next_cursor")):
+    cursors.append(page["next_cursor"])
+    st.rerun()
 
 df = pd.DataFrame(jobs)
 if df.empty:
     st.info("No jobs yet. Try running a scrape.")
     st.stop()
 
-# Simple table view
-cols = ["id", "title", "company", "location", "source", "posted_at", "url"]
+# Simple table view; alt_urls lists the same job posted on other boards
+cols = ["id", "title", "company", "location", "source", "posted_at", "url", "alt_urls"]
 for c in cols:
     if c not in df.columns:
         df[c] = ""
@@ -152,3 +264,25 @@ st.download_button(
     file_name="jobs.csv",
     mime="text/csv",
 )
+
+st.subheader("Scrape Runs")
+runs_df, fetches_df = load_runs()
+if runs_df.empty:
+    st.caption("No recorded runs yet")
+else:
+    trend = runs_df.set_index("started_at")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.caption("Stage durations (s)")
+        st.line_chart(trend[["fetch_seconds", "parse_seconds", "match_seconds", "write_seconds"]])
+    with c2:
+        st.caption("Jobs per run")
+        st.line_chart(trend[["scraped", "deduped", "new", "changed"]])
+    if not fetches_df.empty:
+        st.caption("Mean fetch latency per site (s)")
+        st.line_chart(fetches_df.pivot_table(index="started_at", columns="site", values="seconds", aggfunc="mean"))
+        last = fetches_df[fetches_df["run_id"] == runs_df["id"].iloc[-1]]
+        problems = last[(last["error"] != "") | (last["records"] == 0)]
+        if not problems.empty:
+            st.caption("Latest run: failed or empty fetches")
+            st.dataframe(problems[["site", "term", "records", "bytes", "seconds", "error"]])
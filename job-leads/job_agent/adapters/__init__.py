@@ -1,7 +1,11 @@
 from .greenhouse import fetch_jobs as greenhouse_fetch
+from .greenhouse import fetch_jobs_async as greenhouse_fetch_async
 from .lever import fetch_jobs as lever_fetch
+from .lever import fetch_jobs_async as lever_fetch_async
 from .remoteok import fetch_jobs as remoteok_fetch
+from .remoteok import fetch_jobs_async as remoteok_fetch_async
 from .weworkremotely import fetch_jobs as wwr_fetch
+from .weworkremotely import fetch_jobs_async as wwr_fetch_async
 
 ADAPTERS = {
     "greenhouse": greenhouse_fetch,
@@ -10,3 +14,11 @@ ADAPTERS = {
     "weworkremotely": wwr_fetch,
 }
 
+# Native async variants used by the scrape engine. Sites only present in ADAPTERS
+# (e.g. third-party adapters) are run in a thread pool instead.
+ASYNC_ADAPTERS = {
+    "greenhouse": greenhouse_fetch_async,
+    "lever": lever_fetch_async,
+    "remoteok": remoteok_fetch_async,
+    "weworkremotely": wwr_fetch_async,
+}
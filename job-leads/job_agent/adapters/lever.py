@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import time
 from typing import List
 
-import requests
-
-from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash
+from .. import httpclient
+from ..httpcache import conditional_headers, get_cache, resolve
+from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash, with_content_hash
 
 
 def make_record(item: dict, org: str) -> dict:
@@ -13,7 +12,7 @@ def make_record(item: dict, org: str) -> dict:
     locs = item.get("categories", {})
     location = safe_text(locs.get("location") or item.get("location") or "")
     tags = ",".join(item.get("tags", []) or [])
-    return {
+    return with_content_hash({
         "id": url_hash(url),
         "title": safe_text(item.get("text") or item.get("title")),
         "company": org,
@@ -25,20 +24,36 @@ def make_record(item: dict, org: str) -> dict:
         "source": "lever",
         "collected_at": now_iso(),
         "description": safe_text(item.get("descriptionPlain") or item.get("description") or ""),
-    }
+    })
+
+
+def board_url(org: str) -> str:
+    return f"https://jobs.lever.co/{org}.json"
+
+
+def parse_jobs(data: list, org: str) -> List[dict]:
+    return [make_record(j, org) for j in data]
 
 
 def fetch_jobs(query: str, cfg: dict) -> List[dict]:
     # For Lever, `query` is org slug: jobs.lever.co/{org}.json
     org = query
-    url = f"https://jobs.lever.co/{org}.json"
+    url = board_url(org)
+    cache = get_cache(cfg)
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
-        jobs = [make_record(j, org) for j in data]
-        time.sleep(0.6)
-        return jobs
+        entry = cache.lookup(url) if cache else None
+        headers = {**HEADERS, **conditional_headers(entry)}
+        resp = httpclient.get(url, cfg, headers=headers, timeout=20)
+        return resolve(cache, entry, url, resp, lambda r: parse_jobs(r.json(), org))
     except Exception:
         return []
 
+
+async def fetch_jobs_async(query: str, cfg: dict, client) -> List[dict]:
+    org = query
+    url = board_url(org)
+    cache = get_cache(cfg)
+    entry = cache.lookup(url) if cache else None
+    headers = {**HEADERS, **conditional_headers(entry)}
+    resp = await client.get(url, headers=headers, timeout=20)
+    return resolve(cache, entry, url, resp, lambda r: parse_jobs(r.json(), org))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import importlib.util
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+# Fastest first; "auto" picks the first one that is importable
+PREFERRED = ("selectolax", "lxml", "bs4")
+
+
+class ParserBackend:
+    """Minimal tree API the HTML adapters are written against.
+
+    Every backend must reproduce BeautifulSoup's semantics for the calls below, in particular
+    `text()` == `Tag.get_text(strip=True)`, so all backends yield identical records.
+    """
+
+    name = ""
+
+    def parse(self, html: str) -> Any:
+        raise NotImplementedError
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        raise NotImplementedError
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def text(self, node: Any) -> str:
+        raise NotImplementedError
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class Bs4Backend(ParserBackend):
+    name = "bs4"
+
+    def parse(self, html: str) -> Any:
+        return BeautifulSoup(html, "html.parser")
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return node.select(css)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.select_one(css)
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+_COMPOUND = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$")
+
+
+@lru_cache(maxsize=None)
+def css_to_xpath(css: str) -> str:
+    """Translate the small CSS subset the adapters use (tag.class compounds joined by
+    descendant or `>` combinators) into a relative XPath expression."""
+    parts: List[str] = []
+    axis = ".//"
+    for token in css.replace(">", " > ").split():
+        if token == ">":
+            axis = "/"
+            continue
+        m = _COMPOUND.match(token)
+        if not m or not (m.group(1) or m.group(2)):
+            raise ValueError(f"unsupported selector: {css!r}")
+        step = m.group(1) or "*"
+        for cls in filter(None, m.group(2).split(".")):
+            step += f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+        parts.append(axis + step)
+        axis = "//"
+    return "".join(parts)
+
+
+class LxmlBackend(ParserBackend):
+    name = "lxml"
+
+    def __init__(self) -> None:
+        from lxml import etree, html as lxml_html
+
+        self._etree = etree
+        self._html = lxml_html
+        self._xpaths: Dict[str, Any] = {}
+
+    def _xpath(self, css: str):
+        xp = self._xpaths.get(css)
+        if xp is None:
+            xp = self._xpaths[css] = self._etree.XPath(css_to_xpath(css))
+        return xp
+
+    def parse(self, html: str) -> Any:
+        if not html.strip():
+            return self._html.document_fromstring("<html></html>")
+        return self._html.document_fromstring(html)
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return self._xpath(css)(node)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        found = self._xpath(css)(node)
+        return found[0] if found else None
+
+    def text(self, node: Any) -> str:
+        strings = node.xpath(".//text()[not(parent::script or parent::style or parent::template)]")
+        return "".join(s.strip() for s in strings)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+class SelectolaxBackend(ParserBackend):
+    name = "selectolax"
+
+    def __init__(self) -> None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        return self._parser(html)
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return node.css(css)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.css_first(css)
+
+    def text(self, node: Any) -> str:
+        out = []
+        for child in node.traverse(include_text=True):
+            if child.tag == "-text" and (child.parent is None or child.parent.tag not in _RAW_TEXT):
+                out.append(child.text_content.strip())
+        return "".join(out)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+
+_RAW_TEXT = {"script", "style", "template"}
+
+BACKENDS = {
+    "bs4": (Bs4Backend, ("bs4",)),
+    "lxml": (LxmlBackend, ("lxml",)),
+    "selectolax": (SelectolaxBackend, ("selectolax",)),
+}
+
+
+def available_backends() -> List[str]:
+    return [
+        name
+        for name in PREFERRED
+        if all(importlib.util.find_spec(mod) for mod in BACKENDS[name][1])
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: str | None = None) -> ParserBackend:
+    if not name or name == "auto":
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown html parser backend: {name}")
+    return BACKENDS[name][0]()
@@ -1,17 +1,15 @@
 from __future__ import annotations
 
-import time
 from typing import List
 
-import requests
-from bs4 import BeautifulSoup
-
-from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash
+from .. import httpclient
+from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash, with_content_hash
+from .parsers import get_backend
 
 
 def make_record(row: dict) -> dict:
     url = row.get("url", "")
-    return {
+    return with_content_hash({
         "id": url_hash(url),
         "title": safe_text(row.get("title")),
         "company": safe_text(row.get("company")),
@@ -23,43 +21,60 @@ def make_record(row: dict) -> dict:
         "source": "remoteok",
         "collected_at": now_iso(),
         "description": safe_text(row.get("description")),
-    }
+    })
 
 
-def fetch_jobs(query: str, cfg: dict) -> List[dict]:
+def search_url(query: str) -> str:
     # HTML page: https://remoteok.com/remote-{query}-jobs
     q = query.replace(" ", "-")
-    url = f"https://remoteok.com/remote-{q}-jobs"
+    return f"https://remoteok.com/remote-{q}-jobs"
+
+
+def parse_html(html: str, backend: str | None = None) -> List[dict]:
+    p = get_backend(backend)
+    out: List[dict] = []
+    for tr in p.select(p.parse(html), "tr.job"):
+        try:
+            title_el = p.select_one(tr, "h2")
+            company_el = p.select_one(tr, "h3")
+            link_el = p.select_one(tr, "a.preventLink")
+            if link_el is None:
+                link_el = p.select_one(tr, "a")
+            tags = [p.text(t) for t in p.select(tr, "div.tags > a")]
+            location_el = p.select_one(tr, "div.location")
+            date_el = p.select_one(tr, "time")
+            desc_el = p.select_one(tr, "div.description")
+            href = p.attr(link_el, "href") if link_el is not None else None
+
+            row = {
+                "title": p.text(title_el) if title_el is not None else "",
+                "company": p.text(company_el) if company_el is not None else "",
+                "url": ("https://remoteok.com" + href) if href else "",
+                "tags": tags,
+                "location": p.text(location_el) if location_el is not None else "",
+                "posted_at": to_iso_date(p.attr(date_el, "datetime")) if date_el is not None else "",
+                "salary": "",
+                "description": p.text(desc_el) if desc_el is not None else "",
+            }
+            out.append(make_record(row))
+        except Exception:
+            continue
+    return out
+
+
+def fetch_jobs(query: str, cfg: dict) -> List[dict]:
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = httpclient.get(search_url(query), cfg, headers=HEADERS, timeout=20)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        out: List[dict] = []
-        for tr in soup.select("tr.job"):
-            try:
-                title_el = tr.select_one("h2")
-                company_el = tr.select_one("h3")
-                link_el = tr.select_one("a.preventLink") or tr.select_one("a")
-                tags = [t.get_text(strip=True) for t in tr.select("div.tags > a")]
-                location_el = tr.select_one("div.location")
-                date_el = tr.select_one("time")
-                desc_el = tr.select_one("div.description")
-
-                row = {
-                    "title": title_el.get_text(strip=True) if title_el else "",
-                    "company": company_el.get_text(strip=True) if company_el else "",
-                    "url": ("https://remoteok.com" + link_el.get("href")) if link_el and link_el.get("href") else "",
-                    "tags": tags,
-                    "location": location_el.get_text(strip=True) if location_el else "",
-                    "posted_at": to_iso_date(date_el.get("datetime")) if date_el else "",
-                    "salary": "",
-                    "description": desc_el.get_text(strip=True) if desc_el else "",
-                }
-                out.append(make_record(row))
-            except Exception:
-                continue
-        time.sleep(0.6)
+        with httpclient.metered("parse_seconds"):
+            out = parse_html(resp.text, cfg.get("html_parser"))
         return out
     except Exception:
         return []
 
+
+async def fetch_jobs_async(query: str, cfg: dict, client) -> List[dict]:
+    resp = await client.get(search_url(query), headers=HEADERS, timeout=20)
+    resp.raise_for_status()
+    with httpclient.metered("parse_seconds"):
+        return parse_html(resp.text, cfg.get("html_parser"))
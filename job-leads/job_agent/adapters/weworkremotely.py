@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-import time
 from typing import List
 
 import requests
-from bs4 import BeautifulSoup
 
-from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash
+from .. import httpclient
+from ..utils import HEADERS, now_iso, safe_text, to_iso_date, url_hash, with_content_hash
+from .parsers import get_backend
 
 
 def make_record(row: dict) -> dict:
     url = row.get("url", "")
-    return {
+    return with_content_hash({
         "id": url_hash(url),
         "title": safe_text(row.get("title")),
         "company": safe_text(row.get("company")),
@@ -23,40 +23,57 @@ def make_record(row: dict) -> dict:
         "source": "weworkremotely",
         "collected_at": now_iso(),
         "description": safe_text(row.get("description")),
-    }
+    })
 
 
-def fetch_jobs(query: str, cfg: dict) -> List[dict]:
+def search_url(query: str) -> str:
     # HTML search: https://weworkremotely.com/remote-jobs/search?term={query}
-    url = "https://weworkremotely.com/remote-jobs/search?term=" + requests.utils.quote(query)
+    return "https://weworkremotely.com/remote-jobs/search?term=" + requests.utils.quote(query)
+
+
+def parse_html(html: str, backend: str | None = None) -> List[dict]:
+    p = get_backend(backend)
+    out: List[dict] = []
+    for section in p.select(p.parse(html), "section.jobs"):  # sections contain lists
+        for li in p.select(section, "li"):  # individual jobs or header dividers
+            a = p.select_one(li, "a")
+            href = p.attr(a, "href") if a is not None else None
+            if not href or "/remote-jobs/" not in href:
+                continue
+            url = "https://weworkremotely.com" + href
+            company = p.select_one(li, "span.company")
+            title = p.select_one(li, "span.title")
+            region = p.select_one(li, "span.region.company")
+            if region is None:
+                region = p.select_one(li, "span.region")
+            tags = [p.text(t) for t in p.select(li, "span.tag")]
+            row = {
+                "title": p.text(title) if title is not None else "",
+                "company": p.text(company) if company is not None else "",
+                "url": url,
+                "tags": tags,
+                "location": p.text(region) if region is not None else "",
+                "posted_at": "",
+                "salary": "",
+                "description": "",
+            }
+            out.append(make_record(row))
+    return out
+
+
+def fetch_jobs(query: str, cfg: dict) -> List[dict]:
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = httpclient.get(search_url(query), cfg, headers=HEADERS, timeout=20)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        out: List[dict] = []
-        for section in soup.select("section.jobs"):  # sections contain lists
-            for li in section.select("li"):  # individual jobs or header dividers
-                a = li.select_one("a")
-                if not a or not a.get("href") or "/remote-jobs/" not in a.get("href"):
-                    continue
-                url = "https://weworkremotely.com" + a.get("href")
-                company = li.select_one("span.company")
-                title = li.select_one("span.title")
-                region = li.select_one("span.region.company") or li.select_one("span.region")
-                tags = [t.get_text(strip=True) for t in li.select("span.tag")]
-                row = {
-                    "title": title.get_text(strip=True) if title else "",
-                    "company": company.get_text(strip=True) if company else "",
-                    "url": url,
-                    "tags": tags,
-                    "location": region.get_text(strip=True) if region else "",
-                    "posted_at": "",
-                    "salary": "",
-                    "description": "",
-                }
-                out.append(make_record(row))
-        time.sleep(0.6)
+        with httpclient.metered("parse_seconds"):
+            out = parse_html(resp.text, cfg.get("html_parser"))
         return out
     except Exception:
         return []
 
+
+async def fetch_jobs_async(query: str, cfg: dict, client) -> List[dict]:
+    resp = await client.get(search_url(query), headers=HEADERS, timeout=20)
+    resp.raise_for_status()
+    with httpclient.metered("parse_seconds"):
+        return parse_html(resp.text, cfg.get("html_parser"))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Dict, Tuple
+
+Cursor = Tuple[str, str]  # (timestamp, id) of the last row already returned
+FeedCursor = Dict[str, Cursor]  # one position per merged source, e.g. {"job": (ts, id)}
+
+
+def _encode(value) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def encode_cursor(ts: str, rid: str) -> str:
+    return _encode([ts or "", str(rid)])
+
+
+def decode_cursor(cursor: str | None) -> Cursor | None:
+    """None/"" -> first page. Raises ValueError for anything we didn't issue."""
+    if not cursor:
+        return None
+    data = _decode(cursor)
+    if not isinstance(data, list) or len(data) != 2:
+        raise ValueError("invalid cursor")
+    ts, rid = data
+    if not isinstance(ts, str) or not isinstance(rid, str):
+        raise ValueError("invalid cursor")
+    return ts, rid
+
+
+def encode_feed_cursor(positions: FeedCursor) -> str:
+    return _encode({k: [ts or "", str(rid)] for k, (ts, rid) in positions.items()})
+
+
+def decode_feed_cursor(cursor: str | None) -> FeedCursor | None:
+    """Like decode_cursor, for pages merged from several sources: each source resumes after
+    its own last row, as their timestamp columns and id types differ."""
+    if not cursor:
+        return None
+    data = _decode(cursor)
+    if not isinstance(data, dict):
+        raise ValueError("invalid cursor")
+    out: FeedCursor = {}
+    for k, pos in data.items():
+        if not (isinstance(pos, list) and len(pos) == 2 and all(isinstance(v, str) for v in pos)):
+            raise ValueError("invalid cursor")
+        out[k] = (pos[0], pos[1])
+    return out
+
+
+def next_cursor(rows: list, limit: int, ts_key: str) -> str | None:
+    """Cursor for the page after `rows`, or None when this page was the last."""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    last = rows[-1]
+    get = last.get if isinstance(last, dict) else lambda k: getattr(last, k)
+    return encode_cursor(get(ts_key) or "", get("id"))
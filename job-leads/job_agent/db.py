@@ -1,25 +1,222 @@
 from __future__ import annotations
 
 import os
+import re
+import time
 from contextlib import contextmanager
-from typing import Iterable, Sequence
+from typing import Dict, Iterable, List, Sequence
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import bindparam, column, create_engine, event, func, inspect, literal_column, select, table, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, sessionmaker
 
-from .models import Base, Job, Lead
+from .metrics import DB_QUERY_SECONDS, enabled as metrics_enabled
+from .models import Base, Job, Lead, RunFetchRecord, ScrapeRunRecord
 from .utils import ensure_dir, now_iso
 
 
 DEFAULT_DB_PATH = os.environ.get("JOB_LEADS_DB", "out/jobs.sqlite")
+DEFAULT_READ_POOL_SIZE = int(os.environ.get("JOB_LEADS_DB_READ_POOL", "5"))
 ensure_dir(os.path.dirname(DEFAULT_DB_PATH))
 
-engine = create_engine(f"sqlite:///{DEFAULT_DB_PATH}", future=True)
+# Applied to every new connection. WAL lets readers (API, dashboard) proceed while a scrape
+# writes; busy_timeout makes the remaining writer/writer contention wait instead of failing.
+SQLITE_PROFILE = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,  # ms
+    "cache_size": -65536,  # negative = KiB, i.e. 64 MiB
+    "mmap_size": 268435456,  # 256 MiB
+    "temp_store": "memory",
+}
+_PRAGMA_VALUE = re.compile(r"^-?\w+$")
+
+
+def configure_sqlite(cfg: dict | None) -> dict:
+    """Merge the `sqlite` section of config.yaml into the profile used for new connections."""
+    for k, v in ((cfg or {}).get("sqlite") or {}).items():
+        if k in SQLITE_PROFILE:
+            SQLITE_PROFILE[k] = v
+    return SQLITE_PROFILE
+
+
+def apply_pragmas(dbapi_conn, read_only: bool = False) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        for k, v in SQLITE_PROFILE.items():
+            if v is None or not _PRAGMA_VALUE.match(str(v)):
+                continue
+            cur.execute(f"PRAGMA {k}={v}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+    finally:
+        cur.close()
+
+
+def make_engine(path: str, read_only: bool = False, pool_size: int = DEFAULT_READ_POOL_SIZE) -> Engine:
+    kwargs = {"pool_size": pool_size, "max_overflow": pool_size} if read_only else {}
+    eng = create_engine(f"sqlite:///{path}", future=True, **kwargs)
+    event.listen(eng, "connect", lambda conn, _rec: apply_pragmas(conn, read_only))
+    event.listen(eng, "before_cursor_execute", _query_started)
+    event.listen(eng, "after_cursor_execute", _query_finished)
+    return eng
+
+
+def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    if metrics_enabled() and context is not None:
+        context._started = time.perf_counter()
+
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, "_started", None)
+    if start is not None:
+        # op is the statement verb (SELECT, INSERT, ...) to keep label cardinality fixed
+        op = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, backend="sqlite", op=op)
+
+
+engine = make_engine(DEFAULT_DB_PATH)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Separate pooled, query_only engine for API reads so they never queue behind the writer
+read_engine = make_engine(DEFAULT_DB_PATH, read_only=True)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True)
+
+
+_INITIALIZED = False
 
 
 def init_db() -> None:
+    """Create and upgrade the schema of the default database; a no-op after the first call."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
     Base.metadata.create_all(engine)
+    ensure_schema(engine)
+    ensure_fts(engine)
+    _INITIALIZED = True
+
+
+_UPGRADED: set = set()
+
+
+def ensure_schema(eng: Engine) -> None:
+    """create_all skips tables that already exist, so columns and indexes added to the models
+    later are created here (columns as nullable with their scalar default)."""
+    key = str(eng.url)
+    if key in _UPGRADED:
+        return
+    insp = inspect(eng)
+    with eng.begin() as conn:
+        for t in Base.metadata.sorted_tables:
+            have = {c["name"] for c in insp.get_columns(t.name)}
+            for col in t.columns:
+                if col.name in have:
+                    continue
+                ddl = f"ALTER TABLE {t.name} ADD COLUMN {col.name} {col.type.compile(eng.dialect)}"
+                default = col.default.arg if col.default is not None and col.default.is_scalar else None
+                if isinstance(default, str):
+                    ddl += " DEFAULT '" + default.replace("'", "''") + "'"
+                elif isinstance(default, (int, float)):
+                    ddl += f" DEFAULT {int(default) if isinstance(default, bool) else default}"
+                conn.exec_driver_sql(ddl)
+    for t in Base.metadata.sorted_tables:
+        for idx in t.indexes:
+            idx.create(eng, checkfirst=True)
+    _UPGRADED.add(key)
+
+
+# Full-text index over jobs, kept in sync by triggers. External content: the index stores
+# only tokens and reads column values back from `jobs` by rowid.
+FTS_COLUMNS = ("title", "company", "tags", "description")
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0)  # bm25 weight per column, same order
+_FTS_COLS = ", ".join(FTS_COLUMNS)
+_FTS_NEW = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_FTS_OLD = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+_FTS_CHANGED = " OR ".join(f"old.{c} IS NOT new.{c}" for c in FTS_COLUMNS)
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5({_FTS_COLS},"
+    " content='jobs', content_rowid='rowid', tokenize='porter unicode61', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN"
+    f" INSERT INTO jobs_fts(rowid, {_FTS_COLS}) VALUES (new.rowid, {_FTS_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN"
+    f" INSERT INTO jobs_fts(jobs_fts, rowid, {_FTS_COLS}) VALUES ('delete', old.rowid, {_FTS_OLD}); END",
+    # Re-scrapes rewrite every row; only reindex when a searchable column actually changed
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE ON jobs WHEN {_FTS_CHANGED} BEGIN"
+    f" INSERT INTO jobs_fts(jobs_fts, rowid, {_FTS_COLS}) VALUES ('delete', old.rowid, {_FTS_OLD});"
+    f" INSERT INTO jobs_fts(rowid, {_FTS_COLS}) VALUES (new.rowid, {_FTS_NEW}); END",
+)
+_FTS_READY: dict = {}
+_FTS_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_fts(eng: Engine) -> bool:
+    """Create the FTS5 table and triggers once per engine; False when SQLite lacks FTS5."""
+    key = str(eng.url)
+    if key in _FTS_READY:
+        return _FTS_READY[key]
+    try:
+        with eng.begin() as conn:
+            existed = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'"
+            ).first()
+            for ddl in FTS_DDL:
+                conn.exec_driver_sql(ddl)
+            if not existed:
+                # Index rows written before the table existed
+                conn.exec_driver_sql("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        ready = True
+    except OperationalError:  # no such module: fts5
+        ready = False
+    _FTS_READY[key] = ready
+    return ready
+
+
+def fts_available(bind: Engine | None = None) -> bool:
+    return _FTS_READY.get(str((bind or engine).url), False)
+
+
+def fts_query(q: str) -> str:
+    """Free text -> FTS5 query: every word must match, each as a prefix ("ux des" finds
+    "UX Designer"). Words are quoted so user input can't inject FTS syntax."""
+    return " ".join(f'"{t}"*' for t in _FTS_TOKEN.findall(q.lower()))
+
+
+def fts_match(q: str, top: int | None = None):
+    """Subquery of (rowid, rank) for jobs matching q; lower rank is better (bm25).
+    `top` ranks and cuts inside the index, so only that many rows are joined back to jobs;
+    only pass it when no other filter can drop rows afterwards."""
+    fts = table("jobs_fts", column("rowid"))
+    rank = func.bm25(literal_column("jobs_fts"), *FTS_WEIGHTS).label("rank")
+    stmt = select(fts.c.rowid, rank).where(literal_column("jobs_fts").op("MATCH")(fts_query(q)))
+    if top is not None:
+        stmt = stmt.order_by(rank).limit(top)
+    return stmt.subquery("fts")
+
+
+def search_all_local(session: Session, q: str, limit: int = 50) -> List[dict]:
+    """Local counterpart of the `search_all` RPC (supabase/migrations/002_network.sql).
+    Only jobs live in SQLite, so every hit has kind "job"."""
+    if not fts_query(q):
+        return []
+    if fts_available(session.get_bind()):
+        m = fts_match(q, top=limit)
+        stmt = (
+            select(Job.id, Job.title, Job.company, Job.url)
+            .join(m, m.c.rowid == literal_column("jobs.rowid"))
+            .order_by(m.c.rank)
+        )
+    else:
+        pattern = f"%{q.lower()}%"
+        stmt = select(Job.id, Job.title, Job.company, Job.url).where(
+            Job.title.ilike(pattern) | Job.description.ilike(pattern) | Job.tags.ilike(pattern)
+        )
+    rows = session.execute(stmt.limit(limit)).all()
+    return [
+        {"kind": "job", "rid": r.id, "title": r.title, "subtitle": r.company or "", "url": r.url}
+        for r in rows
+    ]
 
 
 @contextmanager
@@ -36,41 +233,85 @@ def get_session() -> Iterable[Session]:
         session.close()
 
 
+@contextmanager
+def get_read_session() -> Iterable[Session]:
+    # query_only connections cannot run DDL; init_db() runs at API startup instead
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+JOB_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "location",
+    "salary",
+    "tags",
+    "posted_at",
+    "url",
+    "source",
+    "collected_at",
+    "description",
+    "content_hash",
+)
+BULK_CHUNK_SIZE = 500
+
+
+def _job_upsert_stmt(columns: Iterable[str]):
+    stmt = sqlite_insert(Job.__table__)
+    # Update fields that belong to the job record only
+    return stmt.on_conflict_do_update(
+        index_elements=["id"], set_={c: stmt.excluded[c] for c in columns if c != "id"}
+    )
+
+
 def upsert_job(session: Session, data: dict) -> Job:
-    job = session.get(Job, data["id"])  # type: ignore
-    allowed = {
-        "id",
-        "title",
-        "company",
-        "location",
-        "salary",
-        "tags",
-        "posted_at",
-        "url",
-        "source",
-        "collected_at",
-        "description",
-    }
-    if job is None:
-        job = Job(**{k: v for k, v in data.items() if k in allowed})
-        session.add(job)
-    else:
-        # Update fields that belong to the job record only
-        for k in [
-            "title",
-            "company",
-            "location",
-            "salary",
-            "tags",
-            "posted_at",
-            "url",
-            "source",
-            "collected_at",
-            "description",
-        ]:
-            if k in data:
-                setattr(job, k, data.get(k, getattr(job, k)))
-    return job
+    row = {k: v for k, v in data.items() if k in JOB_FIELDS}
+    session.execute(_job_upsert_stmt(row.keys()).values(**row))
+    return session.get(Job, data["id"], populate_existing=True)  # type: ignore
+
+
+def bulk_upsert_jobs(
+    session: Session, records: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE
+) -> List[str]:
+    """Set-based upsert: one `SELECT id ... IN` plus one executemany of
+    `INSERT ... ON CONFLICT(id) DO UPDATE` per chunk, no ORM objects.
+    Returns the ids that did not exist before, in input order."""
+    conn = session.connection()
+    stmt = _job_upsert_stmt(JOB_FIELDS)
+    new_ids: List[str] = []
+    chunk: List[dict] = []
+
+    def flush() -> None:
+        ids = list(dict.fromkeys(r["id"] for r in chunk))
+        existing = set(conn.execute(select(Job.id).where(Job.id.in_(ids))).scalars())
+        conn.execute(stmt, chunk)
+        new_ids.extend(i for i in ids if i not in existing)
+        chunk.clear()
+
+    for r in records:
+        chunk.append({k: r.get(k) if r.get(k) is not None else "" for k in JOB_FIELDS})
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return new_ids
+
+
+def known_hashes(session: Session, ids: Sequence[str]) -> Dict[str, str]:
+    """id -> stored content_hash for the ids that already exist."""
+    out: Dict[str, str] = {}
+    ids = list(dict.fromkeys(ids))
+    for i in range(0, len(ids), BULK_CHUNK_SIZE):
+        rows = session.execute(
+            select(Job.id, Job.content_hash).where(Job.id.in_(ids[i : i + BULK_CHUNK_SIZE]))
+        )
+        out.update({r.id: r.content_hash or "" for r in rows})
+    return out
 
 
 def upsert_lead(session: Session, lead_id: str, data: dict) -> Lead:
@@ -89,3 +330,48 @@ def get_new_job_ids_since(session: Session, iso_timestamp: str) -> Sequence[str]
     stmt = select(Job.id).where(Job.collected_at > iso_timestamp)
     rows = session.execute(stmt).scalars().all()
     return rows
+
+
+def set_alt_urls(session: Session, alt_urls: Dict[str, str]) -> None:
+    """One executemany UPDATE; alt_urls is not part of JOB_FIELDS so upserts keep it. Ids
+    missing from this database (stored only in Supabase) are skipped."""
+    if alt_urls:
+        stmt = update(Job.__table__).where(Job.id == bindparam("job_id")).values(alt_urls=bindparam("urls"))
+        session.connection().execute(stmt, [{"job_id": i, "urls": u} for i, u in alt_urls.items()])
+
+
+def lead_ids_with_status(session: Session, status: str) -> Sequence[str]:
+    stmt = select(Lead.id).where(func.lower(Lead.status) == status.lower())
+    return session.execute(stmt).scalars().all()
+
+
+def _columns_of(model) -> List[str]:
+    return [c.name for c in model.__table__.columns]
+
+
+def insert_run(session: Session, run: dict, fetches: Sequence[dict]) -> None:
+    fetch_cols = [c for c in _columns_of(RunFetchRecord) if c not in ("id", "run_id")]
+    session.merge(ScrapeRunRecord(**{k: v for k, v in run.items() if k in _columns_of(ScrapeRunRecord)}))
+    session.add_all(
+        RunFetchRecord(run_id=run["id"], **{k: f[k] for k in fetch_cols if k in f}) for f in fetches
+    )
+
+
+def list_runs(session: Session, limit: int = 50, with_fetches: bool = False) -> List[dict]:
+    """Most recent runs first, as dicts; with_fetches adds each run's (site, term) rows."""
+    run_cols = _columns_of(ScrapeRunRecord)
+    runs = session.execute(
+        select(ScrapeRunRecord).order_by(ScrapeRunRecord.started_at.desc()).limit(limit)
+    ).scalars().all()
+    out = [{c: getattr(r, c) for c in run_cols} for r in runs]
+    if with_fetches and out:
+        fetch_cols = [c for c in _columns_of(RunFetchRecord) if c != "id"]
+        by_run: Dict[str, List[dict]] = {r["id"]: [] for r in out}
+        rows = session.execute(
+            select(RunFetchRecord).where(RunFetchRecord.run_id.in_(list(by_run))).order_by(RunFetchRecord.id)
+        ).scalars()
+        for f in rows:
+            by_run[f.run_id].append({c: getattr(f, c) for c in fetch_cols})
+        for r in out:
+            r["fetches"] = by_run[r["id"]]
+    return out
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from . import httpclient, metrics
+from .adapters import ADAPTERS, ASYNC_ADAPTERS
+from .ratelimit import RETRY_STATUSES, RateLimiter, get_limiter
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 2
+
+_DONE = object()
+
+
+@dataclass
+class FetchStat:
+    """Outcome of one (site, term) fetch, reported to the `observer` of stream_fetches."""
+
+    site: str
+    term: str
+    records: int
+    seconds: float
+    error: str = ""  # exception class name when the adapter failed
+    bytes: int = 0  # response bodies downloaded (decoded size)
+    parse_seconds: float = 0.0
+
+
+Observer = Callable[[FetchStat], None]
+
+
+class HostLimitedClient:
+    """Thin wrapper over an httpx.AsyncClient that bounds in-flight requests per host
+    and paces them through the shared per-host token buckets."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, per_host: int, limiter: RateLimiter | None = None
+    ) -> None:
+        self.client = client
+        self.per_host = max(1, per_host)
+        self.limiter = limiter or RateLimiter()
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def gate(self, key: str) -> asyncio.Semaphore:
+        sem = self._hosts.get(key)
+        if sem is None:
+            sem = self._hosts[key] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        host = urlparse(url).netloc
+        attempt = 0
+        async with self.gate(host):
+            while True:
+                await self.limiter.acquire_async(host)
+                resp = await self.client.get(url, **kwargs)
+                httpclient.meter("bytes", httpclient.body_size(resp))
+                metrics.HTTP_CLIENT_RESPONSES.inc(host=host, status=str(resp.status_code))
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.limiter.max_retries:
+                    return resp
+                # Blocks the host's bucket, so the next acquire waits out Retry-After
+                self.limiter.backoff(host, resp.headers, attempt)
+                attempt += 1
+
+
+def concurrency_settings(cfg: dict) -> Tuple[int, int]:
+    conc = cfg.get("concurrency") or {}
+    limit = int(conc.get("global", DEFAULT_CONCURRENCY))
+    per_host = int(conc.get("per_host", DEFAULT_PER_HOST))
+    return max(1, limit), max(1, per_host)
+
+
+async def stream_fetches(
+    cfg: dict, sites: List[str], terms: List[str], observer: Observer | None = None
+) -> AsyncIterator[Tuple[str, str, List[dict]]]:
+    """Yield (site, term, jobs) as each fetch completes. At most `concurrency.global` fetches
+    are in flight and at most as many finished results wait for the consumer. `observer`
+    gets a FetchStat per fetch, on the event loop, as soon as it finishes."""
+    limit, per_host = concurrency_settings(cfg)
+    sem = asyncio.Semaphore(limit)
+    done: asyncio.Queue = asyncio.Queue(maxsize=limit)
+    loop = asyncio.get_running_loop()
+    pairs = [
+        (site, term)
+        for site in sites
+        if site in ASYNC_ADAPTERS or site in ADAPTERS
+        for term in terms
+    ]
+
+    async with httpclient.async_client(cfg) as client:
+        fetcher = HostLimitedClient(client, per_host, get_limiter(cfg))
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="adapter") as pool:
+
+            async def one(site: str, term: str) -> None:
+                error = ""
+                async with sem:
+                    start = time.perf_counter()
+                    m = httpclient.start_meter()  # this task's own context
+                    try:
+                        if site in ASYNC_ADAPTERS:
+                            jobs = await ASYNC_ADAPTERS[site](term, cfg, fetcher)
+                        else:
+                            # Sync third-party adapters: no URL to key on, so gate per site.
+                            # The copied context carries the meter into the worker thread.
+                            ctx = contextvars.copy_context()
+                            async with fetcher.gate(f"adapter:{site}"):
+                                jobs = await loop.run_in_executor(pool, ctx.run, ADAPTERS[site], term, cfg)
+                    except Exception as e:
+                        jobs, error = [], type(e).__name__
+                    jobs = jobs if jobs is not None else []
+                    seconds = time.perf_counter() - start
+                    metrics.FETCH_SECONDS.observe(seconds, site=site)
+                    if error:
+                        metrics.FETCH_ERRORS.inc(site=site, error=error)
+                    if observer is not None:
+                        observer(FetchStat(
+                            site, term, len(jobs), seconds, error, int(m["bytes"]), m["parse_seconds"]
+                        ))
+                await done.put((site, term, jobs))
+
+            tasks = [asyncio.create_task(one(site, term)) for site, term in pairs]
+            try:
+                for _ in pairs:
+                    yield await done.get()
+            finally:
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fetch_all(
+    cfg: dict, sites: List[str], terms: List[str]
+) -> List[Tuple[str, str, List[dict]]]:
+    """Run every (site, term) fetch concurrently; results keep the serial site × term order."""
+    order: Dict[Tuple[str, str], int] = {}
+    for site in sites:
+        for term in terms:
+            order.setdefault((site, term), len(order))
+    results = [item async for item in stream_fetches(cfg, sites, terms)]
+    return sorted(results, key=lambda r: order[(r[0], r[1])])
+
+
+def run_fetches(cfg: dict, sites: List[str], terms: List[str]) -> List[Tuple[str, str, List[dict]]]:
+    return asyncio.run(fetch_all(cfg, sites, terms))
+
+
+def iter_fetches(
+    cfg: dict, sites: List[str], terms: List[str], observer: Observer | None = None
+) -> Iterator[Tuple[str, str, List[dict]]]:
+    """Synchronous view of stream_fetches: the event loop runs in a background thread and
+    hands results over through a small bounded queue, so callers consume incrementally."""
+    handoff: queue.Queue = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce() -> None:
+        loop = asyncio.get_running_loop()
+        agen = stream_fetches(cfg, sites, terms, observer)
+        try:
+            async for item in agen:
+                if not await loop.run_in_executor(None, put, item):
+                    break
+        finally:
+            await agen.aclose()
+
+    def worker() -> None:
+        try:
+            asyncio.run(produce())
+        except BaseException as e:  # surfaced to the consumer below
+            put(e)
+        finally:
+            put(_DONE)
+
+    thread = threading.Thread(target=worker, name="scrape-engine", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
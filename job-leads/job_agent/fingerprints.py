@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, Sequence, Tuple
+
+from .utils import ensure_dir
+
+DEFAULT_INDEX_PATH = "out/fingerprints.sqlite"
+_CHUNK = 500
+
+
+class FingerprintIndex:
+    """id -> content_hash of the jobs last written to Supabase, kept in a local SQLite file so
+    a run can tell unchanged postings apart without fetching them from the server. Losing the
+    file only means the next run rewrites everything once. The run still checks that skipped
+    ids exist on the server, so a reset project is refilled; what it cannot see is a row
+    another machine rewrote with other content, which stays until the posting changes again
+    (delete the file to force a full rewrite)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            ensure_dir(os.path.dirname(path))
+        with closing(self._connect()) as con, con:
+            con.execute("CREATE TABLE IF NOT EXISTS fingerprints (id TEXT PRIMARY KEY, hash TEXT)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, ids: Sequence[str]) -> Dict[str, str]:
+        ids = list(dict.fromkeys(ids))
+        out: Dict[str, str] = {}
+        with self._lock, closing(self._connect()) as con:
+            for i in range(0, len(ids), _CHUNK):
+                chunk = ids[i : i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                out.update(
+                    con.execute(f"SELECT id, hash FROM fingerprints WHERE id IN ({marks})", chunk)
+                )
+        return out
+
+    def update(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        with self._lock, closing(self._connect()) as con, con:
+            con.executemany(
+                "INSERT INTO fingerprints (id, hash) VALUES (?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET hash = excluded.hash",
+                [(i, h) for i, h in pairs if h],
+            )
+
+
+_INDEX: FingerprintIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_fingerprint_index(cfg: dict | None = None) -> FingerprintIndex:
+    global _INDEX
+    path = (cfg or {}).get("fingerprint_index") or DEFAULT_INDEX_PATH
+    with _INDEX_LOCK:
+        if _INDEX is None or _INDEX.path != path:
+            _INDEX = FingerprintIndex(path)
+        return _INDEX
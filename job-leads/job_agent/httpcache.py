@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping
+
+from .httpclient import metered
+from .utils import ensure_dir
+
+DEFAULT_CACHE_PATH = "out/http_cache.sqlite"
+DEFAULT_TTL_HOURS = 72.0
+DEFAULT_MAX_MB = 200.0
+
+
+class NotModified(list):
+    """Cached records returned on a 304. They go through the same pipeline as fresh ones: the
+    stored content hashes skip rows that are already written, and anything the store is
+    missing (a failed write, a reset database, a config change that now keeps it) is written."""
+
+    not_modified = True
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: str
+    last_modified: str
+    records: List[dict]
+    stored_at: float
+
+
+class HTTPCache:
+    """On-disk conditional-GET cache keyed by URL. Holds the response validators and the
+    parsed records for the body, so a 304 needs neither the payload nor a re-parse."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            ensure_dir(os.path.dirname(path))
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache ("
+                " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT,"
+                " size INTEGER, stored_at REAL, last_access REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        with self._lock, closing(self._connect()) as con, con:
+            row = con.execute(
+                "SELECT etag, last_modified, body, stored_at FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[3] > self.ttl_seconds:
+                con.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+                return None
+        return CacheEntry(url, row[0] or "", row[1] or "", json.loads(row[2]), row[3])
+
+    def store(self, url: str, headers: Mapping, records: List[dict]) -> None:
+        etag = headers.get("ETag") or headers.get("etag") or ""
+        last_modified = headers.get("Last-Modified") or headers.get("last-modified") or ""
+        if not etag and not last_modified:
+            return
+        body = json.dumps(records, separators=(",", ":"))
+        now = time.time()
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT INTO http_cache (url, etag, last_modified, body, size, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET etag=excluded.etag,"
+                " last_modified=excluded.last_modified, body=excluded.body, size=excluded.size,"
+                " stored_at=excluded.stored_at, last_access=excluded.last_access",
+                (url, etag, last_modified, body, len(body), now, now),
+            )
+            self._evict(con)
+
+    def touch(self, url: str) -> None:
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute("UPDATE http_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+
+    def _evict(self, con: sqlite3.Connection) -> None:
+        con.execute("DELETE FROM http_cache WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Least recently used first
+        for url, size in con.execute(
+            "SELECT url, size FROM http_cache ORDER BY last_access ASC"
+        ).fetchall():
+            con.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute("DELETE FROM http_cache")
+
+
+def conditional_headers(entry: CacheEntry | None) -> Dict[str, str]:
+    if entry is None:
+        return {}
+    headers = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def resolve(
+    cache: HTTPCache | None, entry: CacheEntry | None, url: str, resp, parse: Callable
+) -> List[dict]:
+    """Turn a (possibly conditional) response into records, short-circuiting on 304."""
+    if cache is not None and entry is not None and resp.status_code == 304:
+        cache.touch(url)
+        return NotModified(entry.records)
+    resp.raise_for_status()
+    with metered("parse_seconds"):
+        records = parse(resp)
+    if cache is not None:
+        cache.store(url, resp.headers or {}, records)
+    return records
+
+
+_CACHE: HTTPCache | None = None
+_CACHE_SETTINGS: dict | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache(cfg: dict | None = None) -> HTTPCache | None:
+    global _CACHE, _CACHE_SETTINGS
+    settings = dict((cfg or {}).get("http_cache") or {})
+    if not settings.get("enabled", False):
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None or settings != _CACHE_SETTINGS:
+            _CACHE = HTTPCache(
+                settings.get("path", DEFAULT_CACHE_PATH),
+                float(settings.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600,
+                int(float(settings.get("max_mb", DEFAULT_MAX_MB)) * 1024 * 1024),
+            )
+            _CACHE_SETTINGS = settings
+        return _CACHE
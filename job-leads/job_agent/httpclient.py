@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import importlib.util
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import HTTP_CLIENT_RESPONSES
+from .ratelimit import RETRY_STATUSES, get_limiter
+from .utils import HEADERS
+
+DEFAULT_POOL_CONNECTIONS = 20  # distinct hosts kept pooled
+DEFAULT_POOL_MAXSIZE = 10  # keep-alive connections per host
+DEFAULT_TIMEOUT = 20.0
+
+HAS_BROTLI = any(importlib.util.find_spec(m) for m in ("brotli", "brotlicffi"))
+HAS_H2 = importlib.util.find_spec("h2") is not None
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Per-fetch counters (body bytes, parse seconds). The scrape engine binds a fresh meter
+# around each adapter call; outside of one, meter() is a no-op.
+_METER: ContextVar[Dict[str, float] | None] = ContextVar("fetch_meter", default=None)
+
+
+def start_meter() -> Dict[str, float]:
+    m: Dict[str, float] = {"bytes": 0, "parse_seconds": 0.0}
+    _METER.set(m)
+    return m
+
+
+def meter(key: str, amount: float) -> None:
+    m = _METER.get()
+    if m is not None:
+        m[key] = m.get(key, 0) + amount
+
+
+@contextmanager
+def metered(key: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        meter(key, time.perf_counter() - start)
+
+
+def body_size(resp) -> int:
+    return len(getattr(resp, "content", None) or b"")
+
+
+class ConnectionStats:
+    """Per-host request and new-connection counters; reused = requests - connections."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "connections": 0})
+
+    def record(self, host: str, requests: int = 0, connections: int = 0) -> None:
+        with self._lock:
+            row = self._data[host]
+            row["requests"] += requests
+            row["connections"] += connections
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                host: {**row, "reused": max(0, row["requests"] - row["connections"])}
+                for host, row in self._data.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+STATS = ConnectionStats()
+
+
+class _CountingAdapter(HTTPAdapter):
+    # urllib3 pools count the connections they open; diff that counter around each send
+    _local = threading.local()
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        pool = super().get_connection_with_tls_context(*args, **kwargs)
+        self._local.pool, self._local.before = pool, pool.num_connections
+        return pool
+
+    def send(self, request, **kwargs):
+        self._local.pool = None
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            pool = self._local.pool
+            opened = pool.num_connections - self._local.before if pool is not None else 0
+            STATS.record(urlparse(request.url).netloc, requests=1, connections=opened)
+
+
+def http_settings(cfg: dict | None = None) -> dict:
+    conf = (cfg or {}).get("http") or {}
+    return {
+        "pool_connections": int(conf.get("pool_connections", DEFAULT_POOL_CONNECTIONS)),
+        "pool_maxsize": int(conf.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)),
+        "http2": bool(conf.get("http2", True)) and HAS_H2,
+        "timeout": float(conf.get("timeout", DEFAULT_TIMEOUT)),
+    }
+
+
+_SESSION: requests.Session | None = None
+_SESSION_SETTINGS: dict | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session(cfg: dict | None = None) -> requests.Session:
+    """Process-wide keep-alive session. Passing a cfg with different `http` settings rebuilds it;
+    callers without a cfg (e.g. notifiers) reuse whatever is current."""
+    global _SESSION, _SESSION_SETTINGS
+    settings = http_settings(cfg) if cfg is not None else None
+    with _SESSION_LOCK:
+        if _SESSION is None or (settings is not None and settings != _SESSION_SETTINGS):
+            settings = settings or http_settings()
+            s = requests.Session()
+            s.headers.update({**HEADERS, "Accept-Encoding": ACCEPT_ENCODING})
+            adapter = _CountingAdapter(
+                pool_connections=settings["pool_connections"], pool_maxsize=settings["pool_maxsize"]
+            )
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            if _SESSION is not None:
+                _SESSION.close()
+            _SESSION, _SESSION_SETTINGS = s, settings
+        return _SESSION
+
+
+def close_session() -> None:
+    global _SESSION, _SESSION_SETTINGS
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+        _SESSION, _SESSION_SETTINGS = None, None
+
+
+def get(url: str, cfg: dict | None = None, **kwargs) -> requests.Response:
+    """GET through the shared session, paced by the per-host rate limiter."""
+    session = get_session(cfg)
+    limiter = get_limiter(cfg)
+    host = urlparse(url).netloc
+    kwargs.setdefault("timeout", http_settings(cfg)["timeout"])
+    attempt = 0
+    while True:
+        limiter.acquire(host)
+        resp = session.get(url, **kwargs)
+        meter("bytes", body_size(resp))
+        HTTP_CLIENT_RESPONSES.inc(host=host, status=str(resp.status_code))
+        if resp.status_code not in RETRY_STATUSES or attempt >= limiter.max_retries:
+            return resp
+        limiter.backoff(host, resp.headers or {}, attempt)
+        attempt += 1
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().post(url, **kwargs)
+
+
+def _trace_for(host: str):
+    async def trace(event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            STATS.record(host, connections=1)
+
+    return trace
+
+
+async def _on_request(request: httpx.Request) -> None:
+    host = request.url.netloc.decode("ascii")
+    STATS.record(host, requests=1)
+    request.extensions["trace"] = _trace_for(host)
+
+
+def _trace_for_sync(host: str):
+    def trace(event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            STATS.record(host, connections=1)
+
+    return trace
+
+
+def _on_request_sync(request: httpx.Request) -> None:
+    host = request.url.netloc.decode("ascii")
+    STATS.record(host, requests=1)
+    request.extensions["trace"] = _trace_for_sync(host)
+
+
+def _limits(settings: dict) -> httpx.Limits:
+    total = settings["pool_connections"] * settings["pool_maxsize"]
+    return httpx.Limits(max_connections=total, max_keepalive_connections=total)
+
+
+def sync_client(cfg: dict | None = None, **kwargs) -> httpx.Client:
+    """Pooled, thread-safe httpx client for libraries that take one (e.g. Supabase)."""
+    settings = http_settings(cfg)
+    return httpx.Client(
+        timeout=settings["timeout"],
+        limits=_limits(settings),
+        http2=settings["http2"],
+        event_hooks={"request": [_on_request_sync]},
+        **kwargs,
+    )
+
+
+def async_client(cfg: dict | None = None) -> httpx.AsyncClient:
+    """Pooled async client for one event loop (use as `async with`); HTTP/2 when h2 is installed."""
+    settings = http_settings(cfg)
+    return httpx.AsyncClient(
+        headers={**HEADERS, "Accept-Encoding": ACCEPT_ENCODING},
+        timeout=settings["timeout"],
+        limits=_limits(settings),
+        http2=settings["http2"],
+        follow_redirects=True,
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    return STATS.snapshot()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+try:  # optional C Aho-Corasick automaton
+    import ahocorasick
+except ImportError:  # pragma: no cover - exercised when the extra isn't installed
+    ahocorasick = None
+
+TEXT_FIELDS = ("title", "company", "location", "tags", "description")
+
+INCLUDE = 1
+EXCLUDE = 2
+
+
+def record_text(record: dict) -> str:
+    return " ".join([record.get(f, "") or "" for f in TEXT_FIELDS]).lower()
+
+
+@dataclass
+class Match:
+    include_hit: bool
+    exclude_hit: bool
+    score: int
+    has_include: bool = True
+
+    @property
+    def keep(self) -> bool:
+        return (self.include_hit or not self.has_include) and not self.exclude_hit
+
+
+class KeywordMatcher:
+    """Include, exclude and score terms compiled once; each record's text is scanned once.
+
+    With pyahocorasick installed the scan is a single pass of an Aho-Corasick automaton over
+    the text; otherwise each distinct term is checked once with a substring test.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        plus: Iterable[Sequence] = (),
+        minus: Iterable[Sequence] = (),
+    ) -> None:
+        self.terms: List[str] = []
+        self.flags: List[int] = []
+        self.weights: List[int] = []
+        index: Dict[str, int] = {}
+
+        def add(term: str, flag: int = 0, weight: int = 0) -> None:
+            t = term.lower()
+            i = index.get(t)
+            if i is None:
+                i = index[t] = len(self.terms)
+                self.terms.append(t)
+                self.flags.append(0)
+                self.weights.append(0)
+            self.flags[i] |= flag
+            self.weights[i] += weight
+
+        for t in include:
+            add(t, INCLUDE)
+        for t in exclude:
+            add(t, EXCLUDE)
+        for t, w in plus:
+            add(t, weight=int(w))
+        for t, w in minus:
+            add(t, weight=-int(w))
+
+        self.has_include = any(f & INCLUDE for f in self.flags)
+        # "" is a substring of everything but can't live in an automaton
+        self._always = [i for i, t in enumerate(self.terms) if not t]
+        self._automaton = None
+        if ahocorasick is not None and len(self.terms) > len(self._always):
+            a = ahocorasick.Automaton()
+            for i, t in enumerate(self.terms):
+                if t:
+                    a.add_word(t, i)
+            a.make_automaton()
+            self._automaton = a
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "KeywordMatcher":
+        rules = cfg.get("score_rules") or {}
+        return compile_matcher(
+            tuple(cfg.get("include") or ()),
+            tuple(cfg.get("exclude") or ()),
+            rule_pairs(rules.get("plus")),
+            rule_pairs(rules.get("minus")),
+        )
+
+    def scan(self, text: str) -> Set[int]:
+        """Indices of every term occurring in the (already lowercased) text."""
+        hits = set(self._always)
+        if self._automaton is not None:
+            hits.update(i for _, i in self._automaton.iter(text))
+        else:
+            hits.update(i for i, t in enumerate(self.terms) if t and t in text)
+        return hits
+
+    def match_text(self, text: str) -> Match:
+        include_hit = exclude_hit = False
+        score = 0
+        for i in self.scan(text):
+            f = self.flags[i]
+            include_hit |= bool(f & INCLUDE)
+            exclude_hit |= bool(f & EXCLUDE)
+            score += self.weights[i]
+        return Match(include_hit, exclude_hit, score, self.has_include)
+
+    def match(self, record: dict) -> Match:
+        return self.match_text(record_text(record))
+
+    def score(self, record: dict) -> int:
+        return self.match(record).score
+
+
+def rule_pairs(items) -> Tuple[Tuple[str, int], ...]:
+    return tuple((str(t), int(w)) for t, w in (items or []))
+
+
+@lru_cache(maxsize=32)
+def compile_matcher(
+    include: Tuple[str, ...] = (),
+    exclude: Tuple[str, ...] = (),
+    plus: Tuple[Tuple[str, int], ...] = (),
+    minus: Tuple[Tuple[str, int], ...] = (),
+) -> KeywordMatcher:
+    return KeywordMatcher(include, exclude, plus, minus)
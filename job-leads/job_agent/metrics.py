@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Off unless `metrics.enabled` is set in config (or JOB_LEADS_METRICS=1). While off, timers
+# are a shared no-op and instrumented functions cost one flag check.
+_ENABLED = os.environ.get("JOB_LEADS_METRICS", "").lower() in ("1", "true", "yes")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LONG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+DEFAULT_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NOOP = nullcontext()
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def enable(on: bool = True) -> None:
+    global _ENABLED
+    _ENABLED = bool(on)
+
+
+def configure(cfg: dict | None) -> bool:
+    settings = (cfg or {}).get("metrics") or {}
+    if settings.get("enabled"):
+        enable(True)
+    return _ENABLED
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not _ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not _ENABLED:
+            return
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = entry
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        out: List[str] = []
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = 'le="' + _num(bound) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(m.render() for m in metrics)
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            m.clear()
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "jobleads_http_request_duration_seconds", "API request latency by route", ("method", "route", "status")
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "jobleads_db_query_duration_seconds", "Supabase and SQLite query latency", ("backend", "op")
+)
+FETCH_SECONDS = REGISTRY.histogram(
+    "jobleads_fetch_duration_seconds", "Adapter fetch latency per site (one site/term fetch)", ("site",)
+)
+FETCH_ERRORS = REGISTRY.counter("jobleads_fetch_errors_total", "Failed adapter fetches", ("site", "error"))
+HTTP_CLIENT_RESPONSES = REGISTRY.counter(
+    "jobleads_http_client_responses_total", "Scraper HTTP responses by host and status", ("host", "status")
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "jobleads_llm_request_duration_seconds", "LLM provider latency", ("provider", "kind"), LONG_BUCKETS[:5]
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "jobleads_llm_first_token_seconds", "Time to first streamed LLM token", ("provider",)
+)
+LLM_CACHE_REQUESTS = REGISTRY.counter(
+    "jobleads_llm_cache_requests_total", "LLM cache lookups (hit, miss, coalesced)", ("result",)
+)
+SCRAPE_SECONDS = REGISTRY.histogram(
+    "jobleads_scrape_duration_seconds", "Scrape run duration", ("status",), LONG_BUCKETS
+)
+SCRAPE_STAGE_SECONDS = REGISTRY.counter(
+    "jobleads_scrape_stage_seconds_total", "Time spent per scrape stage", ("stage",)
+)
+SCHEDULER_JOB_SECONDS = REGISTRY.histogram(
+    "jobleads_scheduler_job_duration_seconds", "Scheduled scrape job duration (scrape + notify)", (), LONG_BUCKETS
+)
+
+
+class _Timer:
+    __slots__ = ("metric", "labels", "start")
+
+    def __init__(self, metric: Histogram, labels: Dict[str, str]) -> None:
+        self.metric = metric
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metric.observe(time.perf_counter() - self.start, **self.labels)
+
+
+def timer(metric: Histogram, **labels: str):
+    """`with timer(H, ...)` observes the block's duration; a shared no-op while disabled."""
+    return _Timer(metric, labels) if _ENABLED else _NOOP
+
+
+def timed_op(backend: str) -> Callable:
+    """Decorator: time each call into DB_QUERY_SECONDS, op = function name minus its `_supa`
+    suffix (repo functions are named `<op>_supa`; `backend` is only the label value)."""
+
+    def deco(fn: Callable) -> Callable:
+        op = fn.__name__.removesuffix("_supa")
+        labels = {"backend": backend, "op": op}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _Timer(DB_QUERY_SECONDS, labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return deco
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve(port: int = DEFAULT_PORT, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose /metrics from a process without the API (the scheduler) on a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
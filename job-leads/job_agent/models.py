@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -25,6 +25,14 @@ class Job(Base):
     source: Mapped[str] = mapped_column(String(64), default="")
     collected_at: Mapped[str] = mapped_column(String(64), default="")
     description: Mapped[str] = mapped_column(Text, default="")
+    content_hash: Mapped[str] = mapped_column(String(40), default="")  # utils.content_hash
+    # URLs of near-duplicate postings folded into this one (newline separated, see neardup.py)
+    alt_urls: Mapped[str] = mapped_column(Text, default="")
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY collected_at DESC, id DESC
+        Index("jobs_collected_id_idx", "collected_at", "id"),
+    )
 
 
 class Lead(Base):
@@ -39,5 +47,51 @@ class Lead(Base):
     next_action: Mapped[str] = mapped_column(String(120), default="")
     next_action_date: Mapped[str] = mapped_column(String(64), default="")
     notes: Mapped[str] = mapped_column(Text, default="")
+    cover_letter_draft: Mapped[str] = mapped_column(Text, default="")
+    resume_bullets_draft: Mapped[str] = mapped_column(Text, default="")
+    drafted_at: Mapped[str] = mapped_column(String(64), default="")
     updated_at: Mapped[str] = mapped_column(String(64), default="")
 
+    __table_args__ = (Index("leads_status_idx", "status"),)
+
+
+class ScrapeRunRecord(Base):
+    __tablename__ = "scrape_runs"
+
+    id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), default="done")  # done | failed
+    started_at: Mapped[str] = mapped_column(String(64), default="")
+    finished_at: Mapped[str] = mapped_column(String(64), default="")
+    error: Mapped[str] = mapped_column(Text, default="")
+    scraped: Mapped[int] = mapped_column(Integer, default=0)
+    filtered: Mapped[int] = mapped_column(Integer, default=0)
+    deduped: Mapped[int] = mapped_column(Integer, default=0)
+    new: Mapped[int] = mapped_column(Integer, default=0)
+    changed: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    duplicates: Mapped[int] = mapped_column(Integer, default=0)
+    fetch_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    # Stage durations in seconds
+    seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    fetch_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    parse_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    match_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    write_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+
+    __table_args__ = (Index("scrape_runs_started_idx", "started_at"),)
+
+
+class RunFetchRecord(Base):
+    __tablename__ = "scrape_run_fetches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(String(40), default="")
+    site: Mapped[str] = mapped_column(String(64), default="")
+    term: Mapped[str] = mapped_column(String(200), default="")
+    records: Mapped[int] = mapped_column(Integer, default=0)
+    bytes: Mapped[int] = mapped_column(Integer, default=0)
+    seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    parse_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    error: Mapped[str] = mapped_column(String(120), default="")
+
+    __table_args__ = (Index("scrape_run_fetches_run_idx", "run_id"),)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from .utils import ensure_dir
+
+DEFAULT_INDEX_PATH = "out/neardup.sqlite"
+BANDS, ROWS = 20, 3  # LSH banding: pairs above ~0.4 Jaccard usually share a bucket
+NUM_PERM = BANDS * ROWS
+DEFAULT_THRESHOLD = 0.6  # estimated Jaccard of description shingles to call two postings one job
+TITLE_OVERLAP = 0.6  # and more than half of the title words in common (Jaccard)
+SHINGLE = 3  # words per shingle
+MAX_DESCRIPTION_CHARS = 4000
+_CHUNK = 500
+# Multiply-shift hash family: h(x) = (a*x + b) mod 2^64 >> 32, a odd; fixed seed so
+# signatures stay comparable across runs
+_rng = np.random.default_rng(1031)
+_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+_HTML = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9]+")
+_COMPANY_SUFFIXES = frozenset("inc llc ltd limited gmbh co corp corporation plc ag bv sa the".split())
+
+
+def words(text: str | None) -> List[str]:
+    return _WORD.findall(_HTML.sub(" ", text or "").lower())
+
+
+def company_key(company: str | None) -> str:
+    """"Acme Labs, Inc." and the Lever slug "acme-labs" both become "acmelabs"."""
+    return "".join(w for w in words(company) if w not in _COMPANY_SUFFIXES)
+
+
+def signature(record: dict) -> np.ndarray | None:
+    """MinHash of the word shingles of title + description, NUM_PERM uint32 values."""
+    toks = words(record.get("title")) + words((record.get("description") or "")[:MAX_DESCRIPTION_CHARS])
+    if not toks:
+        return None
+    # Hash each word once, then combine SHINGLE consecutive word hashes per shingle
+    w = np.fromiter((zlib.crc32(t.encode()) for t in toks), dtype=np.uint64, count=len(toks))
+    n = max(1, len(w) - SHINGLE + 1)
+    shingles = np.zeros(n, dtype=np.uint64)
+    for i in range(SHINGLE):
+        part = w[i : i + n]
+        shingles[: len(part)] = shingles[: len(part)] * np.uint64(1_000_003) + part
+    hashed = (np.outer(np.unique(shingles), _A) + _B) >> _SHIFT
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray) -> List[Tuple[int, int]]:
+    return [(b, zlib.crc32(sig[b * ROWS : (b + 1) * ROWS].tobytes())) for b in range(BANDS)]
+
+
+def _overlap(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@dataclass
+class _Posting:
+    id: str
+    canonical_id: str
+    url: str
+    source: str
+    company: str
+    title: Set[str]
+    location: Set[str]
+    sig: np.ndarray | None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "_Posting":
+        pid, canonical, url, source, company, title, location, sig = row
+        return cls(
+            pid,
+            canonical,
+            url or "",
+            source or "",
+            company or "",
+            set((title or "").split()),
+            set((location or "").split()),
+            np.frombuffer(sig, dtype=np.uint32) if sig else None,
+        )
+
+    def row(self) -> tuple:
+        sig = self.sig.tobytes() if self.sig is not None else None
+        return (
+            self.id,
+            self.canonical_id,
+            self.url,
+            self.source,
+            self.company,
+            " ".join(sorted(self.title)),
+            " ".join(sorted(self.location)),
+            sig,
+        )
+
+    def same_job(self, other: "_Posting", threshold: float) -> float:
+        """Estimated Jaccard if `other` can be the same job re-listed on another board, else 0.
+        One board listing a role in several places has distinct postings, so the source must
+        differ; the company must be known and equal, and locations must share a word."""
+        if self.sig is None or other.sig is None or self.source == other.source:
+            return 0.0
+        if not self.company or self.company != other.company:
+            return 0.0
+        if self.location and other.location and not self.location & other.location:
+            return 0.0
+        if _overlap(self.title, other.title) < TITLE_OVERLAP:
+            return 0.0
+        score = float(np.mean(self.sig == other.sig))
+        return score if score >= threshold else 0.0
+
+
+@dataclass
+class Assignment:
+    """Result of NearDupIndex.assign(); nothing is stored until NearDupIndex.commit()."""
+
+    links: Dict[str, str] = field(default_factory=dict)  # record id -> canonical id
+    grown: Set[str] = field(default_factory=set)  # canonical ids that gained a duplicate
+    postings: List[_Posting] = field(default_factory=list)  # new postings to store
+    buckets: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+class NearDupIndex:
+    """Links postings of the same job found under different URLs (e.g. Lever and RemoteOK) to
+    one canonical id. Signatures and LSH buckets live in a local SQLite file next to the
+    fingerprint index; only canonical postings are bucketed, so a lookup reads at most BANDS
+    buckets however many jobs are stored. Losing the file only forgets existing links."""
+
+    def __init__(self, path: str, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            ensure_dir(os.path.dirname(path))
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS postings (id TEXT PRIMARY KEY, canonical_id TEXT NOT NULL,"
+                " url TEXT, source TEXT, company TEXT, title TEXT, location TEXT, sig BLOB)"
+            )
+            have = {row[1] for row in con.execute("PRAGMA table_info(postings)")}
+            for col in ("source", "location"):  # files written before these columns existed
+                if col not in have:
+                    con.execute(f"ALTER TABLE postings ADD COLUMN {col} TEXT DEFAULT ''")
+            con.execute("CREATE INDEX IF NOT EXISTS postings_canonical_idx ON postings (canonical_id)")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (band INTEGER, bucket INTEGER, id TEXT,"
+                " PRIMARY KEY (band, bucket, id)) WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _canonicals(self, con: sqlite3.Connection, ids: Sequence[str]) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        ids = list(dict.fromkeys(ids))
+        for i in range(0, len(ids), _CHUNK):
+            chunk = ids[i : i + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            out.update(con.execute(f"SELECT id, canonical_id FROM postings WHERE id IN ({marks})", chunk))
+        return out
+
+    def _stored_candidates(self, con: sqlite3.Connection, keys: List[Tuple[int, int]]) -> List[_Posting]:
+        where = " OR ".join("(band = ? AND bucket = ?)" for _ in keys)
+        params = [v for key in keys for v in key]
+        ids = [row[0] for row in con.execute(f"SELECT DISTINCT id FROM buckets WHERE {where}", params)]
+        rows = con.execute(
+            "SELECT id, canonical_id, url, source, company, title, location, sig FROM postings"
+            f" WHERE id IN ({','.join('?' * len(ids))})",
+            ids,
+        )
+        return [_Posting.from_row(row) for row in rows]
+
+    def assign(self, records: Sequence[dict]) -> Assignment:
+        """Canonical id per record. A posting seen before keeps its link; a new one joins the
+        best matching canonical posting (stored, or earlier in `records`) or becomes canonical
+        itself. Read-only: call commit() once the records' storage write has succeeded."""
+        out = Assignment()
+        pending: Dict[Tuple[int, int], List[_Posting]] = {}  # new canonicals of this call
+        with self._lock, closing(self._connect()) as con:
+            out.links.update(self._canonicals(con, [r["id"] for r in records]))
+            for r in records:
+                if r["id"] in out.links:
+                    continue
+                sig = signature(r)
+                keys = band_keys(sig) if sig is not None else []
+                posting = _Posting(
+                    r["id"],
+                    r["id"],
+                    r.get("url", ""),
+                    r.get("source", ""),
+                    company_key(r.get("company")),
+                    set(words(r.get("title"))),
+                    set(words(r.get("location"))),
+                    sig,
+                )
+                best, best_score = None, 0.0
+                if keys:
+                    cands = self._stored_candidates(con, keys)
+                    cands += {id(p): p for k in keys for p in pending.get(k, [])}.values()
+                    for cand in cands:
+                        score = posting.same_job(cand, self.threshold)
+                        if score > best_score:
+                            best, best_score = cand.id, score
+                if best is None:
+                    out.buckets.extend((b, k, r["id"]) for b, k in keys)
+                    for k in keys:
+                        pending.setdefault(k, []).append(posting)
+                else:
+                    posting.canonical_id = best
+                    out.grown.add(best)
+                out.postings.append(posting)
+                out.links[r["id"]] = posting.canonical_id
+        return out
+
+    def commit(self, assignment: Assignment) -> None:
+        """Store the new postings and buckets of an assign() result."""
+        if not assignment.postings:
+            return
+        with self._lock, closing(self._connect()) as con, con:
+            con.executemany(
+                "INSERT OR REPLACE INTO postings (id, canonical_id, url, source, company, title, location, sig)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [p.row() for p in assignment.postings],
+            )
+            con.executemany("INSERT OR IGNORE INTO buckets (band, bucket, id) VALUES (?, ?, ?)", assignment.buckets)
+
+    def duplicate_urls(self, canonical_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """canonical id -> URLs of its linked duplicates, oldest link first."""
+        ids = list(dict.fromkeys(canonical_ids))
+        out: Dict[str, List[str]] = {i: [] for i in ids}
+        with self._lock, closing(self._connect()) as con:
+            for i in range(0, len(ids), _CHUNK):
+                chunk = ids[i : i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = con.execute(
+                    f"SELECT canonical_id, url FROM postings WHERE canonical_id IN ({marks})"
+                    " AND id != canonical_id ORDER BY rowid",
+                    chunk,
+                )
+                for canonical, url in rows:
+                    if url:
+                        out[canonical].append(url)
+        return out
+
+
+_INDEX: NearDupIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_neardup_index(cfg: dict | None = None) -> NearDupIndex | None:
+    global _INDEX
+    settings = (cfg or {}).get("near_duplicates") or {}
+    if not settings.get("enabled", False):
+        return None
+    path = settings.get("path", DEFAULT_INDEX_PATH)
+    threshold = float(settings.get("threshold", DEFAULT_THRESHOLD))
+    with _INDEX_LOCK:
+        if _INDEX is None or _INDEX.path != path or _INDEX.threshold != threshold:
+            _INDEX = NearDupIndex(path, threshold)
+        return _INDEX
@@ -5,8 +5,7 @@ import smtplib
 from email.message import EmailMessage
 from typing import Iterable, List
 
-import requests
-
+from . import httpclient
 from .schema import JobModel
 
 
@@ -14,7 +13,7 @@ def send_slack(text: str, webhook_url: str | None) -> bool:
     if not webhook_url:
         return False
     try:
-        resp = requests.post(webhook_url, json={"text": text}, timeout=20)
+        resp = httpclient.post(webhook_url, json={"text": text}, timeout=20)
         return resp.status_code // 100 == 2
     except Exception:
         return False
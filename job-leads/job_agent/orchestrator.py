@@ -1,24 +1,44 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import os
-from typing import Dict, List, Tuple
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Set
 
-import pandas as pd
 from dotenv import load_dotenv
+from postgrest import APIError
 import yaml
 
-from .adapters import ADAPTERS
-from .db import get_session, init_db, upsert_job
-from .filters import filter_records
-from .models import Job
+from .db import (
+    bulk_upsert_jobs,
+    configure_sqlite,
+    get_session,
+    init_db,
+    insert_run,
+    known_hashes,
+    set_alt_urls,
+)
+from .engine import FetchStat, iter_fetches
+from .filters import location_ok
+from .fingerprints import get_fingerprint_index
+from .httpclient import connection_stats
+from .matcher import KeywordMatcher
+from .metrics import SCRAPE_SECONDS, SCRAPE_STAGE_SECONDS
+from .neardup import NearDupIndex, get_neardup_index
 from .schema import JobModel
-from .scoring import score_record
-from .utils import now_iso, url_hash
+from .scrapelock import DEFAULT_LOCK_PATH, scrape_lock
+from .similarity import get_similarity_index
+from .utils import eprint, now_iso, url_hash, with_score
 from .repo import (
     upsert_jobs_supa,
     ensure_leads_supa,
     get_existing_ids_supa,
+    ingest_jobs_supa,
+    insert_run_supa,
+    set_alt_urls_supa,
 )
 
 
@@ -27,101 +47,314 @@ def load_config(path: str) -> dict:
         return yaml.safe_load(f) or {}
 
 
-def run_scrape(cfg: dict) -> tuple[int, int, int, list[JobModel]]:
+CSV_COLUMNS = [
+    "id",
+    "title",
+    "company",
+    "location",
+    "salary",
+    "tags",
+    "posted_at",
+    "url",
+    "source",
+    "collected_at",
+    "description",
+    "score",
+]
+DEFAULT_BATCH_SIZE = 500
+
+
+def _id_key(_id: str) -> bytes | str:
+    # sha1 hex ids are kept as 20 raw bytes in the seen-set
+    try:
+        return bytes.fromhex(_id)
+    except ValueError:
+        return _id
+
+
+def _write_batch_supa(batch: List[dict]) -> List[JobModel]:
+    try:
+        new_ids = set(ingest_jobs_supa(batch, service=True))
+    except APIError as e:
+        if e.code != "PGRST202":  # ingest_jobs not found: migration 003 not applied yet
+            raise
+        ids = [r["id"] for r in batch]
+        existing = get_existing_ids_supa(ids, service=True)
+        upserted_ids = upsert_jobs_supa(batch, service=True)
+        ensure_leads_supa(upserted_ids, service=True)
+        new_ids = {i for i in upserted_ids if i not in existing}
+    return [
+        JobModel(**{k: v for k, v in r.items() if k in JobModel.model_fields})
+        for r in batch
+        if r["id"] in new_ids
+    ]
+
+
+def _write_batch_local(batch: List[dict]) -> List[JobModel]:
+    with get_session() as session:
+        new_ids = set(bulk_upsert_jobs(session, batch))
+    return [
+        JobModel(**{k: v for k, v in r.items() if k in JobModel.model_fields})
+        for r in batch
+        if r["id"] in new_ids
+    ]
+
+
+# fetch: waiting on the adapters; parse: inside adapters (summed over fetches);
+# match: include/exclude/score scan, location filter and dedupe; write: storage flushes
+STAGES = ("fetch", "parse", "match", "write")
+
+
+@dataclass
+class RunStats:
+    all: int = 0
+    filtered: int = 0
+    unique: int = 0
+    new: int = 0
+    changed: int = 0
+    skipped: int = 0  # content_hash matched what's stored, so no write
+    duplicates: int = 0  # same job as one stored under another URL, folded into it
+    bytes: int = 0  # response bodies downloaded
+    seconds: Dict[str, float] = field(default_factory=dict)  # per stage, plus "total"
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def summary(self) -> str:
+        counts = " ".join(f"{k}={v}" for k, v in asdict(self).items() if k != "seconds")
+        times = " ".join(f"{k}={v:.2f}s" for k, v in self.seconds.items())
+        return f"{counts} {times}".rstrip()
+
+
+def run_record(run_id: str, status: str, started_at: str, error: str, stats: RunStats) -> dict:
+    """Row for the scrape_runs table."""
+    return {
+        "id": run_id,
+        "status": status,
+        "started_at": started_at,
+        "finished_at": now_iso(),
+        "error": error,
+        "scraped": stats.all,
+        "filtered": stats.filtered,
+        "deduped": stats.unique,
+        "new": stats.new,
+        "changed": stats.changed,
+        "skipped": stats.skipped,
+        "duplicates": stats.duplicates,
+        "fetch_bytes": stats.bytes,
+        "seconds": round(stats.seconds.get("total", 0.0), 4),
+        **{f"{s}_seconds": round(stats.seconds.get(s, 0.0), 4) for s in STAGES},
+    }
+
+
+def _save_run(run: dict, fetches: List[dict], supa_ok: bool, local: bool) -> None:
+    # Run history is diagnostics: failing to record it must not fail the scrape
+    try:
+        if supa_ok:
+            insert_run_supa(run, fetches, service=True)
+        if local:
+            with get_session() as session:
+                insert_run(session, run, fetches)
+    except Exception as e:
+        eprint(f"could not record scrape run {run['id']}: {type(e).__name__}: {e}")
+
+
+def _write_alt_urls(neardup: NearDupIndex, canonical_ids: Set[str], supa_ok: bool, local: bool) -> None:
+    alt_urls = {i: "\n".join(urls) for i, urls in neardup.duplicate_urls(canonical_ids).items()}
+    if supa_ok:
+        set_alt_urls_supa(alt_urls, service=True)
+    if local:
+        with get_session() as session:
+            set_alt_urls(session, alt_urls)
+
+
+def _changed_only(batch: List[dict], known: Dict[str, str]) -> List[dict]:
+    # Unknown ids and rows without a fingerprint are always written
+    return [r for r in batch if not r.get("content_hash") or known.get(r["id"]) != r["content_hash"]]
+
+
+def _missing_on_server(batch: List[dict], todo: List[dict]) -> List[dict]:
+    """Rows the fingerprint file calls unchanged but Supabase doesn't have (a reset project,
+    deleted rows). An id-only lookup, far cheaper than resending the rows."""
+    sending = {r["id"] for r in todo}
+    skipped = [r for r in batch if r["id"] not in sending]
+    if not skipped:
+        return []
+    have = get_existing_ids_supa([r["id"] for r in skipped], service=True)
+    return [r for r in skipped if r["id"] not in have]
+
+
+def _known_hashes_local(ids: List[str]) -> Dict[str, str]:
+    with get_session() as session:
+        return known_hashes(session, ids)
+
+
+Progress = Callable[[str, dict], None]
+
+
+def run_scrape(
+    cfg: dict,
+    stats: RunStats | None = None,
+    progress: Progress | None = None,
+    run_id: str | None = None,
+) -> tuple[int, int, int, list[JobModel]]:
+    """Scrape, filter, dedupe and store. Pass a RunStats to also get new/changed/skipped counts
+    and stage timings. `progress(kind, data)` receives "fetch" events (one per site/term, from
+    the fetch thread) and a "batch" event with the running totals after every write.
+    The run and its per-fetch stats are recorded in scrape_runs under `run_id`.
+    Raises ScrapeLocked when another scrape holds the `scrape_lock` file."""
+    with scrape_lock(cfg.get("scrape_lock") or DEFAULT_LOCK_PATH):
+        return _run_scrape(cfg, stats, progress, run_id)
+
+
+def _run_scrape(
+    cfg: dict, stats: RunStats | None, progress: Progress | None, run_id: str | None
+) -> tuple[int, int, int, list[JobModel]]:
+    stats = stats if stats is not None else RunStats()
+    for s in STAGES:  # keys fixed up front; the fetch thread adds to "parse"
+        stats.seconds.setdefault(s, 0.0)
+    run_id = run_id or uuid.uuid4().hex
+    started_at = now_iso()
+    clock = time.perf_counter
+    run_start = clock()
+    fetches: List[dict] = []
+
+    def observer(fs: FetchStat) -> None:
+        stats.bytes += fs.bytes
+        stats.add_time("parse", fs.parse_seconds)
+        fetches.append(asdict(fs))
+        if progress:
+            progress("fetch", fetches[-1])
+
+    configure_sqlite(cfg)
     # Initialize local DB only if using sqlite
     if cfg.get("use_sqlite"):
         init_db()
     sites: List[str] = cfg.get("sites", [])
     includes: List[str] = cfg.get("include", [])
-    excludes: List[str] = cfg.get("exclude", [])
     locations: List[str] = cfg.get("locations", [])
-
-    # queries: for JSON org adapters, treat includes as org slugs if looks like one; otherwise treat includes as search terms
-    # Here we take a simple approach: for greenhouse/lever we expect include to be org slugs; for HTML adapters we use include as search terms.
-    results: List[dict] = []
-    for site in sites:
-        fetch = ADAPTERS.get(site)
-        if not fetch:
-            continue
-        terms = includes or [""]
-        for term in terms:
-            try:
-                jobs = fetch(term, cfg)
-            except Exception:
-                jobs = []
-            for j in jobs:
-                # compute score early
-                j["score"] = score_record(j, cfg.get("score_rules"))
-            results.extend(jobs)
-
-    all_count = len(results)
-    filtered = filter_records(results, includes, excludes, locations)
-    filtered_count = len(filtered)
-
-    # dedupe by id
-    unique_map: Dict[str, dict] = {}
-    for r in filtered:
-        unique_map[r["id"]] = r
-    unique = list(unique_map.values())
-    unique_count = len(unique)
+    # include/exclude/score terms compiled once; each record's text is scanned once
+    matcher = KeywordMatcher.from_config(cfg)
+    batch_size = max(1, int(cfg.get("batch_size", DEFAULT_BATCH_SIZE)))
 
     # Decide storage target based on env/config
     supa_ok = bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    local = bool(cfg.get("use_sqlite") or not supa_ok)
 
-    # Always assign ids and collected_at
-    ids = [r.get("id") or url_hash(r.get("url", "")) for r in unique]
-    for r, _id in zip(unique, ids):
-        r["id"] = _id
-        r.setdefault("collected_at", now_iso())
-
+    # Records stream from the adapters through filter -> dedupe -> score into bounded batches,
+    # so peak memory follows batch_size rather than the number of jobs scraped.
+    seen: Set[bytes | str] = set()
+    batch: List[dict] = []
     new_jobs: List[JobModel] = []
 
-    if supa_ok:
-        existing = get_existing_ids_supa(ids, service=True)
-        upserted_ids = upsert_jobs_supa(unique, service=True)
-        ensure_leads_supa(upserted_ids, service=True)
-        new_ids = [i for i in upserted_ids if i not in existing]
-        new_jobs = [
-            JobModel(**{k: v for k, v in r.items() if k in JobModel.model_fields})
-            for r in unique
-            if r["id"] in new_ids
-        ]
-    # Local writes: if configured or Supabase not available
-    if cfg.get("use_sqlite") or not supa_ok:
-        with get_session() as session:
-            for r in unique:
-                existed = session.get(Job, r["id"]) is not None
-                job = upsert_job(session, r)
-                if not supa_ok and not existed:
-                    new_jobs.append(
-                        JobModel(
-                            **{c: getattr(job, c) for c in JobModel.model_fields.keys()}
-                        )
-                    )
-
-        out_csv = cfg.get("output_csv", "out/jobs.csv")
-        os.makedirs(os.path.dirname(out_csv), exist_ok=True)
-        df = pd.DataFrame(unique)
-        cols = [
-            "id",
-            "title",
-            "company",
-            "location",
-            "salary",
-            "tags",
-            "posted_at",
-            "url",
-            "source",
-            "collected_at",
-            "description",
-            "score",
-        ]
-        for c in cols:
-            if c not in df.columns:
-                df[c] = ""
-        df[cols].to_csv(out_csv, index=False)
-
-    return all_count, filtered_count, unique_count, new_jobs
+    csv_file = writer = None
+    out_csv = cfg.get("output_csv", "out/jobs.csv")
+    if local:
+        os.makedirs(os.path.dirname(out_csv) or ".", exist_ok=True)
+        csv_file = open(out_csv + ".tmp", "w", newline="", encoding="utf-8")
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_COLUMNS, extrasaction="ignore", restval="")
+        writer.writeheader()
+
+    fingerprints = get_fingerprint_index(cfg) if supa_ok else None
+    similar = get_similarity_index(cfg)  # None unless similarity_index.enabled
+    neardup = get_neardup_index(cfg)  # None unless near_duplicates.enabled
+
+    def count(todo: List[dict], new: List[JobModel]) -> None:
+        stats.new += len(new)
+        stats.changed += len(todo) - len(new)
+        stats.skipped += len(batch) - len(todo)
+
+    def flush() -> None:
+        if not batch:
+            return
+        start = clock()
+        assignment = None
+        if neardup is not None:
+            # A posting of a job already seen under another URL is not written; its URL is
+            # added to the canonical job's alt_urls instead
+            assignment = neardup.assign(batch)
+            kept = [r for r in batch if assignment.links[r["id"]] == r["id"]]
+            stats.duplicates += len(batch) - len(kept)
+            batch[:] = kept
+        ids = [r["id"] for r in batch]
+        changed: List[dict] = []  # new or changed rows, fed to the similarity index
+        if supa_ok:
+            todo = _changed_only(batch, fingerprints.lookup(ids))
+            todo += _missing_on_server(batch, todo)
+            new = _write_batch_supa(todo) if todo else []
+            fingerprints.update((r["id"], r.get("content_hash", "")) for r in todo)
+            new_jobs.extend(new)
+            count(todo, new)
+            changed = todo
+        # Local writes: if configured or Supabase not available
+        if local:
+            todo = _changed_only(batch, _known_hashes_local(ids))
+            local_new = _write_batch_local(todo) if todo else []
+            if not supa_ok:
+                new_jobs.extend(local_new)
+                count(todo, local_new)
+                changed = todo
+            writer.writerows(batch)
+        if similar is not None:
+            similar.add(changed)
+        if assignment is not None:
+            # Links are stored only once the rows they point at were written
+            neardup.commit(assignment)
+            if assignment.grown:
+                _write_alt_urls(neardup, assignment.grown, supa_ok, local)
+        batch.clear()
+        stats.add_time("write", clock() - start)
+        if progress:
+            progress("batch", asdict(stats))
+
+    # queries: for JSON org adapters, treat includes as org slugs if looks like one; otherwise treat includes as search terms
+    # Here we take a simple approach: for greenhouse/lever we expect include to be org slugs; for HTML adapters we use include as search terms.
+    terms = includes or [""]
+    status, error = "done", ""
+    try:
+        waited = clock()
+        for _site, _term, jobs in iter_fetches(cfg, sites, terms, observer):
+            stats.add_time("fetch", clock() - waited)
+            start, written = clock(), stats.seconds["write"]
+            for r in jobs:
+                stats.all += 1
+                m = matcher.match(r)
+                if not m.keep or not location_ok(r, locations):
+                    continue
+                stats.filtered += 1
+                r["id"] = r.get("id") or url_hash(r.get("url", ""))
+                key = _id_key(r["id"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                stats.unique += 1
+                r.setdefault("collected_at", now_iso())
+                with_score(r, m.score)
+                batch.append(r)
+                if len(batch) >= batch_size:
+                    flush()
+            stats.add_time("match", clock() - start - (stats.seconds["write"] - written))
+            waited = clock()
+        flush()
+        if similar is not None:
+            start = clock()
+            similar.save()
+            stats.add_time("write", clock() - start)
+    except BaseException as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        stats.seconds["total"] = clock() - run_start
+        SCRAPE_SECONDS.observe(stats.seconds["total"], status=status)
+        for s in STAGES:
+            SCRAPE_STAGE_SECONDS.inc(stats.seconds[s], stage=s)
+        _save_run(run_record(run_id, status, started_at, error, stats), fetches, supa_ok, local)
+    if csv_file is not None:
+        os.replace(out_csv + ".tmp", out_csv)
+
+    return stats.all, stats.filtered, stats.unique, new_jobs
 
 
 def main() -> None:
@@ -132,6 +365,7 @@ def main() -> None:
     parser.add_argument("--exclude", nargs="*", default=None)
     parser.add_argument("--locations", nargs="*", default=None)
     parser.add_argument("--sites", nargs="*", default=None)
+    parser.add_argument("--http-stats", action="store_true", help="print per-host connection reuse")
     args = parser.parse_args()
 
     cfg = load_config(args.config)
@@ -144,8 +378,12 @@ def main() -> None:
     if args.sites is not None:
         cfg["sites"] = args.sites
 
-    all_c, filt_c, uniq_c, new_jobs = run_scrape(cfg)
-    print(f"Scrape done: all={all_c} filtered={filt_c} unique={uniq_c} new={len(new_jobs)}")
+    stats = RunStats()
+    run_scrape(cfg, stats)
+    print(f"Scrape done: {stats.summary()}")
+    if args.http_stats:
+        for host, st in sorted(connection_stats().items()):
+            print(f"  {host}: requests={st['requests']} connections={st['connections']} reused={st['reused']}")
 
 
 if __name__ == "__main__":
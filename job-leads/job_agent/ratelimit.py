@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping
+
+DEFAULT_RATE = 1.5  # requests/sec per host
+DEFAULT_BURST = 3
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+RETRY_STATUSES = {429, 503}
+
+
+class TokenBucket:
+    """Reservation-style token bucket: callers get back how long to wait for their token."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = max(float(rate), 1e-6)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds: float) -> None:
+        # Server asked us to back off (429/Retry-After): hold every caller until then
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + max(0.0, seconds))
+
+
+class RateLimiter:
+    def __init__(self, settings: Mapping | None = None) -> None:
+        settings = settings or {}
+        default = settings.get("default") or {}
+        self.rate = float(default.get("rate", DEFAULT_RATE))
+        self.burst = int(default.get("burst", DEFAULT_BURST))
+        self.hosts: Dict[str, dict] = dict(settings.get("hosts") or {})
+        self.max_retries = int(settings.get("max_retries", DEFAULT_MAX_RETRIES))
+        self.backoff_base = float(settings.get("backoff_base", DEFAULT_BACKOFF_BASE))
+        self.max_backoff = float(settings.get("max_backoff", DEFAULT_MAX_BACKOFF))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                conf = self.hosts.get(host) or {}
+                b = TokenBucket(conf.get("rate", self.rate), conf.get("burst", self.burst))
+                self._buckets[host] = b
+            return b
+
+    def acquire(self, host: str) -> None:
+        delay = self.bucket(host).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, host: str) -> None:
+        delay = self.bucket(host).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def backoff(self, host: str, headers: Mapping, attempt: int) -> float:
+        delay = retry_after_seconds(headers)
+        if delay is None:
+            delay = self.backoff_base * (2**attempt)
+        delay = min(delay, self.max_backoff)
+        self.bucket(host).block_for(delay)
+        return delay
+
+
+def retry_after_seconds(headers: Mapping) -> float | None:
+    value = (headers or {}).get("Retry-After") or (headers or {}).get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+
+_LIMITER: RateLimiter | None = None
+_LIMITER_SETTINGS: dict | None = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_limiter(cfg: dict | None = None) -> RateLimiter:
+    """Process-wide limiter so buckets persist across adapters, terms and runs."""
+    global _LIMITER, _LIMITER_SETTINGS
+    settings = dict((cfg or {}).get("rate_limits") or {})
+    with _LIMITER_LOCK:
+        if cfg is None and _LIMITER is not None:
+            return _LIMITER
+        if _LIMITER is None or settings != _LIMITER_SETTINGS:
+            _LIMITER = RateLimiter(settings)
+            _LIMITER_SETTINGS = settings
+        return _LIMITER
+
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Iterable, List, Sequence, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Set, TypeVar
+from urllib.parse import quote
 
+from postgrest import APIError, ReturnMethod
+
+from .metrics import timed_op
 from .supa import get_supa_client
 
 JOBS = "jobs"
@@ -11,98 +18,254 @@ PEOPLE = "people"
 POSTS = "posts"
 INTERACTIONS = "interactions"
 TEMPLATES = "templates"
+RUNS = "scrape_runs"
+RUN_FETCHES = "scrape_run_fetches"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_PARALLEL_REQUESTS = 4  # concurrent PostgREST requests per bulk operation
+MAX_BATCH_ROWS = 500
+MAX_BATCH_BYTES = 1_000_000  # JSON body per write request
+MAX_FILTER_URL_BYTES = 4_000  # encoded `in.(...)` list per read; proxies reject ~8 KB URLs
+SCORE_BATCH_SIZE = 1000
+CHUNK_RETRIES = 2
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+
+
+def chunk_rows(
+    rows: Iterable[Dict], max_rows: int = MAX_BATCH_ROWS, max_bytes: int = MAX_BATCH_BYTES
+) -> Iterator[List[Dict]]:
+    """Split write payloads by row count and serialized size (a row over max_bytes goes alone)."""
+    chunk: List[Dict] = []
+    size = 2
+    for row in rows:
+        n = len(json.dumps(row, default=str)) + 1
+        if chunk and (len(chunk) >= max_rows or size + n > max_bytes):
+            yield chunk
+            chunk, size = [], 2
+        chunk.append(row)
+        size += n
+    if chunk:
+        yield chunk
+
+
+def chunk_ids(ids: Iterable[str], max_url_bytes: int = MAX_FILTER_URL_BYTES) -> Iterator[List[str]]:
+    """Split (and dedupe) ids so each `in_("id", chunk)` filter stays under max_url_bytes."""
+    chunk: List[str] = []
+    size = 0
+    for i in dict.fromkeys(ids):
+        n = len(quote(str(i), safe="")) + 3  # plus an encoded comma
+        if chunk and size + n > max_url_bytes:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(i)
+        size += n
+    if chunk:
+        yield chunk
+
+
+# Postgres classes worth retrying: serialization/deadlock, resources, operator intervention
+_TRANSIENT_SQLSTATE = ("40", "53", "57")
+
+
+def _retryable(exc: Exception) -> bool:
+    """Transport failures and transient database errors; not constraint or schema errors."""
+    if isinstance(exc, APIError):
+        return not exc.code or str(exc.code).startswith(_TRANSIENT_SQLSTATE)
+    return True
+
+
+def run_chunks(
+    fn: Callable[[T], R],
+    chunks: Iterable[T],
+    max_workers: int = MAX_PARALLEL_REQUESTS,
+    retries: int = CHUNK_RETRIES,
+) -> List[R]:
+    """Apply fn to every chunk with bounded parallelism. A failing chunk is retried on its
+    own with backoff; results come back in chunk order."""
+    chunks = list(chunks)
+    if not chunks:
+        return []
+
+    def attempt(chunk: T) -> R:
+        for n in range(retries + 1):
+            try:
+                return fn(chunk)
+            except Exception as e:
+                if n == retries or not _retryable(e):
+                    raise
+                time.sleep(RETRY_BACKOFF * (2**n))
+        raise AssertionError("unreachable")
+
+    if len(chunks) == 1 or max_workers <= 1:
+        return [attempt(c) for c in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        return list(pool.map(attempt, chunks))
+
+
+def _job_row(r: Dict) -> Dict:
+    return {
+        "id": r["id"],
+        "title": r.get("title", ""),
+        "company": r.get("company", ""),
+        "location": r.get("location", ""),
+        "salary": r.get("salary", ""),
+        "tags": r.get("tags", ""),
+        "posted_at": r.get("posted_at") or None,
+        "url": r.get("url", ""),
+        "source": r.get("source", ""),
+        "collected_at": r.get("collected_at"),
+        "description": r.get("description", ""),
+    }
 
 
+@timed_op("supabase")
 def upsert_jobs_supa(records: Iterable[Dict], service: bool = True) -> List[str]:
     client = get_supa_client(service=service)
-    up = []
-    for r in records:
-        up.append(
-            {
-                "id": r["id"],
-                "title": r.get("title", ""),
-                "company": r.get("company", ""),
-                "location": r.get("location", ""),
-                "salary": r.get("salary", ""),
-                "tags": r.get("tags", ""),
-                "posted_at": r.get("posted_at") or None,
-                "url": r.get("url", ""),
-                "source": r.get("source", ""),
-                "collected_at": r.get("collected_at"),
-                "description": r.get("description", ""),
-            }
-        )
-    if not up:
-        return []
-    resp = client.table(JOBS).upsert(up, on_conflict="id").execute()
-    return [row["id"] for row in (resp.data or [])]
 
+    def send(chunk: List[Dict]) -> List[str]:
+        resp = client.table(JOBS).upsert(chunk, on_conflict="id").execute()
+        return [row["id"] for row in (resp.data or [])]
+
+    results = run_chunks(send, chunk_rows(_job_row(r) for r in records))
+    return [i for ids in results for i in ids]
+
+
+@timed_op("supabase")
+def ingest_jobs_supa(records: Iterable[Dict], service: bool = True) -> List[str]:
+    """Upsert jobs and create their leads via the `ingest_jobs` RPC
+    (supabase/migrations/003_ingest.sql), one round trip per chunk.
+    Returns the ids that were newly inserted."""
+    client = get_supa_client(service=service)
+    # One statement can't touch the same row twice; the last copy of an id wins
+    # content_hash only goes through the RPC (stored from 005_content_hash.sql on; ignored by 003)
+    rows = list(
+        {r["id"]: {**_job_row(r), "content_hash": r.get("content_hash") or ""} for r in records}.values()
+    )
+
+    def send(chunk: List[Dict]) -> List[Dict]:
+        return client.rpc("ingest_jobs", {"rows": chunk}).execute().data or []
+
+    results = run_chunks(send, chunk_rows(rows))
+    return [row["id"] for res in results for row in res if row.get("inserted")]
+
+
+def _select_ids(client, table: str, ids: List[str]) -> Set[str]:
+    def send(chunk: List[str]) -> List[str]:
+        resp = client.table(table).select("id").in_("id", chunk).execute()
+        return [row["id"] for row in (resp.data or [])]
+
+    return {i for found in run_chunks(send, chunk_ids(ids)) for i in found}
 
+
+@timed_op("supabase")
 def ensure_leads_supa(ids: List[str], service: bool = True) -> None:
     client = get_supa_client(service=service)
     if not ids:
         return
-    existing = client.table(LEADS).select("id").in_("id", ids).execute()
-    have = {row["id"] for row in (existing.data or [])}
-    new_rows = [{"id": i} for i in ids if i not in have]
-    if new_rows:
-        client.table(LEADS).insert(new_rows).execute()
+    rows = [{"id": i} for i in dict.fromkeys(ids)]
+
+    def send(chunk: List[Dict]) -> None:
+        # ON CONFLICT DO NOTHING: existing leads keep their fields, and a concurrent caller or
+        # a retried, partially applied chunk can't fail on a duplicate key
+        client.table(LEADS).upsert(
+            chunk, on_conflict="id", ignore_duplicates=True, returning=ReturnMethod.minimal
+        ).execute()
 
+    run_chunks(send, chunk_rows(rows))
 
+
+@timed_op("supabase")
 def bulk_status_supa(ids: List[str], status: str, service: bool = True) -> int:
     client = get_supa_client(service=service)
     if not ids:
         return 0
     ensure_leads_supa(ids, service=service)
-    resp = (
-        client.table(LEADS)
-        .update({"status": status, "updated_at": datetime.utcnow().isoformat()})
-        .in_("id", ids)
-        .execute()
-    )
-    return len(resp.data or [])
+    fields = {"status": status, "updated_at": datetime.utcnow().isoformat()}
 
+    def send(chunk: List[str]) -> int:
+        return len(client.table(LEADS).update(fields).in_("id", chunk).execute().data or [])
 
-def bulk_scores_supa(id_to_score: Dict[str, int], service: bool = True) -> int:
-    client = get_supa_client(service=service)
+    return sum(run_chunks(send, chunk_ids(ids)))
+
+
+@timed_op("supabase")
+def bulk_scores_supa(
+    id_to_score: Dict[str, int],
+    service: bool = True,
+    batch_size: int = SCORE_BATCH_SIZE,
+    max_workers: int = MAX_PARALLEL_REQUESTS,
+) -> int:
+    """Write scores as upserts of {id, score, updated_at}: one request per batch, a few
+    batches in flight. Upsert creates missing leads and only touches the sent columns."""
     if not id_to_score:
         return 0
-    ensure_leads_supa(list(id_to_score.keys()), service=service)
-    count = 0
-    items = list(id_to_score.items())
-    for i in range(0, len(items), 500):
-        batch = items[i : i + 500]
-        for _id, sc in batch:
-            client.table(LEADS).update(
-                {"score": int(sc), "updated_at": datetime.utcnow().isoformat()}
-            ).eq("id", _id).execute()
-            count += 1
-    return count
+    client = get_supa_client(service=service)
+    now = datetime.utcnow().isoformat()
+    rows = [{"id": _id, "score": int(sc), "updated_at": now} for _id, sc in id_to_score.items()]
+
+    def send(batch: List[Dict]) -> int:
+        client.table(LEADS).upsert(batch, on_conflict="id", returning=ReturnMethod.minimal).execute()
+        return len(batch)
 
+    return sum(run_chunks(send, chunk_rows(rows, max_rows=batch_size), max_workers=max_workers))
 
+
+@timed_op("supabase")
 def get_jobs_by_ids_supa(ids: List[str], service: bool = False):
     client = get_supa_client(service=service)
     if not ids:
         return []
-    resp = client.table(JOBS).select("*").in_("id", ids).execute()
-    return resp.data or []
 
+    def send(chunk: List[str]) -> List[Dict]:
+        return client.table(JOBS).select("*").in_("id", chunk).execute().data or []
+
+    return [row for rows in run_chunks(send, chunk_ids(ids)) for row in rows]
+
+
+@timed_op("supabase")
+def set_alt_urls_supa(alt_urls: Dict[str, str], service: bool = True) -> None:
+    """One UPDATE per job (values differ per row); a few jobs per run gain duplicates."""
+    client = get_supa_client(service=service)
 
+    def send(item: tuple) -> None:
+        job_id, urls = item
+        client.table(JOBS).update({"alt_urls": urls}, returning=ReturnMethod.minimal).eq("id", job_id).execute()
+
+    run_chunks(send, alt_urls.items())
+
+
+@timed_op("supabase")
 def get_existing_ids_supa(ids: List[str], service: bool = True) -> Set[str]:
     client = get_supa_client(service=service)
     if not ids:
         return set()
-    resp = client.table(JOBS).select("id").in_("id", ids).execute()
-    return {row["id"] for row in (resp.data or [])}
+    return _select_ids(client, JOBS, ids)
 
 
-def query_jobs_supa(filters: dict, service: bool = False):
+@timed_op("supabase")
+def query_jobs_supa(filters: dict, service: bool = False, with_leads: bool = False):
+    """One page of jobs. With `with_leads` each row embeds its lead under "leads"
+    (PostgREST resource embedding), so only the page's leads are transferred and a
+    `status` filter is applied in the database before pagination."""
     client = get_supa_client(service=service)
-    q = client.table(JOBS).select("*")
+    status = filters.get("status") if with_leads else None
+    if with_leads:
+        # !inner drops jobs without a matching lead, i.e. a join instead of a left join
+        q = client.table(JOBS).select(f"*, {LEADS}!inner(*)" if status else f"*, {LEADS}(*)")
+        if status:
+            q = q.eq(f"{LEADS}.status", status)
+    else:
+        q = client.table(JOBS).select("*")
+    groups = []
     if kw := filters.get("q"):
         pat = f"%{kw}%"
         # OR across several columns
-        q = q.or_(f"title.ilike.{pat},company.ilike.{pat},tags.ilike.{pat},description.ilike.{pat}")
+        groups.append(f"title.ilike.{pat},company.ilike.{pat},tags.ilike.{pat},description.ilike.{pat}")
+    if cursor := filters.get("cursor"):
+        groups.append(_keyset_group("collected_at", cursor))
+    q = _or_groups(q, groups)
     if src := filters.get("source"):
         if isinstance(src, str):
             q = q.eq("source", src)
@@ -115,11 +278,41 @@ def query_jobs_supa(filters: dict, service: bool = False):
     if date_to := filters.get("date_to"):
         q = q.lte("collected_at", date_to)
     lim = int(filters.get("limit", 100))
-    off = int(filters.get("offset", 0))
-    resp = q.order("collected_at", desc=True).range(off, off + lim - 1).execute()
+    q = q.order("collected_at", desc=True)
+    if "cursor" in filters:
+        # Keyset page: seek past the cursor on (collected_at, id) instead of counting rows
+        resp = q.order("id", desc=True).limit(lim).execute()
+    else:
+        off = int(filters.get("offset", 0))
+        resp = q.range(off, off + lim - 1).execute()
     return resp.data or []
 
 
+def _keyset_group(ts_col: str, cursor: Sequence[str]) -> str:
+    """PostgREST filter for rows strictly after `cursor` in (ts_col desc, id desc) order."""
+    ts, rid = cursor
+    return f'{ts_col}.lt."{ts}",and({ts_col}.eq."{ts}",id.lt."{rid}")'
+
+
+def _or_groups(q, groups: List[str]):
+    # A query takes one `or` param; several OR groups are ANDed inside it
+    if len(groups) == 1:
+        return q.or_(groups[0])
+    if groups:
+        return q.or_("and(" + ",".join(f"or({g})" for g in groups) + ")")
+    return q
+
+
+def embedded_lead(row: dict) -> dict | None:
+    """The lead embedded by `query_jobs_supa(..., with_leads=True)`; PostgREST returns a
+    one-to-one embed as an object (v11+) or a one-element list (older versions)."""
+    lead = row.get(LEADS)
+    if isinstance(lead, list):
+        return lead[0] if lead else None
+    return lead or None
+
+
+@timed_op("supabase")
 def get_leads_supa(filters: dict | None = None, service: bool = False):
     client = get_supa_client(service=service)
     q = client.table(LEADS).select("*")
@@ -129,6 +322,24 @@ def get_leads_supa(filters: dict | None = None, service: bool = False):
     return resp.data or []
 
 
+@timed_op("supabase")
+def lead_ids_with_status_supa(status: str, service: bool = False) -> List[str]:
+    """Ids of leads in `status`, ignoring case (ilike without wildcards)."""
+    client = get_supa_client(service=service)
+    resp = client.table(LEADS).select("id").ilike("status", status).execute()
+    return [row["id"] for row in (resp.data or [])]
+
+
+@timed_op("supabase")
+def job_ids_since_supa(iso_timestamp: str, limit: int = 5000, service: bool = False) -> List[str]:
+    """Ids of jobs collected after `iso_timestamp`, newest first."""
+    client = get_supa_client(service=service)
+    q = client.table(JOBS).select("id").gt("collected_at", iso_timestamp)
+    resp = q.order("collected_at", desc=True).limit(limit).execute()
+    return [row["id"] for row in (resp.data or [])]
+
+
+@timed_op("supabase")
 def upsert_leads_fields_supa(id: str, fields: dict, service: bool = True):
     client = get_supa_client(service=service)
     ensure_leads_supa([id], service=service)
@@ -137,6 +348,7 @@ def upsert_leads_fields_supa(id: str, fields: dict, service: bool = True):
 
 
 # People/Posts/Interactions/Templates helpers
+@timed_op("supabase")
 def upsert_person_supa(person: dict, service: bool = True):
     client = get_supa_client(service=service)
     data = {
@@ -155,6 +367,7 @@ def upsert_person_supa(person: dict, service: bool = True):
     return (resp.data or [])[0] if resp.data else data
 
 
+@timed_op("supabase")
 def upsert_post_supa(post: dict, service: bool = True):
     client = get_supa_client(service=service)
     data = {
@@ -171,6 +384,7 @@ def upsert_post_supa(post: dict, service: bool = True):
     return (resp.data or [])[0] if resp.data else data
 
 
+@timed_op("supabase")
 def upsert_interaction_supa(data: dict, service: bool = True):
     client = get_supa_client(service=service)
     payload = {k: v for k, v in data.items() if k in {
@@ -183,6 +397,7 @@ def upsert_interaction_supa(data: dict, service: bool = True):
     return (resp.data or [])[0] if resp.data else None
 
 
+@timed_op("supabase")
 def bulk_interaction_status_supa(ids: List[str], status: str, service: bool = True) -> int:
     client = get_supa_client(service=service)
     if not ids:
@@ -191,21 +406,67 @@ def bulk_interaction_status_supa(ids: List[str], status: str, service: bool = Tr
     return len(resp.data or [])
 
 
-def list_latest_people_supa(limit: int = 50, service: bool = False):
+@timed_op("supabase")
+def list_latest_people_supa(limit: int = 50, service: bool = False, cursor: Sequence[str] | None = None):
     client = get_supa_client(service=service)
-    return client.table(PEOPLE).select("*").order("updated_at", desc=True).limit(limit).execute().data or []
+    q = client.table(PEOPLE).select("*")
+    if cursor:
+        q = q.or_(_keyset_group("updated_at", cursor))
+    return q.order("updated_at", desc=True).order("id", desc=True).limit(limit).execute().data or []
 
 
-def list_latest_posts_supa(limit: int = 50, service: bool = False):
+@timed_op("supabase")
+def list_latest_posts_supa(limit: int = 50, service: bool = False, cursor: Sequence[str] | None = None):
     client = get_supa_client(service=service)
-    return client.table(POSTS).select("*").order("created_at", desc=True).limit(limit).execute().data or []
+    q = client.table(POSTS).select("*")
+    if cursor:
+        q = q.or_(_keyset_group("created_at", cursor))
+    return q.order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data or []
+
+
+@timed_op("supabase")
+def list_latest_jobs_supa(limit: int = 50, service: bool = False, cursor: Sequence[str] | None = None):
+    client = get_supa_client(service=service)
+    q = client.table(JOBS).select("*")
+    if cursor:
+        q = q.or_(_keyset_group("collected_at", cursor))
+    return q.order("collected_at", desc=True).order("id", desc=True).limit(limit).execute().data or []
+
+
+def iter_job_pages_supa(page_size: int = 1000, service: bool = True) -> Iterator[List[Dict]]:
+    """Every job, newest first, one keyset page at a time so no page costs more than the first."""
+    cursor = None
+    while True:
+        rows = list_latest_jobs_supa(page_size, service=service, cursor=cursor)
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1].get("collected_at") or "", rows[-1]["id"])
+
+
+@timed_op("supabase")
+def insert_run_supa(run: Dict, fetches: List[Dict], service: bool = True) -> None:
+    client = get_supa_client(service=service)
+    client.table(RUNS).upsert(run, on_conflict="id", returning=ReturnMethod.minimal).execute()
+    rows = [{**f, "run_id": run["id"]} for f in fetches]
+
+    def send(chunk: List[Dict]) -> None:
+        client.table(RUN_FETCHES).insert(chunk, returning=ReturnMethod.minimal).execute()
+
+    run_chunks(send, chunk_rows(rows))
 
 
-def list_latest_jobs_supa(limit: int = 50, service: bool = False):
+@timed_op("supabase")
+def list_runs_supa(limit: int = 50, service: bool = False, with_fetches: bool = False) -> List[Dict]:
+    """Most recent runs first; with_fetches embeds each run's (site, term) rows as "fetches"."""
     client = get_supa_client(service=service)
-    return client.table(JOBS).select("*").order("collected_at", desc=True).limit(limit).execute().data or []
+    cols = f"*, fetches:{RUN_FETCHES}(*)" if with_fetches else "*"
+    q = client.table(RUNS).select(cols).order("started_at", desc=True).limit(limit)
+    return q.execute().data or []
 
 
+@timed_op("supabase")
 def search_all_supa(q: str, limit: int = 50, service: bool = False):
     client = get_supa_client(service=service)
     resp = client.rpc("search_all", {"q": q, "lim": limit}).execute()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from .orchestrator import RunStats, run_scrape
+from .utils import now_iso
+
+MAX_KEPT_RUNS = 20
+
+
+@dataclass
+class ScrapeRun:
+    id: str
+    status: str = "queued"  # queued | running | done | failed
+    created_at: str = ""
+    started_at: str = ""
+    finished_at: str = ""
+    error: str = ""
+    stats: RunStats = field(default_factory=RunStats)  # mutated by the scrape's threads
+    stats_copy: dict = field(default_factory=lambda: asdict(RunStats()))  # what snapshot() shows
+    fetches: List[dict] = field(default_factory=list)  # one per (site, term)
+    events: List[Tuple[int, str, dict]] = field(default_factory=list)  # (seq, kind, data)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "stats": self.stats_copy,
+            "fetches": list(self.fetches),
+        }
+
+
+class ScrapeManager:
+    """Owns one background worker that runs scrapes one at a time. Submitting while a run is
+    queued or running returns that run instead of starting another. Across processes (other
+    API workers, the scheduler, the CLI) run_scrape's lock file keeps scrapes exclusive; a run
+    that finds it taken fails with ScrapeLocked."""
+
+    def __init__(self, load_cfg: Callable[[], dict], scrape: Callable = run_scrape) -> None:
+        self.load_cfg = load_cfg
+        self.scrape = scrape
+        self.runs: Dict[str, ScrapeRun] = {}
+        self._cond = threading.Condition()
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+    def submit(self) -> Tuple[ScrapeRun, bool]:
+        """(run, created): created is False when an active run was returned instead."""
+        with self._cond:
+            for run in self.runs.values():
+                if not run.finished:
+                    return run, False
+            run = ScrapeRun(id=uuid.uuid4().hex, created_at=now_iso())
+            self.runs[run.id] = run
+            self._trim()
+            self._emit(run, "status", {"status": run.status})
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="scrape-runner", daemon=True)
+                self._worker.start()
+        self._queue.put(run)
+        return run, True
+
+    def get(self, run_id: str) -> ScrapeRun | None:
+        with self._cond:
+            return self.runs.get(run_id)
+
+    def snapshot(self, run_id: str) -> dict | None:
+        with self._cond:
+            run = self.runs.get(run_id)
+            return run.snapshot() if run is not None else None
+
+    def events_since(
+        self, run_id: str, after: int = 0, timeout: float = 15.0
+    ) -> Tuple[List[Tuple[int, str, dict]], bool]:
+        """Block until the run has events newer than `after` (or timeout).
+        Returns (events, finished); finished means no more events will follow."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                run = self.runs.get(run_id)
+                if run is None:
+                    return [], True
+                events = [e for e in run.events if e[0] > after]
+                if events or run.finished:
+                    return events, run.finished
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._cond.wait(remaining)
+
+    def _emit(self, run: ScrapeRun, kind: str, data: dict) -> None:
+        # caller holds self._cond
+        run.events.append((len(run.events) + 1, kind, data))
+        self._cond.notify_all()
+
+    def _trim(self) -> None:
+        done = [r for r in self.runs.values() if r.finished]
+        for r in done[: max(0, len(self.runs) - MAX_KEPT_RUNS)]:
+            del self.runs[r.id]
+
+    def _progress(self, run: ScrapeRun) -> Callable[[str, dict], None]:
+        def progress(kind: str, data: dict) -> None:
+            with self._cond:
+                if kind == "fetch":
+                    run.fetches.append(data)
+                elif kind == "batch":
+                    # Called on the worker thread between writes; readers get this copy
+                    # instead of the RunStats the scrape keeps mutating
+                    run.stats_copy = asdict(run.stats)
+                self._emit(run, kind, data)
+
+        return progress
+
+    def _work(self) -> None:
+        while True:
+            run = self._queue.get()
+            with self._cond:
+                run.status, run.started_at = "running", now_iso()
+                self._emit(run, "status", {"status": run.status})
+            try:
+                self.scrape(self.load_cfg(), run.stats, self._progress(run), run_id=run.id)
+                status, error = "done", ""
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+            with self._cond:
+                run.status, run.error, run.finished_at = status, error, now_iso()
+                run.stats_copy = asdict(run.stats)
+                self._emit(run, "status", {"status": status, "error": error, "stats": run.stats_copy})
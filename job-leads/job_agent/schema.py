@@ -17,6 +17,7 @@ class JobModel(BaseModel):
     source: str = ""
     collected_at: str = ""
     description: str = ""
+    alt_urls: str = ""
 
 
 class LeadModel(BaseModel):
@@ -29,6 +30,9 @@ class LeadModel(BaseModel):
     next_action: str = ""
     next_action_date: str = ""
     notes: str = ""
+    cover_letter_draft: str = ""
+    resume_bullets_draft: str = ""
+    drafted_at: str = ""
     updated_at: str = ""
 
 
@@ -52,3 +56,5 @@ class UpsertLead(BaseModel):
     next_action: Optional[str] = None
     next_action_date: Optional[str] = None
     notes: Optional[str] = None
+    cover_letter_draft: Optional[str] = None
+    resume_bullets_draft: Optional[str] = None
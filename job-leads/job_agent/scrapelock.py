@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from .utils import ensure_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_LOCK_PATH = "out/scrape.lock"
+
+
+class ScrapeLocked(RuntimeError):
+    """Another scrape, in this or another process, holds the lock."""
+
+
+def _try_lock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+@contextmanager
+def scrape_lock(path: str = DEFAULT_LOCK_PATH) -> Iterator[None]:
+    """Hold an exclusive lock file for a whole scrape. API workers, the scheduler and the CLI
+    all write the same fingerprint, near-dup and similarity files, so only one may run; the
+    others fail fast with ScrapeLocked. The OS drops the lock if the process dies."""
+    if os.path.dirname(path):
+        ensure_dir(os.path.dirname(path))
+    with open(path, "a+") as f:
+        try:
+            _try_lock(f.fileno())
+        except OSError as e:
+            raise ScrapeLocked(f"another scrape is running (lock file {path})") from e
+        yield
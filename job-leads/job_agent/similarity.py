@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .utils import ensure_dir
+
+DIM = 1 << 18  # hashed feature space
+DEFAULT_INDEX_PATH = "out/similarity"
+MAX_FIELD_CHARS = 4000
+# Field weights applied to raw term counts before sublinear tf
+FIELD_WEIGHTS = (("title", 3.0), ("tags", 2.0), ("company", 1.0), ("description", 1.0))
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to we"
+    " will with you your".split()
+)
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+ARRAYS = ("indptr", "indices", "data", "col_indptr", "col_indices", "col_data", "norms")
+
+
+def features(record: dict, dim: int = DIM) -> Dict[int, float]:
+    """Hashed, field-weighted, sublinear term frequencies (1 + log tf) of one job."""
+    counts: Dict[int, float] = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS:
+        text = (record.get(field) or "")[:MAX_FIELD_CHARS].lower()
+        for tok in _TOKEN.findall(text):
+            if len(tok) > 1 and tok not in STOPWORDS:
+                counts[zlib.crc32(tok.encode()) & (dim - 1)] += weight
+    return {h: 1.0 + math.log(c) for h, c in counts.items()}
+
+
+def _row_norms(matrix: sparse.csr_matrix, idf: np.ndarray) -> np.ndarray:
+    squared = matrix.multiply(matrix) @ (idf * idf)
+    return np.sqrt(np.asarray(squared, dtype=np.float32).ravel())
+
+
+class SimilarityIndex:
+    """TF-IDF cosine similarity over hashed job features, CPU only.
+
+    Rows are stored unweighted in .npy files that are memory-mapped on load, both as CSR (row
+    lookups) and CSC (an inverted index: a query only reads the postings of its own terms).
+    Document frequencies are kept incrementally, so IDF is applied at query time and new
+    rows can be appended without re-weighting the rest. Changed jobs get a new row and the
+    old one is tombstoned; save() compacts them away.
+    """
+
+    def __init__(self, path: str, dim: int = DIM) -> None:
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._mtime = 0
+        self._load()
+
+    # -- storage -----------------------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _load(self) -> None:
+        self._base = sparse.csr_matrix((0, self.dim), dtype=np.float32)
+        self._postings = sparse.csc_matrix((0, self.dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._df = np.zeros(self.dim, dtype=np.float64)
+        norms = None
+        meta = self._meta_path()
+        if os.path.exists(meta):
+            with open(meta, encoding="utf-8") as f:
+                info = json.load(f)
+            if info.get("dim") == self.dim:
+                a = {n: np.load(self._file(n), mmap_mode="r") for n in ARRAYS}
+                shape = (info["rows"], self.dim)
+                self._base = sparse.csr_matrix((a["data"], a["indices"], a["indptr"]), shape=shape, copy=False)
+                self._postings = sparse.csc_matrix(
+                    (a["col_data"], a["col_indices"], a["col_indptr"]), shape=shape, copy=False
+                )
+                self._ids = np.load(self._file("ids")).tolist()
+                self._alive = np.ones(len(self._ids), dtype=bool)  # save() drops tombstones
+                self._df = np.load(self._file("df")).astype(np.float64)
+                norms = a["norms"]
+            self._mtime = os.stat(meta).st_mtime_ns
+        self._row: Dict[str, int] = {i: r for r, i in enumerate(self._ids) if self._alive[r]}
+        self._pending: List[Dict[int, float]] = []  # rows appended since the last save
+        self._pending_csr: sparse.csr_matrix | None = None
+        # |row * idf| per row; saved with the index, recomputed once after the df changes
+        self._norms: np.ndarray | None = norms
+
+    def refresh(self) -> None:
+        """Pick up a save() from another process (e.g. the scheduler) if nothing is pending."""
+        meta = self._meta_path()
+        with self._lock:
+            if not self._pending and os.path.exists(meta) and os.stat(meta).st_mtime_ns != self._mtime:
+                self._load()
+
+    def save(self) -> None:
+        """Write live rows as a fresh CSR (tombstones dropped) and remap it."""
+        with self._lock:
+            if not self._pending and self._live_mask().all():
+                return
+            rows = np.flatnonzero(self._live_mask())
+            matrix = self._matrix()[rows].tocsr()
+            matrix.sort_indices()
+            columns = matrix.tocsc()
+            columns.sort_indices()
+            ids = np.array([self._ids[r] for r in rows], dtype=str)
+            n = max(len(rows), 1)  # live rows, as _idf() will count them after the reload
+            idf = (np.log((n + 1) / (self._df + 1)) + 1).astype(np.float32)
+            # one index dtype per matrix, or scipy copies the arrays on load instead of mapping
+            idx = np.int32 if matrix.nnz < 2**31 else np.int64
+            ensure_dir(self.path)
+            arrays = {
+                "indptr": matrix.indptr.astype(idx),
+                "indices": matrix.indices.astype(idx),
+                "data": matrix.data.astype(np.float32),
+                "col_indptr": columns.indptr.astype(idx),
+                "col_indices": columns.indices.astype(idx),
+                "col_data": columns.data.astype(np.float32),
+                "norms": _row_norms(matrix, idf),
+                "ids": ids,
+                "df": self._df.astype(np.float32),
+            }
+            for name, arr in arrays.items():
+                tmp = self._file(name) + ".tmp.npy"
+                np.save(tmp, arr)
+                os.replace(tmp, self._file(name))
+            tmp = self._meta_path() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "rows": len(rows)}, f)
+            os.replace(tmp, self._meta_path())
+            self._load()
+
+    # -- updates -----------------------------------------------------------------------------
+
+    def add(self, records: Iterable[dict]) -> int:
+        """Index new or changed jobs; an id already present is replaced."""
+        n = 0
+        with self._lock:
+            for r in records:
+                feats = features(r, self.dim)
+                self._drop(r["id"])
+                row = len(self._ids)
+                if row >= len(self._alive):  # grow the tombstone mask in chunks
+                    self._alive = np.concatenate([self._alive, np.zeros(max(1024, row // 2), dtype=bool)])
+                self._alive[row] = True
+                self._row[r["id"]] = row
+                self._ids.append(r["id"])
+                self._pending.append(feats)
+                if feats:
+                    self._df[list(feats)] += 1
+                n += 1
+            if n:
+                self._pending_csr = None
+                self._norms = None
+        return n
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for i in ids:
+                self._drop(i)
+            self._norms = None
+
+    def _drop(self, job_id: str) -> None:
+        row = self._row.pop(job_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        base_rows = self._base.shape[0]
+        if row < base_rows:
+            cols = self._base.indices[self._base.indptr[row] : self._base.indptr[row + 1]]
+        else:
+            cols = list(self._pending[row - base_rows])
+        self._df[cols] = np.maximum(self._df[cols] - 1, 0)
+
+    # -- queries -----------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._row
+
+    def _pending_matrix(self) -> sparse.csr_matrix:
+        if self._pending_csr is None:
+            indptr, indices, data = [0], [], []
+            for feats in self._pending:
+                indices.extend(feats)
+                data.extend(feats.values())
+                indptr.append(len(indices))
+            self._pending_csr = sparse.csr_matrix(
+                (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+                shape=(len(self._pending), self.dim),
+            )
+        return self._pending_csr
+
+    def _matrix(self) -> sparse.csr_matrix:
+        if not self._pending:
+            return self._base
+        return sparse.vstack([self._base, self._pending_matrix()], format="csr")
+
+    def _row_vector(self, row: int) -> sparse.csr_matrix:
+        base_rows = self._base.shape[0]
+        return self._base[row] if row < base_rows else self._pending_matrix()[row - base_rows]
+
+    def _live_mask(self) -> np.ndarray:
+        return self._alive[: len(self._ids)]
+
+    def _idf(self) -> np.ndarray:
+        n = max(len(self._row), 1)
+        return (np.log((n + 1) / (self._df + 1)) + 1).astype(np.float32)
+
+    def _scores(self, weights: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        # cos(q, d) = sum(q_t d_t idf_t^2) / (|q*idf| |d*idf|); `weights` is already q / |q*idf|.
+        # Saved rows are scored from the postings of the query's terms only; pending rows by a
+        # plain mat-vec.
+        cols = np.flatnonzero(weights)
+        w = weights[cols] * idf[cols] * idf[cols]
+        if self._norms is None:
+            parts = [_row_norms(self._base, idf)]
+            if self._pending:
+                parts.append(_row_norms(self._pending_matrix(), idf))
+            self._norms = np.concatenate(parts)
+        parts = [self._postings[:, cols] @ w]
+        if self._pending:
+            parts.append(self._pending_matrix()[:, cols] @ w)
+        scores = np.concatenate(parts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(self._norms > 0, scores / self._norms, 0.0)
+        scores[~self._live_mask()] = -1.0
+        return scores
+
+    def _profile(self, rows: Sequence[int], idf: np.ndarray) -> np.ndarray | None:
+        """Mean of the rows' unit TF-IDF vectors, returned unweighted (dense, length dim)."""
+        profile = np.zeros(self.dim, dtype=np.float32)
+        for row in rows:
+            vec = self._row_vector(row)
+            weighted = vec.data * idf[vec.indices]
+            norm = float(np.linalg.norm(weighted))
+            if norm:
+                np.add.at(profile, vec.indices, vec.data / norm)
+        return profile if profile.any() else None
+
+    def _top(self, scores: np.ndarray, k: int, exclude: Iterable[int], candidates=None) -> List[Tuple[str, float]]:
+        if candidates is not None:
+            rows = np.asarray(sorted(candidates), dtype=np.int64)
+            sub = scores[rows] if len(rows) else rows.astype(np.float32)
+        else:
+            rows, sub = None, scores
+        sub = sub.copy()
+        skip = set(exclude)
+        if rows is None:
+            sub[list(skip)] = -1.0
+        else:
+            sub[np.isin(rows, list(skip))] = -1.0
+        k = min(k, len(sub))
+        if k <= 0:
+            return []
+        top = np.argpartition(-sub, k - 1)[:k]
+        top = top[np.argsort(-sub[top], kind="stable")]
+        out = []
+        for i in top:
+            if sub[i] <= 0:
+                break
+            row = int(rows[i]) if rows is not None else int(i)
+            out.append((self._ids[row], float(sub[i])))
+        return out
+
+    def similar(self, job_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine) jobs most like `job_id`, excluding itself."""
+        with self._lock:
+            row = self._row.get(job_id)
+            if row is None:
+                return []
+            idf = self._idf()
+            profile = self._profile([row], idf)
+            if profile is None:
+                return []
+            return self._top(self._scores(profile, idf), k, [row])
+
+    def recommend(
+        self, liked: Iterable[str], k: int = 20, candidates: Iterable[str] | None = None
+    ) -> List[Tuple[str, float]]:
+        """Rank `candidates` (default: every job) by similarity to the centroid of `liked`."""
+        with self._lock:
+            rows = [self._row[i] for i in liked if i in self._row]
+            idf = self._idf()
+            profile = self._profile(rows, idf) if rows else None
+            if profile is None:
+                return []
+            cand = None if candidates is None else {self._row[i] for i in candidates if i in self._row}
+            return self._top(self._scores(profile, idf), k, rows, cand)
+
+
+_INDEX: SimilarityIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_similarity_index(cfg: dict | None = None) -> SimilarityIndex | None:
+    global _INDEX
+    settings = (cfg or {}).get("similarity_index") or {}
+    if not settings.get("enabled", False):
+        return None
+    path = settings.get("path", DEFAULT_INDEX_PATH)
+    with _INDEX_LOCK:
+        if _INDEX is None or _INDEX.path != path:
+            _INDEX = SimilarityIndex(path)
+        else:
+            _INDEX.refresh()
+        return _INDEX
@@ -1,11 +1,45 @@
 import os
-from supabase import create_client, Client
+import threading
+from typing import Dict, Tuple
+
+from supabase import Client, ClientOptions, create_client
+
+from .httpclient import sync_client
+
+_CLIENTS: Dict[Tuple[str, str], Client] = {}
+_LOCK = threading.Lock()
 
 
 def get_supa_client(service: bool = False) -> Client:
+    """One client per (url, role) for the whole process. Each wraps a pooled httpx client,
+    so repo calls reuse keep-alive connections instead of opening new ones per call."""
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY" if service else "SUPABASE_ANON_KEY")
     if not url or not key:
         raise RuntimeError("Missing SUPABASE_URL or key env")
-    return create_client(url, key)
+    cache_key = (url, "service" if service else "anon")
+    client = _CLIENTS.get(cache_key)
+    if client is not None and client.supabase_key == key:
+        return client
+    with _LOCK:
+        client = _CLIENTS.get(cache_key)
+        if client is None or client.supabase_key != key:
+            options = ClientOptions(
+                # Server-side use: no user session to persist or refresh in the background
+                auto_refresh_token=False,
+                persist_session=False,
+                httpx_client=sync_client(),
+            )
+            client = _CLIENTS[cache_key] = create_client(url, key, options)
+        return client
+
 
+def reset_supa_clients() -> None:
+    """Drop cached clients and close their connection pools (tests, key rotation)."""
+    with _LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        http = client.options.httpx_client
+        if http is not None:
+            http.close()
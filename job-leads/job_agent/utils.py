@@ -29,6 +29,30 @@ def url_hash(url: str) -> str:
     return hashlib.sha1(url.encode("utf-8")).hexdigest()
 
 
+# Fields that make up a posting's content; collected_at changes every run and is left out. The
+# score only moves when the scoring config does, and such a posting must be rewritten too
+CONTENT_FIELDS = (
+    "title", "company", "location", "salary", "tags", "posted_at", "url", "source", "description", "score"
+)
+
+
+def content_hash(record: dict) -> str:
+    """Fingerprint of a job's content, used to skip rewriting postings that haven't changed."""
+    text = "\x1f".join(str(record.get(f) or "") for f in CONTENT_FIELDS)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def with_content_hash(record: dict) -> dict:
+    record["content_hash"] = content_hash(record)
+    return record
+
+
+def with_score(record: dict, score: int) -> dict:
+    """Set the matcher's score and refresh content_hash, which covers it."""
+    record["score"] = score
+    return with_content_hash(record)
+
+
 def safe_text(val: Any) -> str:
     if val is None:
         return ""
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from job_agent.matcher import KeywordMatcher, ahocorasick
+
+VOCAB = [f"w{i:04d}" for i in range(5000)]
+RARE = [f"x{i:04d}" for i in range(1000)]
+
+
+def make_records(n: int, rng: random.Random) -> list[dict]:
+    out = []
+    for _ in range(n):
+        out.append(
+            {
+                "title": " ".join(rng.choices(VOCAB, k=4)),
+                "company": rng.choice(VOCAB),
+                "location": "remote",
+                "tags": ",".join(rng.choices(VOCAB, k=4)),
+                "description": " ".join(
+                    rng.choices(VOCAB, k=150) + (rng.choices(RARE, k=1) if rng.random() < 0.05 else [])
+                ),
+            }
+        )
+    return out
+
+
+def baseline(records, include, exclude, plus, minus) -> int:
+    # The pre-matcher code path: blob built twice, every term lowercased per record
+    kept = 0
+    for r in records:
+        blob = " ".join([r.get(f, "") for f in ("title", "company", "location", "tags", "description")]).lower()
+        if include and not any(k.lower() in blob for k in include):
+            continue
+        if exclude and any(k.lower() in blob for k in exclude):
+            continue
+        text = " ".join([r.get(f, "") for f in ("title", "company", "location", "tags", "description")]).lower()
+        score = 0
+        for t, w in plus:
+            if t.lower() in text:
+                score += w
+        for t, w in minus:
+            if t.lower() in text:
+                score -= w
+        kept += 1
+    return kept
+
+
+def compiled(records, matcher: KeywordMatcher) -> int:
+    kept = 0
+    for r in records:
+        m = matcher.match(r)
+        if m.keep:
+            kept += 1
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher throughput")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--terms", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    q = args.terms // 4
+    terms = rng.sample(VOCAB, 3 * q)
+    # Include terms are common, exclude terms rare, so most records get a full scan
+    include, exclude = terms[:q], rng.sample(RARE, q)
+    plus = [(t, rng.randint(1, 5)) for t in terms[q : 2 * q]]
+    minus = [(t, rng.randint(1, 5)) for t in terms[2 * q :]]
+    records = make_records(args.records, rng)
+    print(f"records={args.records} terms={args.terms} automaton={'yes' if ahocorasick else 'no'}")
+
+    start = time.perf_counter()
+    kept_a = baseline(records, include, exclude, plus, minus)
+    secs = time.perf_counter() - start
+    print(f"baseline  kept={kept_a:6d} {args.records / secs:10.0f} records/sec")
+
+    matcher = KeywordMatcher(include, exclude, plus, minus)
+    start = time.perf_counter()
+    kept_b = compiled(records, matcher)
+    secs = time.perf_counter() - start
+    print(f"compiled  kept={kept_b:6d} {args.records / secs:10.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
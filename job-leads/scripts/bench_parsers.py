@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+
+from job_agent.adapters import parsers, remoteok
+from job_agent.adapters import weworkremotely as wwr
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+
+
+def inflate(html: str, pattern: str, copies: int) -> str:
+    # Repeat the fixture's job rows so the page resembles a full board
+    m = re.search(pattern, html, re.S)
+    return html[: m.start()] + m.group(0) * copies + html[m.end() :]
+
+
+def bench(parse, html: str, backend: str, repeat: int) -> tuple[int, float]:
+    rows = len(parse(html, backend))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html, backend)
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parser backend microbenchmark")
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "remoteok.html"), encoding="utf-8") as f:
+        rok = inflate(f.read(), r"<tr data-id=\"101\".*?</tr>\s*<tr class=\"expand.*?</tr>", args.copies)
+    with open(os.path.join(FIXTURES, "weworkremotely.html"), encoding="utf-8") as f:
+        w = inflate(f.read(), r"<li class=\"feature\">.*?</li>", args.copies)
+
+    for name, parse, html in [("remoteok", remoteok.parse_html, rok), ("weworkremotely", wwr.parse_html, w)]:
+        for backend in parsers.available_backends():
+            rows, secs = bench(parse, html, backend, args.repeat)
+            print(f"{name:15} {backend:11} rows={rows:5d} {rows * args.repeat / secs:10.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from job_agent.db import bulk_upsert_jobs, ensure_fts, make_engine, search_all_local
+from job_agent.models import Base, Job
+
+VOCAB = [f"w{i:05d}" for i in range(20000)]
+TITLES = ["designer", "engineer", "researcher", "manager", "analyst", "writer"]
+
+
+def make_records(n: int, rng: random.Random):
+    for i in range(n):
+        yield {
+            "id": f"{i:040x}",
+            "title": f"{rng.choice(VOCAB)} {rng.choice(TITLES)}",
+            "company": rng.choice(VOCAB),
+            "location": "remote",
+            "salary": "",
+            "tags": ",".join(rng.choices(VOCAB, k=3)),
+            "posted_at": "",
+            "url": f"https://example.test/{i}",
+            "source": "bench",
+            "collected_at": "2024-01-01T00:00:00+00:00",
+            "description": " ".join(rng.choices(VOCAB, k=120)),
+        }
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local keyword search latency, LIKE scan vs FTS5")
+    parser.add_argument("--jobs", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="reuse a database built by an earlier run")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+    fresh = not os.path.exists(path)
+    eng = make_engine(path)
+    Base.metadata.create_all(eng)
+    ensure_fts(eng)
+    if fresh:
+        start = time.perf_counter()
+        with Session(eng) as s:
+            bulk_upsert_jobs(s, make_records(args.jobs, rng), chunk_size=5000)
+            s.commit()
+        print(f"jobs={args.jobs} load={time.perf_counter() - start:.1f}s (with FTS triggers) db={path}")
+
+    q = VOCAB[123]
+    with Session(eng) as s:
+
+        def like():
+            p = f"%{q}%"
+            cond = Job.title.ilike(p) | Job.company.ilike(p) | Job.description.ilike(p) | Job.tags.ilike(p)
+            s.execute(select(Job).where(and_(cond)).limit(50)).all()
+
+        def fts():
+            search_all_local(s, q, 50)
+
+        print(f"like  {timed(like, max(1, args.repeat // 10)):8.2f} ms/query")
+        print(f"fts5  {timed(fts, args.repeat):8.2f} ms/query")
+    eng.dispose()
+
+
+if __name__ == "__main__":
+    main()
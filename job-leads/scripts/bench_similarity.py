@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from job_agent.similarity import SimilarityIndex
+
+VOCAB = [f"w{i:05d}" for i in range(20000)]
+TITLES = ["designer", "engineer", "researcher", "manager", "analyst", "writer"]
+
+
+def make_records(n: int, rng: random.Random):
+    for i in range(n):
+        yield {
+            "id": f"{i:040x}",
+            "title": f"{rng.choice(VOCAB)} {rng.choice(TITLES)}",
+            "company": rng.choice(VOCAB),
+            "tags": ",".join(rng.choices(VOCAB, k=3)),
+            "description": " ".join(rng.choices(VOCAB, k=120)),
+        }
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similarity index top-k latency")
+    parser.add_argument("--jobs", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--index", help="reuse an index built by an earlier run")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    path = args.index or tempfile.mkdtemp()
+    index = SimilarityIndex(path)
+    if not len(index):
+        start = time.perf_counter()
+        index.add(make_records(args.jobs, rng))
+        index.save()
+        print(f"jobs={args.jobs} build={time.perf_counter() - start:.1f}s index={path}")
+    index = SimilarityIndex(path)  # memory-mapped, as the API loads it
+    ids = [f"{rng.randrange(len(index)):040x}" for _ in range(args.repeat)]
+    liked = ids[:25]
+    index.similar(ids[0])  # first query computes the row norms
+    it = iter(ids * 2)
+    print(f"similar    {timed(lambda: index.similar(next(it), 10), args.repeat):8.2f} ms/query")
+    print(f"recommend  {timed(lambda: index.recommend(liked, 20), max(1, args.repeat // 4)):8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
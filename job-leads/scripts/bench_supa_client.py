@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from supabase import create_client
+
+from job_agent import httpclient, supa
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers every PostgREST call with an empty result set."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    connections = 0
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label: str, get_client, n: int) -> None:
+    StandIn.connections = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        get_client().table("jobs").select("id").limit(1).execute()
+    secs = time.perf_counter() - start
+    print(f"{label:8s} {secs / n * 1000:7.2f} ms/request  connections={StandIn.connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supabase client reuse against a local PostgREST stand-in")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["SUPABASE_URL"] = url
+    os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+    try:
+        run("fresh", lambda: create_client(url, os.environ["SUPABASE_ANON_KEY"]), args.requests)
+        supa.reset_supa_clients()
+        httpclient.STATS.reset()
+        run("cached", supa.get_supa_client, args.requests)
+    finally:
+        supa.reset_supa_clients()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
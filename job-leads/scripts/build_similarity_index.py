@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from job_agent.db import configure_sqlite, get_read_session, init_db
+from job_agent.models import Job
+from job_agent.orchestrator import load_config
+from job_agent.repo import iter_job_pages_supa
+from job_agent.similarity import DEFAULT_INDEX_PATH, SimilarityIndex
+
+FIELDS = ("id", "title", "company", "tags", "description")
+PAGE = 1000
+
+
+def jobs_supa():
+    for rows in iter_job_pages_supa(PAGE):
+        yield from rows
+
+
+def jobs_local():
+    init_db()
+    with get_read_session() as session:
+        cols = [getattr(Job, f) for f in FIELDS]
+        for row in session.execute(select(*cols).execution_options(yield_per=PAGE)):
+            yield dict(row._mapping)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the job similarity index from stored jobs")
+    parser.add_argument("--config", default="config.yaml")
+    args = parser.parse_args()
+
+    load_dotenv()
+    cfg = load_config(args.config)
+    configure_sqlite(cfg)
+    path = (cfg.get("similarity_index") or {}).get("path", DEFAULT_INDEX_PATH)
+    supa = bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+
+    start = time.perf_counter()
+    shutil.rmtree(path, ignore_errors=True)
+    index = SimilarityIndex(path)
+    n = index.add(jobs_supa() if supa else jobs_local())
+    index.save()
+    print(f"indexed {n} jobs into {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,23 +7,33 @@ from datetime import datetime, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
 
+from job_agent import metrics
 from job_agent.notify import notify_new_jobs
-from job_agent.orchestrator import load_config, run_scrape
+from job_agent.orchestrator import RunStats, load_config, run_scrape
+from job_agent.scrapelock import ScrapeLocked
 
 
 def job():
     cfg = load_config("config.yaml")
-    all_c, filt_c, uniq_c, new_jobs = run_scrape(cfg)
-    notify_new_jobs(new_jobs, cfg)
-    print(
-        f"[{datetime.now(timezone.utc).isoformat()}] scrape done: all={all_c} filtered={filt_c} unique={uniq_c} new={len(new_jobs)}"
-    )
+    stats = RunStats()
+    with metrics.timer(metrics.SCHEDULER_JOB_SECONDS):
+        try:
+            _, _, _, new_jobs = run_scrape(cfg, stats)
+        except ScrapeLocked as e:
+            print(f"[{datetime.now(timezone.utc).isoformat()}] scrape skipped: {e}")
+            return
+        notify_new_jobs(new_jobs, cfg)
+    print(f"[{datetime.now(timezone.utc).isoformat()}] scrape done: {stats.summary()}")
 
 
 def main():
     load_dotenv()
     cfg = load_config("config.yaml")
     cron = cfg.get("schedule_cron", "0 */6 * * *")
+    if metrics.configure(cfg):
+        port = int((cfg.get("metrics") or {}).get("port", metrics.DEFAULT_PORT))
+        metrics.serve(port)
+        print(f"Metrics on :{port}/metrics")
     scheduler = BackgroundScheduler(timezone="UTC")
     # run once on start
     job()
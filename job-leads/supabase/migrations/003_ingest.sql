@@ -0,0 +1,47 @@
+-- Ingest one batch of scraped jobs in a single statement:
+-- upsert the jobs, create their leads if missing, and report which ids were new.
+-- `xmax = 0` holds only for rows this statement inserted (an updated row carries our xid).
+create or replace function public.ingest_jobs(rows jsonb)
+returns table(id text, inserted boolean)
+language sql
+volatile
+as $$
+  with src as (
+    select *
+    from jsonb_to_recordset(rows) as r(
+      id text, title text, company text, location text, salary text, tags text,
+      posted_at timestamptz, url text, source text, collected_at timestamptz, description text
+    )
+  ),
+  up as (
+    insert into public.jobs as j
+      (id, title, company, location, salary, tags, posted_at, url, source, collected_at, description)
+    select
+      s.id, coalesce(s.title, ''), coalesce(s.company, ''), coalesce(s.location, ''),
+      coalesce(s.salary, ''), coalesce(s.tags, ''), s.posted_at, s.url, s.source,
+      coalesce(s.collected_at, now()), coalesce(s.description, '')
+    from src s
+    on conflict (id) do update set
+      title = excluded.title,
+      company = excluded.company,
+      location = excluded.location,
+      salary = excluded.salary,
+      tags = excluded.tags,
+      posted_at = excluded.posted_at,
+      url = excluded.url,
+      source = excluded.source,
+      collected_at = excluded.collected_at,
+      description = excluded.description
+    returning j.id, (j.xmax = 0) as inserted
+  ),
+  new_leads as (
+    insert into public.leads (id)
+    select up.id from up
+    on conflict (id) do nothing
+  )
+  select up.id, up.inserted from up;
+$$;
+
+-- Writes go through the service role only (the API / scraper)
+revoke all on function public.ingest_jobs(jsonb) from public, anon, authenticated;
+grant execute on function public.ingest_jobs(jsonb) to service_role;
@@ -0,0 +1,8 @@
+-- Composite indexes for keyset (cursor) pagination: ORDER BY <ts> DESC, id DESC
+-- with a `(ts, id) < (cursor_ts, cursor_id)` seek, used by /jobs and /feed.
+create index if not exists jobs_collected_id_idx on public.jobs (collected_at desc, id desc);
+create index if not exists people_updated_id_idx on public.people (updated_at desc, id desc);
+create index if not exists posts_created_id_idx on public.posts (created_at desc, id desc);
+
+-- Superseded by jobs_collected_id_idx
+drop index if exists public.jobs_collected_idx;
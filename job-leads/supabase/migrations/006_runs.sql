@@ -0,0 +1,43 @@
+-- Scrape run history: one row per run with counts and stage durations (seconds), plus one
+-- row per (site, term) fetch with latency, bytes, record count and error class.
+create table if not exists public.scrape_runs (
+  id text primary key,
+  status text not null default 'done',
+  started_at timestamptz,
+  finished_at timestamptz,
+  error text not null default '',
+  scraped int not null default 0,
+  filtered int not null default 0,
+  deduped int not null default 0,
+  new int not null default 0,
+  changed int not null default 0,
+  skipped int not null default 0,
+  fetch_bytes bigint not null default 0,
+  seconds double precision not null default 0,
+  fetch_seconds double precision not null default 0,
+  parse_seconds double precision not null default 0,
+  match_seconds double precision not null default 0,
+  write_seconds double precision not null default 0
+);
+create index if not exists scrape_runs_started_idx on public.scrape_runs (started_at desc);
+
+create table if not exists public.scrape_run_fetches (
+  id bigint generated always as identity primary key,
+  run_id text not null references public.scrape_runs(id) on delete cascade,
+  site text not null default '',
+  term text not null default '',
+  records int not null default 0,
+  bytes bigint not null default 0,
+  seconds double precision not null default 0,
+  parse_seconds double precision not null default 0,
+  error text not null default ''
+);
+create index if not exists scrape_run_fetches_run_idx on public.scrape_run_fetches (run_id);
+
+alter table public.scrape_runs enable row level security;
+alter table public.scrape_run_fetches enable row level security;
+-- create policy has no "if not exists"; drop first so the migration can be re-run
+drop policy if exists "public read" on public.scrape_runs;
+create policy "public read" on public.scrape_runs for select using (true);
+drop policy if exists "public read" on public.scrape_run_fetches;
+create policy "public read" on public.scrape_run_fetches for select using (true);
@@ -0,0 +1,4 @@
+-- LLM drafts generated by POST /llm/drafts, stored on the lead
+alter table public.leads add column if not exists cover_letter_draft text not null default '';
+alter table public.leads add column if not exists resume_bullets_draft text not null default '';
+alter table public.leads add column if not exists drafted_at timestamptz;
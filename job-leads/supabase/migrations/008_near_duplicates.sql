@@ -0,0 +1,4 @@
+-- Near-duplicate postings (same job on another board) are folded into one canonical job;
+-- their URLs are kept here, newline separated
+alter table public.jobs add column if not exists alt_urls text not null default '';
+alter table public.scrape_runs add column if not exists duplicates int not null default 0;
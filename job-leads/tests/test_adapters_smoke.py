@@ -18,7 +18,13 @@ class DummyResp:
         return self._json
 
 
+class DummySession:
+    def __init__(self, fake_get):
+        self.get = fake_get
+
+
 def test_greenhouse_smoke(monkeypatch):
+    from job_agent import httpclient
     from job_agent.adapters import greenhouse
 
     def fake_get(url, headers=None, timeout=None):
@@ -35,7 +41,7 @@ def test_greenhouse_smoke(monkeypatch):
             ]
         })
 
-    monkeypatch.setattr(greenhouse.requests, "get", fake_get)
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: DummySession(fake_get))
     out = greenhouse.fetch_jobs("org", {})
     assert isinstance(out, list) and out and set(
         ["id", "title", "company", "location", "url", "source", "collected_at", "description"]
@@ -43,6 +49,7 @@ def test_greenhouse_smoke(monkeypatch):
 
 
 def test_lever_smoke(monkeypatch):
+    from job_agent import httpclient
     from job_agent.adapters import lever
 
     def fake_get(url, headers=None, timeout=None):
@@ -57,12 +64,13 @@ def test_lever_smoke(monkeypatch):
             }
         ])
 
-    monkeypatch.setattr(lever.requests, "get", fake_get)
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: DummySession(fake_get))
     out = lever.fetch_jobs("org", {})
     assert isinstance(out, list) and out and out[0]["source"] == "lever"
 
 
 def test_remoteok_smoke(monkeypatch):
+    from job_agent import httpclient
     from job_agent.adapters import remoteok
 
     html = """
@@ -79,12 +87,13 @@ def test_remoteok_smoke(monkeypatch):
     def fake_get(url, headers=None, timeout=None):
         return DummyResp(text=html)
 
-    monkeypatch.setattr(remoteok.requests, "get", fake_get)
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: DummySession(fake_get))
     out = remoteok.fetch_jobs("designer", {})
     assert isinstance(out, list) and out and out[0]["source"] == "remoteok"
 
 
 def test_wwr_smoke(monkeypatch):
+    from job_agent import httpclient
     from job_agent.adapters import weworkremotely as wwr
 
     html = """
@@ -102,7 +111,21 @@ def test_wwr_smoke(monkeypatch):
     def fake_get(url, headers=None, timeout=None):
         return DummyResp(text=html)
 
-    monkeypatch.setattr(wwr.requests, "get", fake_get)
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: DummySession(fake_get))
     out = wwr.fetch_jobs("designer", {})
     assert isinstance(out, list) and out and out[0]["source"] == "weworkremotely"
 
+
+def test_greenhouse_async_smoke():
+    import asyncio
+
+    from job_agent import httpclient
+    from job_agent.adapters import greenhouse
+
+    class FakeClient:
+        async def get(self, url, headers=None, timeout=None):
+            assert url == "https://boards.greenhouse.io/org.json"
+            return DummyResp(json_data={"jobs": [{"absolute_url": "https://x/1", "title": "Designer"}]})
+
+    out = asyncio.run(greenhouse.fetch_jobs_async("org", {}, FakeClient()))
+    assert out and out[0]["source"] == "greenhouse" and out[0]["title"] == "Designer"
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    import api.main as main
+    from job_agent.db import bulk_upsert_jobs, ensure_fts, ensure_schema, make_engine
+    from job_agent.models import Base, Lead
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    ensure_schema(eng)
+    ensure_fts(eng)
+    with Session(eng) as s:
+        bulk_upsert_jobs(
+            s,
+            [
+                {
+                    "id": f"job{i:02d}",
+                    "title": "Designer" if i % 2 else "Engineer",
+                    "url": f"https://acme.test/{i}",
+                    "source": "test",
+                    # pairs of rows share a timestamp so the id tie-breaker matters
+                    "collected_at": f"2024-01-{1 + i // 2:02d}T00:00:00+00:00",
+                }
+                for i in range(25)
+            ],
+        )
+        s.add_all([Lead(id=f"job{i:02d}", status="applied") for i in range(0, 25, 3)])
+        s.commit()
+
+    @contextmanager
+    def read_session():
+        with Session(eng) as s:
+            yield s
+
+    monkeypatch.setattr(main, "supa_available", lambda: False)
+    monkeypatch.setattr(main, "get_read_session", read_session)
+    yield main
+    eng.dispose()
+
+
+def _walk(fetch):
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = fetch(cursor)
+        seen.extend(j["id"] for j in page["items"])
+        cursor = page["next_cursor"]
+    return seen
+
+
+def test_jobs_keyset_pages_cover_everything_in_order(api):
+    ids = _walk(lambda c: api.get_jobs(limit=7, cursor=c))
+    assert ids == [f"job{i:02d}" for i in reversed(range(25))]
+
+    applied = _walk(lambda c: api.get_jobs(status="applied", limit=2, cursor=c))
+    assert applied == [f"job{i:02d}" for i in reversed(range(0, 25, 3))]
+
+    designers = _walk(lambda c: api.get_jobs(q="design", limit=4, cursor=c))
+    assert designers == [f"job{i:02d}" for i in reversed(range(1, 25, 2))]
+
+
+def test_jobs_without_cursor_keeps_list_response(api):
+    assert len(api.get_jobs(limit=5)) == 5
+    page = api.get_jobs(limit=5, status="applied")
+    assert all(j["lead"]["status"] == "applied" for j in page)
+
+
+def test_invalid_cursor_is_rejected(api):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as e:
+        api.get_jobs(cursor="not-a-cursor")
+    assert e.value.status_code == 400
+
+
+def test_feed_pages_keep_one_position_per_source(monkeypatch):
+    import hashlib
+    import uuid
+
+    import api.main as main
+
+    def rows(n, ts_key, make_id, day):
+        return [{"id": make_id(i), ts_key: f"2024-02-{day - i // 2:02d}T00:00:00+00:00"} for i in range(n)]
+
+    tables = {
+        # jobs are newest, so page 1 ends on a job whose sha1 id is no valid uuid
+        "job": ("collected_at", rows(5, "collected_at", lambda i: hashlib.sha1(str(i).encode()).hexdigest(), 20)),
+        "person": ("updated_at", rows(4, "updated_at", lambda i: str(uuid.UUID(int=i + 1)), 18)),
+        "post": ("created_at", rows(3, "created_at", lambda i: str(uuid.UUID(int=100 + i)), 17)),
+    }
+
+    def lister(kind):
+        ts_key, data = tables[kind]
+
+        def fetch(limit, service=False, cursor=None):
+            out = sorted(data, key=lambda r: (r[ts_key], r["id"]), reverse=True)
+            if cursor:
+                if kind != "job":
+                    uuid.UUID(cursor[1])  # Postgres rejects anything else against a uuid column
+                out = [r for r in out if (r[ts_key], r["id"]) < cursor]
+            return [dict(r) for r in out[:limit]]
+
+        return fetch
+
+    monkeypatch.setattr(main, "supa_available", lambda: True)
+    monkeypatch.setattr(main, "list_latest_people_supa", lister("person"))
+    monkeypatch.setattr(main, "list_latest_posts_supa", lister("post"))
+    monkeypatch.setattr(main, "list_latest_jobs_supa", lister("job"))
+
+    first = main.get_feed(limit=2, cursor="")
+    assert [a["kind"] for a in first["items"]] == ["job", "job"]
+    seen = [(a["kind"], a["id"]) for a in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor is not None:
+        page = main.get_feed(limit=2, cursor=cursor)
+        seen.extend((a["kind"], a["id"]) for a in page["items"])
+        cursor = page["next_cursor"]
+    expected = sorted(
+        ((r[ts_key], r["id"], kind) for kind, (ts_key, data) in tables.items() for r in data), reverse=True
+    )
+    assert seen == [(kind, rid) for _, rid, kind in expected]
+
+
+def test_rescore_without_ids_covers_every_supabase_job(monkeypatch):
+    import api.main as main
+    from job_agent import repo
+
+    jobs = [
+        {"id": f"{i:040x}", "title": "Designer", "collected_at": f"2024-03-01T00:00:{i % 60:02d}+00:00"}
+        for i in range(2500)
+    ]
+
+    def list_latest(limit, service=False, cursor=None):
+        out = sorted(jobs, key=lambda r: (r["collected_at"], r["id"]), reverse=True)
+        if cursor:
+            out = [r for r in out if (r["collected_at"], r["id"]) < cursor]
+        return out[:limit]
+
+    written = []
+    monkeypatch.setattr(main, "supa_available", lambda: True)
+    monkeypatch.setattr(repo, "list_latest_jobs_supa", list_latest)
+    monkeypatch.setattr(main, "bulk_scores_supa", lambda scores, service=True: written.append(scores) or len(scores))
+
+    assert main.actions_rescore() == {"updated": 2500}
+    assert [len(w) for w in written] == [1000, 1000, 500]
+    assert {i for w in written for i in w} == {j["id"] for j in jobs}
@@ -0,0 +1,57 @@
+import time
+
+from sqlalchemy import text
+
+
+def _job(i):
+    return {
+        "id": f"job{i}",
+        "title": "Designer",
+        "company": "Acme",
+        "location": "Remote",
+        "salary": "",
+        "tags": "",
+        "posted_at": "",
+        "url": f"https://acme.test/jobs/{i}",
+        "source": "test",
+        "collected_at": "2024-01-01T00:00:00+00:00",
+        "description": "",
+    }
+
+
+def test_reads_not_blocked_by_open_write_transaction(tmp_path):
+    from job_agent.db import bulk_upsert_jobs, make_engine
+    from job_agent.models import Base
+
+    path = str(tmp_path / "jobs.sqlite")
+    writer = make_engine(path)
+    reader = make_engine(path, read_only=True, pool_size=2)
+    Base.metadata.create_all(writer)
+
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    from sqlalchemy.orm import Session
+
+    with Session(writer) as s:
+        bulk_upsert_jobs(s, [_job(i) for i in range(10)])
+        s.commit()
+
+    # Writer holds an uncommitted transaction while the reader queries
+    w = Session(writer)
+    bulk_upsert_jobs(w, [_job(i) for i in range(10, 5000)])
+    try:
+        start = time.perf_counter()
+        with reader.connect() as conn:
+            count = conn.execute(text("SELECT COUNT(*) FROM jobs")).scalar()
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        assert count == 10  # snapshot excludes the in-flight writes
+        assert time.perf_counter() - start < 1.0
+    finally:
+        w.commit()
+        w.close()
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM jobs")).scalar() == 5000
+    writer.dispose()
+    reader.dispose()
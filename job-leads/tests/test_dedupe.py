@@ -31,3 +31,53 @@ def test_dedupe(tmp_path, monkeypatch):
         rows = s.query(Job).all()
         assert len(rows) == 1
 
+
+
+def test_bulk_upsert_reports_new_ids(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from job_agent.db import bulk_upsert_jobs
+    from job_agent.models import Base, Job
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.sqlite'}")
+    Base.metadata.create_all(engine)
+
+    def rec(i, title="Designer"):
+        return {"id": f"id{i}", "title": title, "url": f"https://acme.test/{i}", "source": "test"}
+
+    with Session(engine) as s, s.begin():
+        assert bulk_upsert_jobs(s, [rec(i) for i in range(5)], chunk_size=2) == [f"id{i}" for i in range(5)]
+    with Session(engine) as s, s.begin():
+        new = bulk_upsert_jobs(s, [rec(3, "Lead"), rec(5), rec(5), rec(6)], chunk_size=2)
+        assert new == ["id5", "id6"]
+    with Session(engine) as s:
+        assert s.query(Job).count() == 7
+        assert s.get(Job, "id3").title == "Lead"
+        assert s.get(Job, "id3").company == ""
+
+
+def test_schema_upgrade_adds_new_columns(tmp_path):
+    import sqlite3
+
+    from sqlalchemy import inspect
+
+    from job_agent.db import ensure_schema, make_engine
+
+    path = str(tmp_path / "old.sqlite")
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE jobs (id VARCHAR(40) PRIMARY KEY, title VARCHAR(300))")
+    con.execute("INSERT INTO jobs VALUES ('a', 'Designer')")
+    con.commit()
+    con.close()
+
+    eng = make_engine(path)
+    from job_agent.models import Base
+
+    Base.metadata.create_all(eng)
+    ensure_schema(eng)
+    cols = {c["name"] for c in inspect(eng).get_columns("jobs")}
+    assert {"content_hash", "collected_at", "description"} <= cols
+    with eng.connect() as conn:
+        assert conn.exec_driver_sql("SELECT content_hash FROM jobs").scalar() == ""
+    eng.dispose()
@@ -0,0 +1,95 @@
+import asyncio
+import re
+from contextlib import contextmanager
+
+
+class FlakyProvider:
+    name = "fake"
+    model = "m"
+
+    def __init__(self, fail_first=0, always_fail=()):
+        self.fail_first = dict.fromkeys(range(fail_first), True)
+        self.always_fail = set(always_fail)
+        self.calls = 0
+        self.active = self.peak = 0
+
+    async def suggest(self, kind, prompt):
+        self.calls += 1
+        call = self.calls - 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if any(s in prompt for s in self.always_fail) or self.fail_first.pop(call, False):
+                raise RuntimeError("upstream 500")
+            return '{"draft": "Dear ' + re.search(r"Designer \d+ @ Acme", prompt).group() + '"}'
+        finally:
+            self.active -= 1
+
+
+def _jobs(n):
+    return {f"j{i}": {"id": f"j{i}", "title": f"Designer {i}", "company": "Acme"} for i in range(n)}
+
+
+def test_bounded_concurrency_retries_and_unknown_ids():
+    from backend.drafts import generate_drafts
+
+    prov = FlakyProvider(fail_first=1, always_fail={"Designer 3 "})
+    stored = {}
+    results = asyncio.run(
+        generate_drafts(
+            prov, _jobs(6), ["j0", "j1", "j2", "j3", "j4", "j5", "missing", "j0"], "cover_letter",
+            concurrency=2, retries=1, backoff=0, store=stored.__setitem__,
+        )
+    )
+
+    assert prov.peak <= 2
+    assert [r.id for r in results] == ["j0", "j1", "j2", "j3", "j4", "j5", "missing"]
+    assert results[0].ok and results[0].attempts == 2 and results[0].draft == "Dear Designer 0 @ Acme"
+    assert not results[3].ok and results[3].attempts == 2 and "upstream 500" in results[3].error
+    assert results[6].error == "unknown job" and results[6].attempts == 0
+    assert set(stored) == {"j0", "j1", "j2", "j4", "j5"}
+
+
+def test_batch_endpoint_stores_drafts_on_leads(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    import api.main as main
+    from job_agent.db import bulk_upsert_jobs, make_engine
+    from job_agent.models import Base, Lead
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    with Session(eng) as s:
+        bulk_upsert_jobs(s, [{"id": f"j{i}", "title": f"Designer {i}", "company": "Acme", "url": f"u{i}"} for i in range(3)])
+        s.commit()
+
+    @contextmanager
+    def session():
+        with Session(eng) as s:
+            yield s
+            s.commit()
+
+    prov = FlakyProvider()
+    monkeypatch.setattr(main, "supa_available", lambda: False)
+    monkeypatch.setattr(main, "get_read_session", session)
+    monkeypatch.setattr(main, "get_session", session)
+    monkeypatch.setattr(main, "get_default_provider", lambda: prov)
+    monkeypatch.setattr(main, "_cfg", {"llm_drafts": {"concurrency": 2, "retries": 0}})
+
+    with TestClient(main.app) as client:
+        r = client.post("/llm/drafts", json={"ids": ["j0", "j1", "j2", "nope"], "kind": "resume_bullets", "wait": True})
+        assert r.status_code == 200
+        batch = r.json()
+        assert (batch["status"], batch["total"], batch["done"], batch["failed"]) == ("done", 4, 4, 1)
+        assert client.get(f"/llm/drafts/{batch['id']}").json()["done"] == 4
+
+        queued = client.post("/llm/drafts", json={"ids": ["j0"]})
+        assert queued.status_code == 202 and queued.json()["total"] == 1
+        assert client.post("/llm/drafts", json={"ids": ["j0"], "kind": "haiku"}).status_code == 400
+
+    with Session(eng) as s:
+        lead = s.get(Lead, "j1")
+        assert lead.resume_bullets_draft == "Dear Designer 1 @ Acme" and lead.drafted_at
+        assert s.get(Lead, "nope") is None
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+
+class FakeResp:
+    def __init__(self, json_data, status_code=200):
+        self._json = json_data
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._json
+
+
+def test_engine_runs_async_and_sync_adapters(monkeypatch):
+    from job_agent import engine
+
+    state = {"inflight": 0, "peak": 0}
+
+    async def fake_async(query, cfg, client):
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        await asyncio.sleep(0.01)
+        state["inflight"] -= 1
+        return [{"id": f"a-{query}"}]
+
+    async def failing_async(query, cfg, client):
+        raise RuntimeError("boom")
+
+    def third_party(query, cfg):
+        assert threading.current_thread() is not threading.main_thread()
+        time.sleep(0.01)
+        return [{"id": f"s-{query}"}]
+
+    monkeypatch.setattr(engine, "ASYNC_ADAPTERS", {"fast": fake_async, "bad": failing_async})
+    monkeypatch.setattr(engine, "ADAPTERS", {"legacy": third_party})
+
+    cfg = {"concurrency": {"global": 2, "per_host": 2}}
+    out = engine.run_fetches(cfg, ["fast", "legacy", "bad", "missing"], ["x", "y", "z"])
+
+    assert [(s, t) for s, t, _ in out] == [
+        (s, t) for s in ["fast", "legacy", "bad"] for t in ["x", "y", "z"]
+    ]
+    assert out[0][2] == [{"id": "a-x"}]
+    assert out[4][2] == [{"id": "s-y"}]
+    assert all(jobs == [] for s, _, jobs in out if s == "bad")
+    assert state["peak"] <= 2
+
+
+def test_host_limited_client_bounds_per_host():
+    from job_agent.engine import HostLimitedClient
+
+    state = {"inflight": 0, "peak": 0}
+
+    class SlowClient:
+        async def get(self, url, **kwargs):
+            state["inflight"] += 1
+            state["peak"] = max(state["peak"], state["inflight"])
+            await asyncio.sleep(0.01)
+            state["inflight"] -= 1
+            return FakeResp({})
+
+    async def main():
+        c = HostLimitedClient(SlowClient(), per_host=1)
+        await asyncio.gather(*[c.get(f"https://one.test/{i}") for i in range(5)])
+
+    asyncio.run(main())
+    assert state["peak"] == 1
+
+
+def test_iter_fetches_streams_and_closes_early(monkeypatch):
+    from job_agent import engine
+
+    async def fake_async(query, cfg, client):
+        await asyncio.sleep(0.005)
+        return [{"id": query}]
+
+    monkeypatch.setattr(engine, "ASYNC_ADAPTERS", {"fast": fake_async})
+    monkeypatch.setattr(engine, "ADAPTERS", {})
+    terms = [str(i) for i in range(10)]
+
+    got = sorted(jobs[0]["id"] for _, _, jobs in engine.iter_fetches({}, ["fast"], terms))
+    assert got == sorted(terms)
+
+    it = engine.iter_fetches({}, ["fast"], terms)
+    assert next(it)[0] == "fast"
+    it.close()  # must not hang on the producer thread
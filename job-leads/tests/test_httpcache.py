@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+
+class Resp:
+    def __init__(self, status_code=200, json_data=None, headers=None):
+        self.status_code = status_code
+        self._json = json_data
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception("error")
+
+    def json(self):
+        return self._json
+
+
+def test_cache_ttl_and_eviction(tmp_path, monkeypatch):
+    from job_agent import httpcache
+
+    now = [1000.0]
+    monkeypatch.setattr(httpcache.time, "time", lambda: now[0])
+    cache = httpcache.HTTPCache(str(tmp_path / "c.sqlite"), ttl_seconds=100, max_bytes=60)
+    cache.store("u1", {"ETag": '"a"'}, [{"id": "1"}])
+    assert cache.lookup("u1").etag == '"a"'
+    assert httpcache.conditional_headers(cache.lookup("u1")) == {"If-None-Match": '"a"'}
+
+    # No validators -> nothing cached
+    cache.store("u2", {}, [{"id": "2"}])
+    assert cache.lookup("u2") is None
+
+    # Size bound evicts least recently used
+    now[0] += 1
+    cache.store("a", {"ETag": "x"}, [{"id": "a" * 20}])
+    now[0] += 1
+    cache.store("b", {"ETag": "y"}, [{"id": "b" * 20}])
+    assert cache.lookup("u1") is None and cache.lookup("a") is None
+    assert cache.lookup("b") is not None
+
+    # TTL expiry
+    now[0] += 101
+    assert cache.lookup("b") is None
+
+
+def test_greenhouse_304_short_circuits(tmp_path, monkeypatch):
+    from job_agent import httpclient
+    from job_agent.adapters import greenhouse
+
+    cfg = {"http_cache": {"enabled": True, "path": str(tmp_path / "c.sqlite")}}
+    payload = {"jobs": [{"absolute_url": "https://x/1", "title": "Designer"}]}
+    seen = []
+
+    def fake_get(url, headers=None, timeout=None):
+        seen.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return Resp(304)
+        return Resp(200, payload, {"ETag": '"v1"'})
+
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: SimpleNamespace(get=fake_get))
+    first = greenhouse.fetch_jobs("org", cfg)
+    second = greenhouse.fetch_jobs("org", cfg)
+    assert not getattr(first, "not_modified", False)
+    assert getattr(second, "not_modified", False)
+    assert [r["id"] for r in second] == [r["id"] for r in first]
+    assert "If-None-Match" not in seen[0] and seen[1]["If-None-Match"] == '"v1"'
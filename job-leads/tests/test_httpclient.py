@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_reuses_connections_and_reports_stats():
+    from job_agent import httpclient
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    try:
+        httpclient.close_session()
+        httpclient.STATS.reset()
+        cfg = {"rate_limits": {"default": {"rate": 1000, "burst": 100}}}
+        for _ in range(5):
+            assert httpclient.get(f"http://{host}/x", cfg).json() == {"ok": True}
+        stats = httpclient.connection_stats()[host]
+        assert stats == {"requests": 5, "connections": 1, "reused": 4}
+    finally:
+        server.shutdown()
+        httpclient.close_session()
+
+
+def test_async_client_counts_requests_and_connections():
+    import asyncio
+
+    from job_agent import httpclient
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+
+    async def main():
+        async with httpclient.async_client({"http": {"http2": False}}) as client:
+            for _ in range(3):
+                (await client.get(f"http://{host}/x")).raise_for_status()
+
+    try:
+        httpclient.STATS.reset()
+        asyncio.run(main())
+        assert httpclient.connection_stats()[host] == {"requests": 3, "connections": 1, "reused": 2}
+    finally:
+        server.shutdown()
+
+
+def test_get_retries_on_429(monkeypatch):
+    from job_agent import httpclient
+
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        status = 429 if len(calls) == 1 else 200
+        return SimpleNamespace(status_code=status, headers={"Retry-After": "0"})
+
+    monkeypatch.setattr(httpclient, "get_session", lambda cfg=None: SimpleNamespace(get=fake_get))
+    resp = httpclient.get("https://a.test/x", {"rate_limits": {"default": {"rate": 100}}})
+    assert resp.status_code == 200 and len(calls) == 2
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+
+class FakeProvider:
+    name = "fake"
+    model = "m1"
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def suggest(self, kind, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return f"{kind}:{prompt}:{self.calls}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from backend.llm import LLMCache
+
+    return LLMCache(str(tmp_path / "llm.sqlite"), ttl_seconds=3600, max_entries=2)
+
+
+def test_hits_force_refresh_and_key_parts(cache):
+    prov = FakeProvider()
+
+    async def go():
+        first = await cache.suggest(prov, "invite", "p", "short")
+        again = await cache.suggest(prov, "invite", "p", "short")
+        other_style = await cache.suggest(prov, "invite", "p", "long")
+        refreshed = await cache.suggest(prov, "invite", "p", "short", force_refresh=True)
+        after = await cache.suggest(prov, "invite", "p", "short")
+        return first, again, other_style, refreshed, after
+
+    first, again, other_style, refreshed, after = asyncio.run(go())
+    assert first == ("invite:p:1", False) and again == ("invite:p:1", True)
+    assert other_style == ("invite:p:2", False)
+    assert refreshed == ("invite:p:3", False) and after == ("invite:p:3", True)
+    assert prov.calls == 3
+    assert cache.stats == {"hit": 2, "miss": 3, "coalesced": 0}
+
+
+def test_ttl_and_lru_eviction(cache, monkeypatch):
+    from backend import llm
+    from backend.llm import cache_key
+
+    clock = [1000.0]
+    monkeypatch.setattr(llm.time, "time", lambda: clock[0])
+    keys = [cache_key("fake", "m1", "invite", str(i)) for i in range(3)]
+    cache.put(keys[0], "a")
+    clock[0] += 1
+    cache.put(keys[1], "b")
+    clock[0] += 1
+    assert cache.get(keys[0]) == "a"  # now most recently used
+    clock[0] += 1
+    cache.put(keys[2], "c")  # over max_entries=2: evicts keys[1]
+    assert cache.get(keys[1]) is None and cache.get(keys[0]) == "a"
+    clock[0] += 3601
+    assert cache.get(keys[2]) is None
+
+
+def test_concurrent_identical_requests_share_one_call(cache):
+    prov = FakeProvider(delay=0.05)
+
+    async def go():
+        return await asyncio.gather(*[cache.suggest(prov, "cover_letter", "same") for _ in range(5)])
+
+    results = asyncio.run(go())
+    assert prov.calls == 1
+    assert {text for text, _ in results} == {"cover_letter:same:1"}
+    assert cache.stats["miss"] == 1 and cache.stats["coalesced"] == 4
+
+
+def test_errors_reach_waiters_and_are_not_cached(cache):
+    prov = FakeProvider(delay=0.05, fail=True)
+
+    async def go():
+        return await asyncio.gather(
+            *[cache.suggest(prov, "invite", "x") for _ in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(go())
+    assert all(isinstance(r, RuntimeError) for r in results) and prov.calls == 1
+    prov.fail = False
+    assert asyncio.run(cache.suggest(prov, "invite", "x"))[1] is False
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    from backend import llm
+
+    requests = []
+
+    def install(handler):
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        monkeypatch.setattr(llm, "_CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(record)))
+        return requests
+
+    return install
+
+
+def _collect(agen):
+    async def go():
+        return [chunk async for chunk in agen]
+
+    return asyncio.run(go())
+
+
+def test_ollama_streams_ndjson_tokens_over_shared_client(mock_client):
+    from backend.llm import OllamaProvider
+
+    lines = [{"message": {"content": t}, "done": False} for t in ("Hel", "lo", "")]
+    lines.append({"message": {"content": ""}, "done": True})
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+    requests = mock_client(lambda req: httpx.Response(200, text=body))
+
+    chunks = _collect(OllamaProvider(base="http://ollama.test", model="m").suggest_stream("invite", "hi"))
+    assert chunks == ["Hel", "lo"]
+    assert json.loads(requests[0].content)["stream"] is True
+
+
+def test_openrouter_streams_sse_deltas(mock_client):
+    from backend.llm import OpenRouterProvider
+
+    events = [": OPENROUTER PROCESSING", ""]
+    for t in ("Hi", " there"):
+        events += ["data: " + json.dumps({"choices": [{"delta": {"content": t}}]}), ""]
+    events += ["data: [DONE]", ""]
+    requests = mock_client(lambda req: httpx.Response(200, text="\n".join(events)))
+
+    assert _collect(OpenRouterProvider("k").suggest_stream("comment", "x")) == ["Hi", " there"]
+    assert requests[0].headers["authorization"] == "Bearer k"
+
+
+class StreamingFake:
+    name = "fake"
+    model = "m"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def suggest(self, kind, prompt):
+        return "".join([c async for c in self.suggest_stream(kind, prompt)])
+
+    async def suggest_stream(self, kind, prompt):
+        self.calls += 1
+        for t in ('{"draft": ', '"Hello"', "}"):
+            yield t
+
+
+def test_stream_endpoint_emits_tokens_then_cached_done(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as main
+    from backend import llm
+
+    prov = StreamingFake()
+    monkeypatch.setattr(main, "get_default_provider", lambda: prov)
+    monkeypatch.setattr(main, "_cfg", {"llm_cache": {"enabled": True, "path": str(tmp_path / "llm.sqlite")}})
+    body = {"type": "invite", "payload": {"full_name": "Ada"}}
+
+    with TestClient(main.app) as client:
+        assert llm._CLIENT is not None  # opened by the lifespan
+        first = client.post("/llm/suggest/stream", json=body).text
+        second = client.post("/llm/suggest/stream", json=body).text
+    assert llm._CLIENT is None
+
+    assert first.count("event: token") == 3
+    assert 'event: done\ndata: {"draft": "Hello", "cached": false}' in first
+    # Second request is served whole from the cache
+    assert second.count("event: token") == 1 and '"cached": true' in second
+    assert prov.calls == 1
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from job_agent import matcher as matcher_mod
+from job_agent.matcher import KeywordMatcher, record_text
+
+
+def _naive(record, include, exclude, plus, minus):
+    text = record_text(record)
+    inc = any(t.lower() in text for t in include)
+    exc = any(t.lower() in text for t in exclude)
+    score = sum(w for t, w in plus if t.lower() in text) - sum(w for t, w in minus if t.lower() in text)
+    return inc, exc, score
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_matcher_agrees_with_substring_scan(monkeypatch, use_automaton):
+    if not use_automaton:
+        monkeypatch.setattr(matcher_mod, "ahocorasick", None)
+    elif matcher_mod.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+
+    include = ["UX", "product designer", "design"]
+    exclude = ["senior", "sen", "lead"]
+    plus = [["wcag", 3], ["figma", 2], ["design", 1], ["figma", 1]]
+    minus = [["senior", 4], ["lead", 2]]
+    m = KeywordMatcher(include, exclude, plus, minus)
+    assert (m._automaton is not None) == use_automaton
+
+    rng = random.Random(7)
+    words = ["ux", "Senior", "product", "designer", "figma", "WCAG", "team", "lead", "leader", "remote"]
+    for _ in range(300):
+        rec = {
+            "title": " ".join(rng.choices(words, k=3)),
+            "tags": ",".join(rng.choices(words, k=2)),
+            "description": " ".join(rng.choices(words, k=8)),
+        }
+        got = m.match(rec)
+        assert (got.include_hit, got.exclude_hit, got.score) == _naive(rec, include, exclude, plus, minus)
+
+
+def test_match_keep_and_empty_include():
+    m = KeywordMatcher(exclude=["senior"], plus=[["figma", 2]])
+    assert m.match({"title": "Designer", "description": "Figma"}).keep
+    assert m.match({"title": "Designer", "description": "Figma"}).score == 2
+    assert not m.match({"title": "Senior Designer"}).keep
+    assert KeywordMatcher(include=[""]).match({"title": "anything"}).keep
+
+
+def test_from_config_is_cached():
+    cfg = {"include": ["ux"], "exclude": [], "score_rules": {"plus": [["wcag", 3]], "minus": []}}
+    assert KeywordMatcher.from_config(cfg) is KeywordMatcher.from_config(dict(cfg))
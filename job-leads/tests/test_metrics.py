@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    from job_agent import metrics
+
+    monkeypatch.setattr(metrics, "_ENABLED", True)
+    metrics.REGISTRY.clear()
+    yield metrics
+    metrics.REGISTRY.clear()
+
+
+def test_disabled_registry_records_nothing(monkeypatch):
+    from job_agent import metrics
+
+    monkeypatch.setattr(metrics, "_ENABLED", False)
+    h = metrics.Histogram("t_seconds", "test", ("op",))
+    c = metrics.Counter("t_total", "test", ("op",))
+    with metrics.timer(h, op="x"):
+        pass
+    h.observe(1.0, op="x")
+    c.inc(op="x")
+    assert h.count(op="x") == 0 and c.value(op="x") == 0
+    assert metrics.timer(h, op="x") is metrics.timer(h, op="y")  # shared no-op
+
+
+def test_prometheus_text_format(metrics):
+    reg = metrics.Registry()
+    h = reg.histogram("t_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    c = reg.counter("t_total", "Hits", ("status",))
+    h.observe(0.05, route='/a"b')
+    h.observe(0.5, route='/a"b')
+    h.observe(5, route='/a"b')
+    c.inc(status="200")
+    c.inc(2, status="200")
+
+    text = reg.render()
+    assert "# TYPE t_seconds histogram\n" in text
+    assert 't_seconds_bucket{route="/a\\"b",le="0.1"} 1\n' in text
+    assert 't_seconds_bucket{route="/a\\"b",le="1"} 2\n' in text
+    assert 't_seconds_bucket{route="/a\\"b",le="+Inf"} 3\n' in text
+    assert 't_seconds_sum{route="/a\\"b"} 5.55\n' in text
+    assert 't_seconds_count{route="/a\\"b"} 3\n' in text
+    assert "# TYPE t_total counter\n" in text and 't_total{status="200"} 3\n' in text
+
+
+def test_api_metrics_route_labels_and_sqlite_timings(metrics, tmp_path, monkeypatch):
+    from contextlib import contextmanager
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    import api.main as main
+    from job_agent.db import make_engine
+    from job_agent.models import Base
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+
+    @contextmanager
+    def read_session():
+        with Session(eng) as s:
+            yield s
+
+    monkeypatch.setattr(main, "supa_available", lambda: False)
+    monkeypatch.setattr(main, "get_read_session", read_session)
+    client = TestClient(main.app)
+    assert client.get("/leads").status_code == 200
+    client.get("/runs/nope")
+
+    text = client.get("/metrics").text
+    assert 'jobleads_http_request_duration_seconds_count{method="GET",route="/leads",status="200"} 1' in text
+    assert 'route="/runs/{run_id}",status="404"' in text
+    assert 'jobleads_db_query_duration_seconds_count{backend="sqlite",op="SELECT"}' in text
+
+    monkeypatch.setattr(metrics, "_ENABLED", False)
+    assert client.get("/metrics").status_code == 404
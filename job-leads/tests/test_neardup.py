@@ -0,0 +1,153 @@
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy.orm import Session
+
+from job_agent.neardup import NearDupIndex, company_key
+
+DESC = (
+    "We are looking for a senior backend engineer to design and build scalable APIs in Python. "
+    "You will work with Postgres, Redis and Kubernetes, mentor engineers and own services end to end. "
+    "Remote friendly, competitive salary and equity."
+)
+LEVER = {
+    "id": "lever1",
+    "title": "Senior Backend Engineer",
+    "company": "acme-labs",
+    "location": "Remote - US",
+    "description": DESC,
+    "url": "https://jobs.lever.co/acme-labs/1",
+    "source": "lever",
+}
+# Same job re-listed: different URL, company spelling, title suffix, HTML and a trimmed sentence
+REMOTEOK = {
+    "id": "rok1",
+    "title": "Senior Backend Engineer (Remote)",
+    "company": "Acme Labs, Inc.",
+    "location": "Remote",
+    "description": "<p>" + DESC.replace("Remote friendly, ", "") + "</p>",
+    "url": "https://remoteok.com/1",
+    "source": "remoteok",
+}
+# Same boilerplate, different role
+FRONTEND = {
+    **REMOTEOK,
+    "id": "lever2",
+    "title": "Senior Frontend Engineer",
+    "description": DESC.replace("backend", "frontend").replace("APIs in Python", "UIs in React"),
+    "url": "https://jobs.lever.co/acme-labs/2",
+}
+OTHER_CO = {**REMOTEOK, "id": "globex1", "company": "Globex", "url": "https://globex.test/1"}
+
+def test_company_key_normalizes_slugs_and_suffixes():
+    assert company_key("acme-labs") == company_key("Acme Labs, Inc.") == "acmelabs"
+
+
+def test_cross_source_repost_links_to_first_posting(tmp_path):
+    index = NearDupIndex(str(tmp_path / "nd.sqlite"))
+    result = index.assign([LEVER, REMOTEOK, FRONTEND, OTHER_CO])
+    assert result.links == {"lever1": "lever1", "rok1": "lever1", "lever2": "lever2", "globex1": "globex1"}
+    assert result.grown == {"lever1"}
+    index.commit(result)
+    assert index.duplicate_urls(["lever1", "lever2"]) == {"lever1": [REMOTEOK["url"]], "lever2": []}
+
+    # Links survive a restart and a re-scrape doesn't count as a new duplicate
+    again = NearDupIndex(str(tmp_path / "nd.sqlite")).assign([REMOTEOK, LEVER])
+    assert (again.links, again.grown) == ({"rok1": "lever1", "lever1": "lever1"}, set())
+
+
+def test_only_cross_source_postings_of_a_known_company_merge(tmp_path):
+    index = NearDupIndex(str(tmp_path / "nd.sqlite"))
+    # One board listing the same role in two cities: two jobs
+    berlin = {**LEVER, "id": "lever-berlin", "location": "Berlin", "url": "https://jobs.lever.co/acme-labs/b"}
+    assert set(index.assign([LEVER, berlin]).links.values()) == {"lever1", "lever-berlin"}
+    # A generic title with no description or company (e.g. WWR) never merges
+    bare = {"id": "a", "title": "Software Engineer", "company": "", "source": "wwr", "url": "https://a"}
+    other = {**bare, "id": "b", "source": "remoteok", "url": "https://b"}
+    assert index.assign([bare, other]).links == {"a": "a", "b": "b"}
+    # Disjoint locations on different boards: not the same opening
+    london = {**REMOTEOK, "id": "rok-london", "location": "London"}
+    assert index.assign([{**LEVER, "location": "Berlin"}, london]).links["rok-london"] == "rok-london"
+
+
+def test_run_scrape_folds_duplicates_into_canonical(tmp_path, monkeypatch):
+    import csv
+
+    from job_agent import neardup, orchestrator
+    from job_agent.httpcache import NotModified
+    from job_agent.schema import JobModel
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(neardup, "_INDEX", None)
+    # The duplicate comes from a board answering 304, i.e. from the HTTP cache
+    fetched = [("lever", "", [dict(LEVER)]), ("remoteok", "", NotModified([dict(REMOTEOK)]))]
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter(fetched))
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {})
+    written = []
+
+    def fake_write(batch):
+        written.extend(r["id"] for r in batch)
+        return [JobModel(id=r["id"]) for r in batch]
+
+    alt = {}
+    monkeypatch.setattr(orchestrator, "_write_batch_local", fake_write)
+    monkeypatch.setattr(orchestrator, "get_session", nullcontext)
+    monkeypatch.setattr(orchestrator, "set_alt_urls", lambda session, urls: alt.update(urls))
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    cfg = {
+        "sites": ["lever", "remoteok"],
+        "batch_size": 1,
+        "output_csv": str(tmp_path / "jobs.csv"),
+        "near_duplicates": {"enabled": True, "path": str(tmp_path / "nd.sqlite")},
+    }
+    stats = orchestrator.RunStats()
+    _, _, _, new_jobs = orchestrator.run_scrape(cfg, stats)
+
+    assert written == ["lever1"]
+    assert [j.id for j in new_jobs] == ["lever1"]
+    assert stats.duplicates == 1
+    assert alt == {"lever1": REMOTEOK["url"]}
+    assert orchestrator.run_record("r", "done", "", "", stats)["duplicates"] == 1
+    with open(tmp_path / "jobs.csv", newline="", encoding="utf-8") as f:
+        assert [r["url"] for r in csv.DictReader(f)] == [LEVER["url"]]
+
+
+def test_failed_write_stores_no_links(tmp_path, monkeypatch):
+    from job_agent import neardup, orchestrator
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(neardup, "_INDEX", None)
+    fetched = [("lever", "", [dict(LEVER), dict(REMOTEOK)])]
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter(fetched))
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {})
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+
+    def failing_write(batch):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(orchestrator, "_write_batch_local", failing_write)
+    cfg = {
+        "sites": ["lever"],
+        "output_csv": str(tmp_path / "jobs.csv"),
+        "near_duplicates": {"enabled": True, "path": str(tmp_path / "nd.sqlite")},
+    }
+    with pytest.raises(RuntimeError):
+        orchestrator.run_scrape(cfg)
+    assert NearDupIndex(str(tmp_path / "nd.sqlite")).duplicate_urls(["lever1"]) == {"lever1": []}
+
+
+def test_alt_urls_survive_job_upserts(tmp_path):
+    from job_agent.db import bulk_upsert_jobs, ensure_schema, make_engine, set_alt_urls
+    from job_agent.models import Base, Job
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    ensure_schema(eng)
+    with Session(eng) as s:
+        bulk_upsert_jobs(s, [LEVER])
+        set_alt_urls(s, {"lever1": REMOTEOK["url"], "only-in-supabase": "https://x"})
+        bulk_upsert_jobs(s, [{**LEVER, "title": "Staff Backend Engineer"}])
+        s.commit()
+        job = s.get(Job, "lever1")
+        assert (job.title, job.alt_urls) == ("Staff Backend Engineer", REMOTEOK["url"])
+    eng.dispose()
@@ -0,0 +1,203 @@
+import csv
+
+
+def _rec(i, title="Product Designer", location="Remote"):
+    return {
+        "id": f"{i:040x}",
+        "title": title,
+        "company": "Acme",
+        "location": location,
+        "tags": "",
+        "url": f"https://x/{i}",
+        "source": "fake",
+        "description": "figma",
+    }
+
+
+def test_run_scrape_streams_in_batches(tmp_path, monkeypatch):
+    from job_agent import orchestrator
+    from job_agent.httpcache import NotModified
+    from job_agent.schema import JobModel
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    fetched = [
+        ("fake", "ux", [_rec(1), _rec(2), _rec(3, title="Senior Designer")]),
+        ("fake", "designer", [_rec(2), _rec(4), _rec(5, location="Berlin")]),
+        ("cached", "ux", NotModified([_rec(6)])),
+    ]
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter(fetched))
+    batches = []
+
+    def fake_write(batch):
+        batches.append([r["id"] for r in batch])
+        return [JobModel(**{k: r[k] for k in ("id", "title")}) for r in batch]
+
+    monkeypatch.setattr(orchestrator, "_write_batch_local", fake_write)
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {})
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    out_csv = tmp_path / "jobs.csv"
+    cfg = {
+        "sites": ["fake", "cached"],
+        "include": ["designer"],
+        "exclude": ["senior"],
+        "locations": ["remote"],
+        "score_rules": {"plus": [["figma", 2]]},
+        "output_csv": str(out_csv),
+        "batch_size": 2,
+    }
+    all_c, filt_c, uniq_c, new_jobs = orchestrator.run_scrape(cfg)
+
+    # The 304 board's cached record goes through the same pipeline as fresh ones
+    assert (all_c, filt_c, uniq_c) == (7, 5, 4)
+    assert [len(b) for b in batches] == [2, 2]
+    assert len(new_jobs) == 4
+    with open(out_csv, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r["url"] for r in rows) == ["https://x/1", "https://x/2", "https://x/4", "https://x/6"]
+    assert rows[0]["score"] == "2"
+
+
+def test_unchanged_jobs_are_skipped(tmp_path, monkeypatch):
+    from job_agent import orchestrator
+    from job_agent.schema import JobModel
+    from job_agent.utils import content_hash
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    recs = [_rec(1), _rec(2), _rec(3)]
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter([("fake", "", recs)]))
+    stored = {
+        recs[0]["id"]: content_hash(recs[0]),  # unchanged
+        recs[1]["id"]: content_hash({**recs[1], "title": "Old title"}),  # changed
+    }
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: stored)
+    written = []
+
+    def fake_write(batch):
+        written.extend(r["id"] for r in batch)
+        return [JobModel(id=r["id"]) for r in batch if r["id"] not in stored]
+
+    monkeypatch.setattr(orchestrator, "_write_batch_local", fake_write)
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    stats = orchestrator.RunStats()
+    orchestrator.run_scrape({"sites": ["fake"], "output_csv": str(tmp_path / "jobs.csv")}, stats)
+
+    assert written == [recs[1]["id"], recs[2]["id"]]
+    assert (stats.unique, stats.new, stats.changed, stats.skipped) == (3, 1, 1, 1)
+    # The CSV export still has every job of the run
+    assert len((tmp_path / "jobs.csv").read_text().splitlines()) == 4
+
+
+def test_supabase_path_uses_local_fingerprint_index(tmp_path, monkeypatch):
+    from job_agent import orchestrator
+    from job_agent.schema import JobModel
+
+    monkeypatch.setenv("SUPABASE_URL", "http://supa.test")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "key")
+    recs = [_rec(1), _rec(2)]
+    monkeypatch.setattr(
+        orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter([("fake", "", [dict(r) for r in recs])])
+    )
+    sent, server = [], set()
+
+    def fake_write(batch):
+        sent.append([r["id"] for r in batch])
+        new = [JobModel(id=r["id"]) for r in batch if r["id"] not in server]
+        server.update(r["id"] for r in batch)
+        return new
+
+    monkeypatch.setattr(orchestrator, "_write_batch_supa", fake_write)
+    monkeypatch.setattr(orchestrator, "get_existing_ids_supa", lambda ids, service=True: server & set(ids))
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    cfg = {"sites": ["fake"], "fingerprint_index": str(tmp_path / "fp.sqlite")}
+
+    first, second = orchestrator.RunStats(), orchestrator.RunStats()
+    orchestrator.run_scrape(cfg, first)
+    orchestrator.run_scrape(cfg, second)
+
+    assert sent == [[recs[0]["id"], recs[1]["id"]]]
+    assert (first.new, first.skipped) == (2, 0)
+    assert (second.new, second.changed, second.skipped) == (0, 0, 2)
+
+    # A new scoring rule changes the fingerprint of the jobs it scores
+    orchestrator.run_scrape({**cfg, "score_rules": {"plus": [["figma", 2]]}})
+    assert sent[-1] == [recs[0]["id"], recs[1]["id"]]
+
+    # The server wins over the local file: rows missing from a reset project are resent
+    server.discard(recs[1]["id"])
+    third = orchestrator.RunStats()
+    orchestrator.run_scrape({**cfg, "score_rules": {"plus": [["figma", 2]]}}, third)
+    assert sent[-1] == [recs[1]["id"]]
+    assert (third.new, third.skipped) == (1, 1)
+
+
+def test_run_history_records_fetches_and_stages(tmp_path, monkeypatch):
+    import pytest
+
+    from job_agent import orchestrator
+    from job_agent.engine import FetchStat
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+
+    def fake_fetches(cfg, sites, terms, observer=None):
+        observer(FetchStat("fake", "ux", 2, 0.25, bytes=1200, parse_seconds=0.05))
+        yield ("fake", "ux", [_rec(1), _rec(2)])
+        observer(FetchStat("down", "ux", 0, 0.5, error="ConnectError"))
+        yield ("down", "ux", [])
+        raise RuntimeError("engine crashed")
+
+    monkeypatch.setattr(orchestrator, "iter_fetches", fake_fetches)
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {})
+    monkeypatch.setattr(orchestrator, "_write_batch_local", lambda batch: [])
+    saved = []
+    monkeypatch.setattr(orchestrator, "_save_run", lambda run, fetches, supa, local: saved.append((run, fetches)))
+
+    stats = orchestrator.RunStats()
+    with pytest.raises(RuntimeError):
+        orchestrator.run_scrape({"sites": ["fake"], "output_csv": str(tmp_path / "jobs.csv")}, stats, run_id="r1")
+
+    (run, fetches), = saved
+    assert run["id"] == "r1" and run["status"] == "failed" and "engine crashed" in run["error"]
+    assert (run["scraped"], run["fetch_bytes"], run["parse_seconds"]) == (2, 1200, 0.05)
+    assert run["seconds"] >= run["match_seconds"] >= 0
+    assert [(f["site"], f["records"], f["error"]) for f in fetches] == [("fake", 2, ""), ("down", 0, "ConnectError")]
+
+
+def test_not_modified_boards_are_written_when_the_store_lacks_them(tmp_path, monkeypatch):
+    from job_agent import orchestrator
+    from job_agent.httpcache import NotModified
+    from job_agent.schema import JobModel
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    greenhouse, remoteok = [_rec(1), _rec(2)], [_rec(3)]
+
+    def fake_fetches(cfg, sites, terms, observer=None):
+        return iter([("greenhouse", "", NotModified(greenhouse)), ("remoteok", "", list(remoteok))])
+
+    store, written = {}, []
+
+    def fake_write(batch):
+        written.append(sorted(r["id"] for r in batch))
+        store.update((r["id"], r["content_hash"]) for r in batch)
+        return [JobModel(id=r["id"]) for r in batch]
+
+    monkeypatch.setattr(orchestrator, "iter_fetches", fake_fetches)
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {i: store[i] for i in ids if i in store})
+    monkeypatch.setattr(orchestrator, "_write_batch_local", fake_write)
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    cfg = {"sites": ["greenhouse", "remoteok"], "output_csv": str(tmp_path / "jobs.csv")}
+    all_ids = sorted(_rec(i)["id"] for i in (1, 2, 3))
+
+    # Cached records the store has never seen (e.g. a fresh database) are written
+    orchestrator.run_scrape(cfg)
+    assert written == [all_ids]
+    # Once stored, the hash check skips them; the CSV still has every job
+    stats = orchestrator.RunStats()
+    orchestrator.run_scrape(cfg, stats)
+    assert len(written) == 1
+    assert (stats.all, stats.filtered, stats.unique, stats.skipped) == (3, 3, 3, 3)
+    with open(tmp_path / "jobs.csv", newline="", encoding="utf-8") as f:
+        assert sorted(r["url"] for r in csv.DictReader(f)) == ["https://x/1", "https://x/2", "https://x/3"]
+    # A reset store gets the 304 board's jobs back without waiting for the board to change
+    store.clear()
+    orchestrator.run_scrape(cfg)
+    assert written[-1] == all_ids
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from job_agent.adapters import parsers, remoteok
+from job_agent.adapters import weworkremotely as wwr
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _strip_volatile(records):
+    return [{k: v for k, v in r.items() if k != "collected_at"} for r in records]
+
+
+@pytest.mark.parametrize("backend", [b for b in parsers.available_backends() if b != "bs4"])
+@pytest.mark.parametrize(
+    "module,fixture", [(remoteok, "remoteok.html"), (wwr, "weworkremotely.html")]
+)
+def test_backend_matches_bs4(backend, module, fixture):
+    html = _load(fixture)
+    expected = _strip_volatile(module.parse_html(html, "bs4"))
+    assert expected
+    assert _strip_volatile(module.parse_html(html, backend)) == expected
+
+
+def test_fixture_records_bs4():
+    rows = remoteok.parse_html(_load("remoteok.html"), "bs4")
+    assert [r["title"] for r in rows][:2] == ["Product Designer", "Senior UX\xa0Designer"]
+    assert rows[0]["tags"] == "Design,Figma,UX" and rows[0]["company"] == "Acme & Co"
+    assert rows[3]["url"] == ""  # anchor without href
+
+    rows = wwr.parse_html(_load("weworkremotely.html"), "bs4")
+    assert [r["company"] for r in rows] == ["Acme", "Initech & Sons", "Hooli"]
+
+
+def test_auto_backend_and_selector_subset():
+    assert parsers.get_backend("auto").name == parsers.available_backends()[0]
+    assert parsers.css_to_xpath("div.tags > a") == (
+        ".//div[contains(concat(' ', normalize-space(@class), ' '), ' tags ')]/a"
+    )
+    with pytest.raises(ValueError):
+        parsers.css_to_xpath("a[href]")
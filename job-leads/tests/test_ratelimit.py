@@ -0,0 +1,45 @@
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_token_bucket_burst_then_paced():
+    from job_agent.ratelimit import TokenBucket
+
+    clock = FakeClock()
+    b = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert b.reserve() == 0.0
+    assert b.reserve() == 0.0
+    assert b.reserve() == 0.5
+    clock.t = 10.0
+    assert b.reserve() == 0.0
+
+
+def test_token_bucket_honors_block():
+    from job_agent.ratelimit import TokenBucket
+
+    clock = FakeClock()
+    b = TokenBucket(rate=10.0, burst=5, clock=clock)
+    b.block_for(3.0)
+    assert b.reserve() == 3.0
+
+
+def test_retry_after_parsing():
+    from job_agent.ratelimit import retry_after_seconds
+
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+
+
+def test_limiter_buckets_are_per_host():
+    from job_agent.ratelimit import RateLimiter
+
+    lim = RateLimiter({"default": {"rate": 1, "burst": 1}, "hosts": {"slow.test": {"rate": 0.1, "burst": 1}}})
+    assert lim.bucket("a.test") is not lim.bucket("b.test")
+    assert lim.bucket("slow.test").rate == 0.1
+    assert lim.bucket("a.test").reserve() == 0.0
+    assert lim.bucket("b.test").reserve() == 0.0
@@ -1,3 +1,4 @@
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -11,8 +12,9 @@ class FakeTable:
         self._filter = None
 
     # Chainable builders
-    def upsert(self, rows, on_conflict=None):
+    def upsert(self, rows, on_conflict=None, **kwargs):
         self.ops.append(("upsert", rows, on_conflict))
+        self.upsert_kwargs = kwargs
         self._data = rows
         return self
 
@@ -75,10 +77,11 @@ def test_ensure_leads_inserts_missing(monkeypatch):
 
     fake = FakeClient()
     monkeypatch.setattr(repo, "get_supa_client", lambda service=True: fake)
-    repo.ensure_leads_supa(["a", "b"], service=True)
-    # Should attempt to insert 2 ids because select returns empty
+    repo.ensure_leads_supa(["a", "b", "a"], service=True)
+    # One idempotent upsert (ON CONFLICT DO NOTHING), no check-then-insert round trip
     ops = fake.tables["leads"].ops
-    assert any(op[0] == "insert" for op in ops)
+    assert ops == [("upsert", [{"id": "a"}, {"id": "b"}], "id")]
+    assert fake.tables["leads"].upsert_kwargs["ignore_duplicates"] is True
 
 
 def test_bulk_status_updates(monkeypatch):
@@ -91,3 +94,147 @@ def test_bulk_status_updates(monkeypatch):
     # Update op recorded
     assert any(op[0] == "update" for op in fake.tables["leads"].ops)
 
+
+
+def test_bulk_scores_upserts_in_batches(monkeypatch):
+    from job_agent import repo
+
+    fake = FakeClient()
+    monkeypatch.setattr(repo, "get_supa_client", lambda service=True: fake)
+    scores = {f"id{i}": i % 7 for i in range(25)}
+    assert repo.bulk_scores_supa(scores, batch_size=10, max_workers=3) == 25
+    ops = fake.tables["leads"].ops
+    # One upsert per batch, no per-row updates and no ensure_leads round trip
+    assert [op[0] for op in ops] == ["upsert"] * 3
+    sent = [row for op in ops for row in op[1]]
+    assert {r["id"]: r["score"] for r in sent} == scores
+    assert all(op[2] == "id" and set(op[1][0]) == {"id", "score", "updated_at"} for op in ops)
+
+
+class RecordingClient:
+    """Fresh builder per table() call so concurrent chunks don't share filter state."""
+
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        client = self
+
+        class Builder:
+            def select(self, cols="*"):
+                return self
+
+            def in_(self, col, ids):
+                self.ids = list(ids)
+                return self
+
+            def execute(self):
+                client.calls.append(self.ids)
+                return SimpleNamespace(data=[{"id": i} for i in self.ids if not i.endswith("7")])
+
+        return Builder()
+
+
+def test_existing_ids_split_by_url_length_and_merged(monkeypatch):
+    from urllib.parse import quote
+
+    from job_agent import repo
+
+    fake = RecordingClient()
+    monkeypatch.setattr(repo, "get_supa_client", lambda service=True: fake)
+    ids = [f"{i:040x}" for i in range(5000)]
+    found = repo.get_existing_ids_supa(ids + ids[:10])
+    assert found == {i for i in ids if not i.endswith("7")}
+    assert len(fake.calls) > 1
+    assert sorted(i for c in fake.calls for i in c) == sorted(ids)
+    assert all(len(quote(",".join(c), safe="")) <= repo.MAX_FILTER_URL_BYTES for c in fake.calls)
+
+
+def test_chunk_rows_respects_row_and_byte_limits():
+    from job_agent.repo import chunk_rows
+
+    rows = [{"id": str(i), "description": "x" * 100} for i in range(50)]
+    chunks = list(chunk_rows(rows, max_rows=20, max_bytes=1000))
+    assert [r for c in chunks for r in c] == rows
+    assert all(len(c) <= 20 for c in chunks)
+    assert all(len(json.dumps(c)) <= 1000 for c in chunks)
+
+
+def test_run_chunks_retries_only_the_failed_chunk(monkeypatch):
+    from job_agent import repo
+
+    monkeypatch.setattr(repo, "RETRY_BACKOFF", 0)
+    attempts = {}
+
+    def fn(chunk):
+        attempts[chunk] = attempts.get(chunk, 0) + 1
+        if chunk == "b" and attempts[chunk] < 2:
+            raise RuntimeError("transient")
+        return chunk.upper()
+
+    assert repo.run_chunks(fn, ["a", "b", "c"], max_workers=3) == ["A", "B", "C"]
+    assert attempts == {"a": 1, "b": 2, "c": 1}
+
+    def down(chunk):
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        repo.run_chunks(down, ["x"], retries=1)
+
+
+def test_ingest_jobs_single_rpc_per_chunk(monkeypatch):
+    from job_agent import repo
+
+    calls = []
+
+    class RpcClient:
+        def rpc(self, fn, params):
+            calls.append((fn, params["rows"]))
+            data = [{"id": r["id"], "inserted": r["id"] != "old"} for r in params["rows"]]
+            return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+    monkeypatch.setattr(repo, "get_supa_client", lambda service=True: RpcClient())
+    records = [
+        {"id": "old", "title": "t", "url": "u1", "source": "s", "posted_at": ""},
+        {"id": "new", "title": "t", "url": "u2", "source": "s"},
+        {"id": "new", "title": "t2", "url": "u2", "source": "s"},
+    ]
+    assert repo.ingest_jobs_supa(records) == ["new"]
+    assert len(calls) == 1 and calls[0][0] == "ingest_jobs"
+    rows = calls[0][1]
+    assert [r["id"] for r in rows] == ["old", "new"]
+    assert rows[1]["title"] == "t2" and rows[0]["posted_at"] is None
+
+
+def test_query_jobs_embeds_leads_and_filters_status_server_side(monkeypatch):
+    from job_agent import repo
+
+    ops = []
+
+    class Query:
+        def __getattr__(self, name):
+            def call(*args, **kwargs):
+                ops.append((name, args))
+                return self
+
+            return call
+
+        def execute(self):
+            return SimpleNamespace(data=[{"id": "a", "leads": [{"id": "a", "status": "Applied"}]}])
+
+    class Client:
+        def table(self, name):
+            ops.append(("table", (name,)))
+            return Query()
+
+    monkeypatch.setattr(repo, "get_supa_client", lambda service=False: Client())
+    rows = repo.query_jobs_supa({"status": "Applied", "limit": 10}, with_leads=True)
+    assert ("select", ("*, leads!inner(*)",)) in ops
+    assert ("eq", ("leads.status", "Applied")) in ops
+    assert ("range", (0, 9)) in ops
+    assert repo.embedded_lead(rows[0]) == {"id": "a", "status": "Applied"}
+    assert repo.embedded_lead({"leads": None}) is None
+
+    ops.clear()
+    repo.query_jobs_supa({}, with_leads=True)
+    assert ("select", ("*, leads(*)",)) in ops and not any(op[0] == "eq" for op in ops)
@@ -0,0 +1,140 @@
+import threading
+
+
+def _fake_scrape(release):
+    def scrape(cfg, stats, progress, run_id=None):
+        progress("fetch", {"site": "fake", "term": "ux", "records": 3, "seconds": 0.01, "error": ""})
+        release.wait(5)
+        stats.all = stats.unique = stats.new = 3
+        progress("batch", {"all": 3})
+
+    return scrape
+
+
+def test_single_active_run_and_progress_events():
+    from job_agent.runner import ScrapeManager
+
+    release = threading.Event()
+    mgr = ScrapeManager(lambda: {}, scrape=_fake_scrape(release))
+    run, created = mgr.submit()
+    again, created_again = mgr.submit()
+    assert created and not created_again and again is run
+
+    events, finished = mgr.events_since(run.id, 0, timeout=5)
+    seen = list(events)
+    while not any(kind == "fetch" for _, kind, _ in seen):
+        events, finished = mgr.events_since(run.id, seen[-1][0], timeout=5)
+        seen += events
+    assert not finished
+    release.set()
+    while not finished:
+        events, finished = mgr.events_since(run.id, seen[-1][0], timeout=5)
+        seen += events
+
+    kinds = [kind for _, kind, _ in seen]
+    assert kinds == ["status", "status", "fetch", "batch", "status"]
+    assert [seq for seq, _, _ in seen] == [1, 2, 3, 4, 5]
+    snap = mgr.snapshot(run.id)
+    assert snap["status"] == "done" and snap["stats"]["new"] == 3
+    assert snap["fetches"][0]["records"] == 3
+
+    # Finished runs no longer block new ones
+    release2 = threading.Event()
+    release2.set()
+    mgr.scrape = _fake_scrape(release2)
+    nxt, created = mgr.submit()
+    assert created and nxt.id != run.id
+
+
+def test_failed_run_reports_error():
+    from job_agent.runner import ScrapeManager
+
+    def boom(cfg, stats, progress, run_id=None):
+        raise RuntimeError("site down")
+
+    mgr = ScrapeManager(lambda: {}, scrape=boom)
+    run, _ = mgr.submit()
+    finished = False
+    while not finished:
+        _, finished = mgr.events_since(run.id, 0, timeout=5)
+    assert mgr.snapshot(run.id)["status"] == "failed"
+    assert "site down" in mgr.snapshot(run.id)["error"]
+
+
+def test_api_returns_run_id_and_streams_events(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as main
+    from job_agent.runner import ScrapeManager
+
+    release = threading.Event()
+    release.set()
+    monkeypatch.setattr(main, "_runner", ScrapeManager(lambda: {}, scrape=_fake_scrape(release)))
+    client = TestClient(main.app)
+
+    r = client.post("/run-scrape")
+    assert r.status_code == 202
+    run_id = r.json()["id"]
+    with client.stream("GET", f"/runs/{run_id}/events") as resp:
+        body = "".join(resp.iter_text())
+    assert "event: fetch" in body and body.rstrip().endswith("}")
+    assert client.get(f"/runs/{run_id}").json()["status"] == "done"
+    assert client.get("/runs/nope").status_code == 404
+
+
+def test_run_history_endpoint_lists_recorded_runs(tmp_path, monkeypatch):
+    from contextlib import contextmanager
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    import api.main as main
+    from job_agent.db import insert_run, make_engine
+    from job_agent.models import Base
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    with Session(eng) as s:
+        for i in range(3):
+            run = {"id": f"run{i}", "status": "done", "started_at": f"2024-01-0{i + 1}T00:00:00+00:00",
+                   "scraped": 10 * i, "seconds": 1.5, "write_seconds": 0.25}
+            fetches = [{"site": "lever", "term": "acme", "records": i, "bytes": 100, "seconds": 0.5, "error": ""}]
+            insert_run(s, run, fetches)
+        s.commit()
+
+    @contextmanager
+    def read_session():
+        with Session(eng) as s:
+            yield s
+
+    monkeypatch.setattr(main, "supa_available", lambda: False)
+    monkeypatch.setattr(main, "get_read_session", read_session)
+    client = TestClient(main.app)
+
+    runs = client.get("/runs", params={"limit": 2, "fetches": True}).json()
+    assert [r["id"] for r in runs] == ["run2", "run1"]
+    assert runs[0]["scraped"] == 20 and runs[0]["write_seconds"] == 0.25
+    assert runs[0]["fetches"] == [
+        {"run_id": "run2", "site": "lever", "term": "acme", "records": 2, "bytes": 100,
+         "seconds": 0.5, "parse_seconds": 0.0, "error": ""}
+    ]
+    assert "fetches" not in client.get("/runs").json()[0]
+
+
+def test_scrape_lock_keeps_runs_exclusive(tmp_path, monkeypatch):
+    import pytest
+
+    from job_agent import orchestrator
+    from job_agent.scrapelock import ScrapeLocked, scrape_lock
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter([]))
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    lock = str(tmp_path / "scrape.lock")
+    cfg = {"sites": [], "output_csv": str(tmp_path / "jobs.csv"), "scrape_lock": lock}
+
+    # Held elsewhere (another API worker, the scheduler): the run fails fast
+    with scrape_lock(lock):
+        with pytest.raises(ScrapeLocked):
+            orchestrator.run_scrape(cfg)
+    assert orchestrator.run_scrape(cfg) == (0, 0, 0, [])
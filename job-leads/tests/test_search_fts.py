@@ -0,0 +1,56 @@
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+
+def _job(i, title, company="Acme", description="", tags=""):
+    return {
+        "id": f"job{i}",
+        "title": title,
+        "company": company,
+        "location": "Remote",
+        "salary": "",
+        "tags": tags,
+        "posted_at": "",
+        "url": f"https://acme.test/jobs/{i}",
+        "source": "test",
+        "collected_at": "2024-01-01T00:00:00+00:00",
+        "description": description,
+    }
+
+
+def test_fts_prefix_ranking_and_triggers(tmp_path):
+    from job_agent.db import bulk_upsert_jobs, ensure_fts, fts_query, make_engine, search_all_local
+    from job_agent.models import Base, Job
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    with Session(eng) as s:
+        # Rows written before the index exists are picked up by the initial rebuild
+        bulk_upsert_jobs(s, [_job(0, "Backend Engineer", description="we need a designer eventually")])
+        s.commit()
+    assert ensure_fts(eng)
+
+    with Session(eng) as s:
+        bulk_upsert_jobs(s, [_job(1, "UX Designer", tags="ux,figma"), _job(2, "Data Analyst")])
+        s.commit()
+
+        hits = search_all_local(s, "design")
+        assert [h["rid"] for h in hits] == ["job1", "job0"]  # title outranks description
+        assert hits[0] == {
+            "kind": "job",
+            "rid": "job1",
+            "title": "UX Designer",
+            "subtitle": "Acme",
+            "url": "https://acme.test/jobs/1",
+        }
+        assert [h["rid"] for h in search_all_local(s, "ux fig")] == ["job1"]
+        assert search_all_local(s, "  ") == []
+
+        s.execute(update(Job).where(Job.id == "job2").values(title="Product Designer"))
+        s.execute(delete(Job).where(Job.id == "job1"))
+        s.commit()
+        assert {h["rid"] for h in search_all_local(s, "designer")} == {"job0", "job2"}
+        assert search_all_local(s, "figma") == []
+
+    assert fts_query('c++ "OR" x*') == '"c"* "or"* "x"*'
+    eng.dispose()
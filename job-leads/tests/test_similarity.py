@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.orm import Session
+
+from job_agent.similarity import SimilarityIndex
+
+JOBS = [
+    {"id": "py1", "title": "Senior Python Developer", "tags": "python,django", "description": "Backend APIs in Python"},
+    {"id": "py2", "title": "Python Backend Engineer", "tags": "python,fastapi", "description": "Build APIs and services"},
+    {"id": "rn1", "title": "Registered Nurse", "tags": "healthcare", "description": "Patient care on a hospital ward"},
+    {"id": "rn2", "title": "ICU Nurse", "tags": "healthcare,icu", "description": "Critical patient care"},
+    {"id": "fe1", "title": "Frontend React Developer", "tags": "react,javascript", "description": "Web UI work"},
+]
+
+
+def test_similar_ranks_shared_terms_and_survives_save(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "sim"))
+    index.add(JOBS)
+    before = index.similar("py1", 3)
+    assert before[0][0] == "py2"
+    assert "py1" not in [i for i, _ in before]
+    assert all(0 < s <= 1 for _, s in before)
+
+    index.save()
+    loaded = SimilarityIndex(str(tmp_path / "sim"))
+    # read-only views of the mapped .npy files, not copies
+    assert not loaded._postings.data.flags.owndata and not loaded._postings.data.flags.writeable
+    assert len(loaded) == len(JOBS)
+    assert [(i, round(s, 5)) for i, s in loaded.similar("py1", 3)] == [(i, round(s, 5)) for i, s in before]
+    assert loaded.similar("missing") == []
+
+
+def test_changed_job_replaces_its_row(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "sim"))
+    index.add(JOBS)
+    index.save()
+    # py2 turns into a nursing job: its old row is tombstoned, the new one lives in memory
+    index.add([{"id": "py2", "title": "Night Nurse", "tags": "healthcare", "description": "Patient care"}])
+    assert len(index) == len(JOBS)
+    assert index.similar("py1", 1)[0][0] != "py2"
+    assert index.similar("rn1", 1)[0][0] in ("py2", "rn2")
+
+    index.save()
+    assert len(SimilarityIndex(str(tmp_path / "sim"))._ids) == len(JOBS)
+    index.remove(["py2"])
+    assert "py2" not in index and "py2" not in [i for i, _ in index.similar("rn1")]
+
+
+def test_recommend_ranks_candidates_against_liked(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "sim"))
+    index.add(JOBS)
+    ranked = index.recommend(["rn1"], k=5)
+    assert ranked[0][0] == "rn2"
+    assert "rn1" not in [i for i, _ in ranked]
+    assert [i for i, _ in index.recommend(["py1", "py2"], 5, candidates=["fe1", "rn2"])] == ["fe1"]
+    assert index.recommend(["unknown"]) == []
+
+
+def test_run_scrape_indexes_new_and_changed_jobs(tmp_path, monkeypatch):
+    from job_agent import orchestrator, similarity
+
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(similarity, "_INDEX", None)
+    recs = [dict(r, url=f"https://x/{r['id']}") for r in JOBS]
+    monkeypatch.setattr(orchestrator, "iter_fetches", lambda cfg, sites, terms, observer=None: iter([("fake", "", recs)]))
+    monkeypatch.setattr(orchestrator, "_known_hashes_local", lambda ids: {})
+    monkeypatch.setattr(orchestrator, "_write_batch_local", lambda batch: [])
+    monkeypatch.setattr(orchestrator, "_save_run", lambda *a: None)
+    cfg = {
+        "sites": ["fake"],
+        "output_csv": str(tmp_path / "jobs.csv"),
+        "similarity_index": {"enabled": True, "path": str(tmp_path / "sim")},
+    }
+    orchestrator.run_scrape(cfg)
+
+    index = SimilarityIndex(str(tmp_path / "sim"))
+    assert sorted(index._ids) == sorted(r["id"] for r in JOBS)
+    assert index.similar("rn1", 1)[0][0] == "rn2"
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    import api.main as main
+    from job_agent import similarity
+    from job_agent.db import bulk_upsert_jobs, ensure_schema, make_engine
+    from job_agent.models import Base, Lead
+
+    eng = make_engine(str(tmp_path / "jobs.sqlite"))
+    Base.metadata.create_all(eng)
+    ensure_schema(eng)
+    rows = [
+        dict(r, url=f"https://x/{r['id']}", source="test", collected_at=f"2024-01-0{i + 1}T00:00:00+00:00")
+        for i, r in enumerate(JOBS)
+    ]
+    with Session(eng) as s:
+        bulk_upsert_jobs(s, rows)
+        s.add(Lead(id="rn1", status="Applied"))
+        s.commit()
+    index = SimilarityIndex(str(tmp_path / "sim"))
+    index.add(rows)
+    index.save()
+
+    @contextmanager
+    def read_session():
+        with Session(eng) as s:
+            yield s
+
+    monkeypatch.setattr(main, "supa_available", lambda: False)
+    monkeypatch.setattr(main, "get_read_session", read_session)
+    monkeypatch.setattr(main, "_cfg", {"similarity_index": {"enabled": True, "path": str(tmp_path / "sim")}})
+    monkeypatch.setattr(similarity, "_INDEX", None)
+    yield main
+    eng.dispose()
+
+
+def test_similar_and_recommended_endpoints(api):
+    from fastapi import HTTPException
+
+    similar = api.get_similar_jobs("py1", limit=2)
+    assert similar[0]["id"] == "py2" and similar[0]["title"] == "Python Backend Engineer"
+    assert 0 < similar[0]["similarity"] <= 1
+    with pytest.raises(HTTPException) as e:
+        api.get_similar_jobs("missing")
+    assert e.value.status_code == 404
+
+    # status matches case-insensitively; `since` limits ranking to newer jobs
+    assert api.get_recommended_jobs(limit=1)[0]["id"] == "rn2"
+    newer = api.get_recommended_jobs(limit=5, since="2024-01-03T00:00:00+00:00")
+    assert [j["id"] for j in newer] == ["rn2"]  # fe1 is newer too but shares no terms
+
+
+def test_endpoints_404_when_index_disabled(api, monkeypatch):
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(api, "_cfg", {})
+    with pytest.raises(HTTPException) as e:
+        api.get_recommended_jobs()
+    assert e.value.status_code == 404
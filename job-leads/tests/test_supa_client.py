@@ -0,0 +1,54 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _PostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen = []
+
+    def do_GET(self):
+        type(self).seen.append((self.path, self.headers.get("apikey")))
+        body = json.dumps([{"id": "a"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_client_cached_per_role_and_reuses_connections(monkeypatch):
+    from job_agent import httpclient, supa
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PostgrestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("SUPABASE_URL", f"http://{host}")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon-key")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+
+    created = []
+    real_create = supa.create_client
+    monkeypatch.setattr(supa, "create_client", lambda *a: created.append(a) or real_create(*a))
+    supa.reset_supa_clients()
+    httpclient.STATS.reset()
+    try:
+        anon = supa.get_supa_client()
+        assert supa.get_supa_client() is anon
+        service = supa.get_supa_client(service=True)
+        assert service is not anon
+        assert len(created) == 2
+
+        for _ in range(5):
+            assert supa.get_supa_client().table("jobs").select("id").execute().data == [{"id": "a"}]
+        assert _PostgrestHandler.seen[-1] == ("/rest/v1/jobs?select=id", "anon-key")
+        assert httpclient.connection_stats()[host] == {"requests": 5, "connections": 1, "reused": 4}
+
+        supa.reset_supa_clients()
+        assert supa.get_supa_client() is not anon
+    finally:
+        supa.reset_supa_clients()
+        server.shutdown()
@@ -5,7 +5,7 @@ import { PersonCard } from '../Cards/PersonCard'
 import { PostCard } from '../Cards/PostCard'
 
 export function Feed({ q, tab }: { q?: string, tab: 'all'|'people'|'jobs'|'posts' }) {
-  const { items, loading, load } = useFeedStore()
+  const { items, loading, load, loadMore, nextCursor } = useFeedStore()
   useEffect(()=>{ load(q) }, [q])
   const filtered = items.filter(it => tab==='all' || it.kind===tab)
   return (
@@ -17,6 +17,11 @@ export function Feed({ q, tab }: { q?: string, tab: 'all'|'people'|'jobs'|'posts
         return <JobCard key={idx} job={item} />
       })}
       {!loading && filtered.length===0 && <div className="text-sm text-gray-500">No items</div>}
+      {nextCursor && (
+        <button className="w-full rounded border bg-white py-2 text-sm hover:bg-gray-50" disabled={loading} onClick={()=>loadMore()}>
+          Load more
+        </button>
+      )}
     </div>
   )
 }
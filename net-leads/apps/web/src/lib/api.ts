@@ -9,10 +9,46 @@ async function http<T>(path: string, init?: RequestInit): Promise<T> {
   return r.json() as Promise<T>
 }
 
+export type Page<T> = { items: T[], next_cursor: string | null }
+
+export type Draft = { draft: string, cached?: boolean }
+
+// POST /llm/suggest/stream: calls onToken per SSE `token` event, resolves with the `done` payload
+async function suggestStream(body: any, onToken: (text: string) => void): Promise<Draft> {
+  const r = await fetch(`${API_BASE}/llm/suggest/stream`, {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify(body),
+  })
+  if (!r.ok || !r.body) throw new Error(await r.text())
+  const reader = r.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buf = ''
+  for (;;) {
+    const {value, done} = await reader.read()
+    if (done) break
+    buf += value
+    let sep
+    while ((sep = buf.indexOf('\n\n')) >= 0) {
+      const block = buf.slice(0, sep)
+      buf = buf.slice(sep + 2)
+      const event = /^event: (.*)$/m.exec(block)?.[1]
+      const data = /^data: (.*)$/m.exec(block)?.[1]
+      if (!data) continue
+      const payload = JSON.parse(data)
+      if (event === 'token') onToken(payload.text)
+      else if (event === 'done') return payload as Draft
+      else if (event === 'error') throw new Error(payload.error)
+    }
+  }
+  throw new Error('stream ended without a result')
+}
+
 export const api = {
-  feed: () => http<any[]>(`/feed`),
+  feed: (cursor = '', limit = 50) =>
+    http<Page<any>>(`/feed?cursor=${encodeURIComponent(cursor)}&limit=${limit}`),
   search: (q: string) => http<any[]>(`/search?q=${encodeURIComponent(q)}`),
   clip: (body: any) => http(`/clip`, {method:'POST', body: JSON.stringify(body)}),
-  suggest: (body: any) => http<{draft: string}>(`/llm/suggest`, {method:'POST', body: JSON.stringify(body)}),
+  suggest: (body: any) => http<Draft>(`/llm/suggest`, {method:'POST', body: JSON.stringify(body)}),
+  suggestStream,
 }
 
@@ -4,18 +4,34 @@ import { api } from '../lib/api'
 type State = {
   items: any[]
   loading: boolean
+  nextCursor: string | null
   load: (q?: string) => Promise<void>
+  loadMore: () => Promise<void>
 }
 
 export const useFeedStore = create<State>((set, get) => ({
   items: [],
   loading: false,
+  nextCursor: null,
   load: async (q?: string) => {
     set({loading: true})
     try {
-      const data = q ? await api.search(q) : await api.feed()
-      set({items: data})
+      if (q) {
+        set({items: await api.search(q), nextCursor: null})
+      } else {
+        const page = await api.feed()
+        set({items: page.items, nextCursor: page.next_cursor})
+      }
+    } finally { set({loading:false}) }
+  },
+  // Keyset paging: the cursor marks the last item shown, so rows inserted meanwhile don't shift pages
+  loadMore: async () => {
+    const { nextCursor, loading } = get()
+    if (!nextCursor || loading) return
+    set({loading: true})
+    try {
+      const page = await api.feed(nextCursor)
+      set({items: [...get().items, ...page.items], nextCursor: page.next_cursor})
     } finally { set({loading:false}) }
   }
 }))
-